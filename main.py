@@ -13,6 +13,7 @@ from modules.decision import decision_worker
 from modules.detection import detection_worker
 from modules.flight_interface import flight_interface_worker
 from worker import queue_wrapper
+from worker import shared_memory_ring
 from worker import worker_controller
 
 CONFIG_FILE_PATH = pathlib.Path("config.yaml")
@@ -42,6 +43,17 @@ def main() -> int:
         # Local constants
         # pylint: disable=invalid-name
         QUEUE_MAX_SIZE = config["queue_max_size"]
+        QUEUE_POLICIES = config["queue_policies"]
+        FLIGHT_INTERFACE_TO_DATA_MERGE_POLICY = queue_wrapper.QueuePolicy(
+            QUEUE_POLICIES["flight_interface_to_data_merge"]
+        )
+        DETECTION_TO_DATA_MERGE_POLICY = queue_wrapper.QueuePolicy(
+            QUEUE_POLICIES["detection_to_data_merge"]
+        )
+        MERGED_TO_DECISION_POLICY = queue_wrapper.QueuePolicy(QUEUE_POLICIES["merged_to_decision"])
+        COMMAND_TO_FLIGHT_INTERFACE_POLICY = queue_wrapper.QueuePolicy(
+            QUEUE_POLICIES["command_to_flight_interface"]
+        )
 
         FLIGHT_INTERFACE_ADDRESS = config["flight_interface"]["address"]
         FLIGHT_INTERFACE_TIMEOUT = config["flight_interface"]["timeout"]
@@ -50,13 +62,27 @@ def main() -> int:
             "first_waypoint_distance_tolerance"
         ]
 
-        SERIAL_PORT_NAME = config["detection"]["serial_port_name"]
+        SERIAL_PORT_NAMES = config["detection"]["serial_port_names"]
+        MOUNT_YAW_OFFSETS = config["detection"]["mount_yaw_offsets"]
         SERIAL_PORT_BAUDRATE = config["detection"]["serial_port_baudrate"]
         PORT_TIMEOUT = config["detection"]["port_timeout"]
         UPDATE_RATE = config["detection"]["update_rate"]
         LOW_ANGLE = config["detection"]["low_angle"]
         HIGH_ANGLE = config["detection"]["high_angle"]
         ROTATE_SPEED = config["detection"]["rotate_speed"]
+        CAPTURE_PATH = config["detection"]["capture_path"]
+        STATISTICS_PERIOD = config["detection"]["statistics_period"]
+        MIN_UPDATE_RATE = config["detection"]["min_update_rate"]
+        GOVERNOR_MAX_LAG = config["detection"]["governor_max_lag"]
+        GOVERNOR_HOLD_TIME = config["detection"]["governor_hold_time"]
+        BATCH_MAX_SAMPLES = config["detection"]["batch_max_samples"]
+        BATCH_MAX_LATENCY = config["detection"]["batch_max_latency"]
+        GATE_ANGLE_WINDOWS = config["detection"]["gate_angle_windows"]
+        GATE_MIN_DISTANCE = config["detection"]["gate_min_distance"]
+        GATE_MAX_DISTANCE = config["detection"]["gate_max_distance"]
+        GATE_DECIMATION_BIN = config["detection"]["gate_decimation_bin"]
+        TRANSPORT = config["detection"]["transport"]
+        RING_CAPACITY = config["detection"]["ring_capacity"]
 
         DELAY = config["data_merge"]["delay"]
 
@@ -67,15 +93,43 @@ def main() -> int:
     except KeyError:
         print("Config key(s) not found.")
         return -1
+    except ValueError as exc:
+        print(f"Invalid config value: {exc}")
+        return -1
 
     # Setup
     controller = worker_controller.WorkerController()
     mp_manager = mp.Manager()
 
-    flight_interface_to_data_merge_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
-    detection_to_data_merge_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
-    merged_to_decision_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
-    command_to_flight_interface_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
+    flight_interface_to_data_merge_queue = queue_wrapper.QueueWrapper(
+        mp_manager, QUEUE_MAX_SIZE, FLIGHT_INTERFACE_TO_DATA_MERGE_POLICY
+    )
+    detection_to_data_merge_queue = queue_wrapper.QueueWrapper(
+        mp_manager, QUEUE_MAX_SIZE, DETECTION_TO_DATA_MERGE_POLICY
+    )
+    merged_to_decision_queue = queue_wrapper.QueueWrapper(
+        mp_manager, QUEUE_MAX_SIZE, MERGED_TO_DECISION_POLICY
+    )
+    command_to_flight_interface_queue = queue_wrapper.QueueWrapper(
+        mp_manager, QUEUE_MAX_SIZE, COMMAND_TO_FLIGHT_INTERFACE_POLICY
+    )
+
+    # Lidar readings go to data merge through the queue or a shared memory ring
+    detection_output = detection_to_data_merge_queue
+    data_merge_input = detection_to_data_merge_queue
+    ring = None
+    if TRANSPORT == "shared_memory":
+        result, ring = shared_memory_ring.SharedMemoryRing.create(RING_CAPACITY, 1)
+        if not result:
+            print("Failed to create shared memory ring.")
+            return -1
+
+        _, ring_consumer = ring.consumer(0)
+        detection_output = ring
+        data_merge_input = ring_consumer
+    elif TRANSPORT != "queue":
+        print(f"Unknown detection transport: {TRANSPORT}")
+        return -1
 
     flight_interface_process = mp.Process(
         target=flight_interface_worker.flight_interface_worker,
@@ -93,14 +147,26 @@ def main() -> int:
     detection_process = mp.Process(
         target=detection_worker.detection_worker,
         args=(
-            SERIAL_PORT_NAME,
+            SERIAL_PORT_NAMES,
+            MOUNT_YAW_OFFSETS,
             SERIAL_PORT_BAUDRATE,
             PORT_TIMEOUT,
             UPDATE_RATE,
             LOW_ANGLE,
             HIGH_ANGLE,
             ROTATE_SPEED,
-            detection_to_data_merge_queue,
+            CAPTURE_PATH,
+            STATISTICS_PERIOD,
+            MIN_UPDATE_RATE,
+            GOVERNOR_MAX_LAG,
+            GOVERNOR_HOLD_TIME,
+            BATCH_MAX_SAMPLES,
+            BATCH_MAX_LATENCY,
+            GATE_ANGLE_WINDOWS,
+            GATE_MIN_DISTANCE,
+            GATE_MAX_DISTANCE,
+            GATE_DECIMATION_BIN,
+            detection_output,
             controller,
         ),
     )
@@ -109,7 +175,7 @@ def main() -> int:
         target=data_merge_worker.data_merge_worker,
         args=(
             DELAY,
-            detection_to_data_merge_queue,
+            data_merge_input,
             flight_interface_to_data_merge_queue,
             merged_to_decision_queue,
             controller,
@@ -153,6 +219,19 @@ def main() -> int:
     data_merge_process.join()
     decision_process.join()
 
+    for name, queue in [
+        ("flight_interface_to_data_merge", flight_interface_to_data_merge_queue),
+        ("detection_to_data_merge", detection_to_data_merge_queue),
+        ("merged_to_decision", merged_to_decision_queue),
+        ("command_to_flight_interface", command_to_flight_interface_queue),
+    ]:
+        if queue.drop_count() > 0:
+            print(f"Queue {name}: {queue.drop_count()} items dropped.")
+
+    if ring is not None:
+        ring.close()
+        ring.unlink()
+
     return 0
 
 
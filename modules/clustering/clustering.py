@@ -4,14 +4,19 @@ Clusters together LiDAR detections.
 
 import math
 
+import numpy as np
+
 from .. import detection_cluster
 from .. import detection_point
 from .. import lidar_detection
+from .. import lidar_detection_batch
+from .. import trig_lookup
 
 
 class Clustering:
     """
-    Groups together LiDAR detections into clusters.
+    Groups together LiDAR detections of one lidar into clusters.
+    Points are relative to the drone, rotated by the mount yaw offset of the lidar.
     """
 
     def __init__(self, max_cluster_distance: float) -> None:
@@ -39,8 +44,8 @@ class Clustering:
         """
         Returns a DetectionCluster consisting of LidarDetections.
         """
-        # convert to x, y coordinates
-        detection_angle_in_radians = detection.angle * math.pi / 180
+        # convert to x, y coordinates, relative to the drone
+        detection_angle_in_radians = (detection.angle + detection.mount_yaw_offset) * math.pi / 180
         x = math.cos(detection_angle_in_radians) * detection.distance
         y = math.sin(detection_angle_in_radians) * detection.distance
 
@@ -83,3 +88,82 @@ class Clustering:
         # if close enough, cluster together
         self.cluster.append(point)
         return False, None
+
+    def run_batch(
+        self, batch: lidar_detection_batch.LidarDetectionBatch
+    ) -> "tuple[bool, list[detection_cluster.DetectionCluster] | None]":
+        """
+        Returns every DetectionCluster completed by the batch, in order.
+        Same as calling run() on each detection in order.
+        """
+        # lidar_driver.py returns -1 for an invalid LiDAR reading.
+        valid = batch.distances != -1
+        distances = batch.distances[valid]
+        angles = batch.angles[valid]
+        if len(distances) == 0:
+            return False, None
+
+        # convert to x, y coordinates, relative to the drone
+        sin_angles, cos_angles = trig_lookup.sin_cos_array(angles + batch.mount_yaw_offset)
+        xs = cos_angles * distances
+        ys = sin_angles * distances
+
+        points = []
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            _, point = detection_point.DetectionPoint.create(x, y)
+            points.append(point)
+
+        start = 0
+        if self.__last_point is None:
+            self.__last_point = points[0]
+            self.__last_angle = float(angles[0])
+            self.cluster.append(points[0])
+            start = 1
+
+        if start == len(points):
+            return False, None
+
+        # distance from the previous point
+        gaps = np.hypot(
+            np.diff(xs[start:], prepend=self.__last_point.x),
+            np.diff(ys[start:], prepend=self.__last_point.y),
+        )
+
+        # if lidar direction changes, start a new cluster (no angle change keeps the direction)
+        steps = np.sign(np.diff(angles[start:], prepend=self.__last_angle))
+        latest_step = np.maximum.accumulate(np.where(steps != 0, np.arange(len(steps)), -1))
+        clockwise = np.where(
+            latest_step >= 0, steps[np.maximum(latest_step, 0)] > 0, self.__clockwise
+        )
+        previous_clockwise = np.concatenate(([self.__clockwise], clockwise[:-1]))
+
+        # if far enough, send current cluster, initialize new one
+        splits = (
+            np.flatnonzero((gaps > self.max_cluster_distance) | (clockwise != previous_clockwise))
+            + start
+        )
+
+        clusters = []
+        cluster = self.cluster
+        cluster_start = start
+        for split in splits.tolist():
+            cluster.extend(points[cluster_start:split])
+            result, new_cluster = detection_cluster.DetectionCluster.create(cluster)
+            if result:
+                clusters.append(new_cluster)
+
+            cluster = []
+            cluster_start = split
+
+        # if close enough, cluster together
+        cluster.extend(points[cluster_start:])
+        self.cluster = cluster
+
+        self.__last_point = points[-1]
+        self.__last_angle = float(angles[-1])
+        self.__clockwise = bool(clockwise[-1])
+
+        if len(clusters) == 0:
+            return False, None
+
+        return True, clusters
@@ -5,14 +5,16 @@ Gets detection clusters.
 import queue
 
 from modules import lidar_detection
+from modules import lidar_detection_batch
 from worker import queue_wrapper
+from worker import shared_memory_ring
 from worker import worker_controller
 from . import clustering
 
 
 def clustering_worker(
     max_cluster_distance: float,
-    detection_in_queue: queue_wrapper.QueueWrapper,
+    detection_in_queue: "queue_wrapper.QueueWrapper | shared_memory_ring.SharedMemoryRingConsumer",
     cluster_out_queue: queue_wrapper.QueueWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
@@ -20,21 +22,50 @@ def clustering_worker(
     Worker process.
 
     max_cluster_distance: max distance between points in the same cluster in metres.
+    Lidar detections can arrive individually or in batches, and from several lidars.
     """
-    clusterer = clustering.Clustering(max_cluster_distance)
+    # Each lidar sweeps on its own, so readings of different lidars are clustered separately
+    clusterers: "dict[int, clustering.Clustering]" = {}
+    # Batches discarded because they were overwritten in shared memory while being read
+    overwritten_count = 0
 
     while not controller.is_exit_requested():
         controller.check_pause()
 
         try:
-            detection: lidar_detection.LidarDetection = detection_in_queue.queue.get_nowait()
+            detection: "lidar_detection.LidarDetection | lidar_detection_batch.LidarDetectionBatch"
+            if isinstance(detection_in_queue, shared_memory_ring.SharedMemoryRingConsumer):
+                detection = detection_in_queue.get_nowait()
+            else:
+                detection = detection_in_queue.queue.get_nowait()
             if detection is None:
                 break
         except queue.Empty:
             continue
 
-        result, value = clusterer.run(detection)
+        if detection.sensor_id not in clusterers:
+            clusterers[detection.sensor_id] = clustering.Clustering(max_cluster_distance)
+        clusterer = clusterers[detection.sensor_id]
+
+        if isinstance(detection, lidar_detection_batch.LidarDetectionBatch):
+            result, values = clusterer.run_batch(detection)
+        else:
+            result, value = clusterer.run(detection)
+            values = [value]
+
+        if isinstance(detection_in_queue, shared_memory_ring.SharedMemoryRingConsumer):
+            if detection_in_queue.is_overwritten():
+                # The clusters and the cluster in progress may hold corrupt readings
+                overwritten_count += 1
+                print(
+                    "Clustering: lidar readings were overwritten while being read, "
+                    f"clusters discarded ({overwritten_count} times)."
+                )
+                clusterers[detection.sensor_id] = clustering.Clustering(max_cluster_distance)
+                continue
+
         if not result:
             continue
 
-        cluster_out_queue.queue.put(value)
+        for value in values:
+            cluster_out_queue.put(value)
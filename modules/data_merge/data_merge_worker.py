@@ -6,16 +6,18 @@ import queue
 import time
 
 from worker import queue_wrapper
+from worker import shared_memory_ring
 from worker import worker_controller
 
 from modules import detections_and_odometry
 from modules import drone_odometry_local
-from modules import lidar_detection
+from modules import lidar_detection  # pylint: disable=unused-import
+from modules import lidar_detection_batch
 
 
 def data_merge_worker(
     delay: float,
-    detection_input_queue: queue_wrapper.QueueWrapper,
+    detection_input_queue: "queue_wrapper.QueueWrapper | shared_memory_ring.SharedMemoryRingConsumer",
     odometry_input_queue: queue_wrapper.QueueWrapper,
     output_queue: queue_wrapper.QueueWrapper,
     controller: worker_controller.WorkerController,
@@ -23,17 +25,41 @@ def data_merge_worker(
     """
     Worker process.
     Expects lidar detections to be more frequent than odometry readings.
+    Lidar detections can arrive individually or in batches, batches are kept as arrays.
 
     detection_input_queue, odometry_input_queue, output_queue are data queues.
     controller is how the main process communicates to this worker process.
     """
     detections = []
+    batches = []
+    # Batches discarded because they were overwritten in shared memory while being read
+    overwritten_count = 0
     while not controller.is_exit_requested():
         controller.check_pause()
 
         try:
-            detection: lidar_detection.LidarDetection = detection_input_queue.queue.get_nowait()
-            detections.append(detection)
+            detection: "lidar_detection.LidarDetection | lidar_detection_batch.LidarDetectionBatch"
+            if isinstance(detection_input_queue, shared_memory_ring.SharedMemoryRingConsumer):
+                detection = detection_input_queue.get_nowait()
+            else:
+                detection = detection_input_queue.queue.get_nowait()
+
+            if isinstance(detection_input_queue, shared_memory_ring.SharedMemoryRingConsumer):
+                # Batches read from shared memory are only valid until overwritten, so they are
+                # copied, and the copy is discarded if they were overwritten while copying
+                detection = detection.copy()
+                if detection_input_queue.is_overwritten():
+                    overwritten_count += 1
+                    print(
+                        "Data merge: lidar readings were overwritten while being read, "
+                        f"discarded ({overwritten_count} times)."
+                    )
+                    detection = None
+
+            if isinstance(detection, lidar_detection_batch.LidarDetectionBatch):
+                batches.append(detection)
+            elif detection is not None:
+                detections.append(detection)
         except queue.Empty:
             time.sleep(delay)
 
@@ -45,10 +71,13 @@ def data_merge_worker(
         except queue.Empty:
             continue
 
-        result, merged = detections_and_odometry.DetectionsAndOdometry.create(detections, odometry)
+        result, merged = detections_and_odometry.DetectionsAndOdometry.create_with_batches(
+            detections, batches, odometry
+        )
 
         if not result:
             continue
 
         detections = []
-        output_queue.queue.put(merged)
+        batches = []
+        output_queue.put(merged)
@@ -36,7 +36,7 @@ class Decision:
         """
         start_time = 0
         for lidar_scan_and_odometry in detections_and_odometries:
-            detections = lidar_scan_and_odometry.detections
+            closest_distance = lidar_scan_and_odometry.min_distance()
 
             if self.__command_requested and self.__last_command_sent == current_flight_mode:
                 self.__command_requested = False
@@ -52,9 +52,8 @@ class Decision:
                 continue
 
             if current_flight_mode == drone_odometry_local.FlightMode.STOPPED:
-                for detection in detections:
-                    if detection.distance < proximity_limit:
-                        return False, None
+                if closest_distance < proximity_limit:
+                    return False, None
                 self.__command_requested = True
                 self.__last_command_sent = drone_odometry_local.FlightMode.MOVING
                 self.detections_and_odometries.clear()
@@ -62,15 +61,12 @@ class Decision:
                 return decision_command.DecisionCommand.create_resume_mission_command()
 
             if current_flight_mode == drone_odometry_local.FlightMode.MOVING:
-                for detection in detections:
-                    if detection.distance < proximity_limit:
-                        self.__command_requested = True
-                        self.__last_command_sent = drone_odometry_local.FlightMode.STOPPED
-                        self.detections_and_odometries.clear()
-                        start_time = time.time()
-                        return (
-                            decision_command.DecisionCommand.create_stop_mission_and_halt_command()
-                        )
+                if closest_distance < proximity_limit:
+                    self.__command_requested = True
+                    self.__last_command_sent = drone_odometry_local.FlightMode.STOPPED
+                    self.detections_and_odometries.clear()
+                    start_time = time.time()
+                    return decision_command.DecisionCommand.create_stop_mission_and_halt_command()
         return False, None
 
     def run(
@@ -38,4 +38,4 @@ def decision_worker(
             continue
 
         print(f"Decision: Command sent: {value.command}")
-        command_out_queue.queue.put(value)
+        command_out_queue.put(value)
@@ -0,0 +1,172 @@
+"""
+Steers around obstacles using the polar obstacle density (VFH+).
+"""
+
+import math
+import time
+
+import numpy as np
+
+from .. import decision_command
+from .. import polar_obstacle_density
+
+
+def wrap_angle(angle: "float | np.ndarray") -> "float | np.ndarray":
+    """
+    Angle in degrees, from -180 to 180.
+    """
+    return (angle + 180) % 360 - 180
+
+
+# pylint: disable-next=too-many-instance-attributes
+class VfhDecision:
+    """
+    Thresholds the density into blocked and free sectors, with hysteresis between oscillations,
+    and steers through the free valley closest to the heading towards the next waypoint.
+
+    Angles relative to the drone are clockwise, like headings.
+
+    The search is bounded rather than only timed: densities are limited to MAX_SECTOR_COUNT
+    sectors (more stops the drone), and whether each window of sectors is free is found from a
+    running count of blocked sectors, so a decision costs a few passes over the sectors whatever
+    the valley width.
+    """
+
+    MAX_SECTOR_COUNT = 720
+
+    def __init__(
+        self,
+        high_threshold: float,
+        low_threshold: float,
+        min_valley_width: float,
+        speed: float,
+        heading_tolerance: float,
+        compute_budget: float,
+    ) -> None:
+        """
+        high_threshold: sectors denser than this are blocked
+        low_threshold: blocked sectors stay blocked until they are less dense than this
+        min_valley_width: angle in degrees of free sectors the drone needs to fly through
+        speed: speed in metres per second of heading change commands
+        heading_tolerance: change of heading in degrees before a new command is sent
+        compute_budget: time in seconds a decision may take, the drone is stopped if exceeded
+        """
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.min_valley_width = min_valley_width
+        self.speed = speed
+        self.heading_tolerance = heading_tolerance
+        self.compute_budget = compute_budget
+
+        # Time in seconds of the last decision, and the number of decisions over budget
+        self.last_compute_time = 0.0
+        self.over_budget_count = 0
+
+        self.__blocked = None
+        self.__last_command = None
+
+    def __binary_histogram(self, densities: np.ndarray) -> np.ndarray:
+        """
+        Whether each sector is blocked.
+        """
+        blocked = densities > self.high_threshold
+        if self.__blocked is not None and len(self.__blocked) == len(blocked):
+            blocked |= (densities >= self.low_threshold) & self.__blocked
+
+        self.__blocked = blocked
+        return blocked
+
+    def __free_windows(self, blocked: np.ndarray, window_size: int) -> np.ndarray:
+        """
+        Whether the window_size sectors starting at each sector are all free (wrapping around).
+        """
+        circular = np.concatenate((blocked, blocked[: window_size - 1]))
+        blocked_counts = np.concatenate(([0], np.cumsum(circular)))
+        return blocked_counts[window_size:] == blocked_counts[: len(blocked)]
+
+    def __steering_angle(
+        self, density: polar_obstacle_density.PolarObstacleDensity, target_angle: float
+    ) -> "tuple[bool, float | None]":
+        """
+        Angle relative to the drone to fly at, closest to the target angle.
+        """
+        if len(density.densities) > self.MAX_SECTOR_COUNT:
+            return False, None
+
+        blocked = self.__binary_histogram(density.densities)
+        sector_count = len(blocked)
+        window_size = min(
+            max(math.ceil(self.min_valley_width / density.sector_width), 1), sector_count
+        )
+
+        free_windows = self.__free_windows(blocked, window_size)
+
+        # Straight to the target if the valley around it is wide enough
+        _, target_index = density.sector_index(target_angle)
+        if (
+            target_index is not None
+            and free_windows[(target_index - window_size // 2) % sector_count]
+        ):
+            return True, target_angle
+
+        starts = np.flatnonzero(free_windows)
+        if len(starts) == 0:
+            return False, None
+
+        centres = wrap_angle(
+            density.angle_start + (starts + window_size / 2) * density.sector_width
+        )
+        closest = np.argmin(np.abs(wrap_angle(centres - target_angle)))
+        return True, float(centres[closest])
+
+    def __command(
+        self, command: decision_command.DecisionCommand
+    ) -> "tuple[bool, decision_command.DecisionCommand | None]":
+        """
+        Returns the command, unless it repeats the last one.
+        """
+        last_command = self.__last_command
+        if last_command is not None and last_command.command == command.command:
+            if command.command != decision_command.DecisionCommand.CommandType.HEADING_CHANGE:
+                return False, None
+
+            if abs(wrap_angle(command.heading - last_command.heading)) <= self.heading_tolerance:
+                return False, None
+
+        self.__last_command = command
+        return True, command
+
+    def run(
+        self,
+        density: polar_obstacle_density.PolarObstacleDensity,
+        heading: float,
+        target_heading: float,
+    ) -> "tuple[bool, decision_command.DecisionCommand | None]":
+        """
+        Returns a new command, if the decision changed.
+
+        heading: current heading of the drone in degrees
+        target_heading: heading in degrees from the drone to the next waypoint
+        """
+        start_time = time.perf_counter()
+
+        result, steering_angle = self.__steering_angle(
+            density, float(wrap_angle(target_heading - heading))
+        )
+
+        self.last_compute_time = time.perf_counter() - start_time
+        if self.last_compute_time > self.compute_budget:
+            # Too late to act on, stop rather than steer on stale data
+            self.over_budget_count += 1
+            result = False
+
+        if not result:
+            _, command = decision_command.DecisionCommand.create_stop_mission_and_halt_command()
+        elif abs(wrap_angle(steering_angle - (target_heading - heading))) <= self.heading_tolerance:
+            _, command = decision_command.DecisionCommand.create_resume_mission_command()
+        else:
+            _, command = decision_command.DecisionCommand.create_heading_change_command(
+                float(wrap_angle(heading + steering_angle)), self.speed
+            )
+
+        return self.__command(command)
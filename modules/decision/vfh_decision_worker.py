@@ -0,0 +1,89 @@
+"""
+Gets polar obstacle densities and odometry with the next waypoint and outputs steering decisions.
+"""
+
+import math
+import queue
+
+from modules import odometry_and_waypoint
+from modules import polar_obstacle_density
+from worker import queue_wrapper
+from worker import worker_controller
+from . import vfh_decision
+
+
+def target_heading(odometry: odometry_and_waypoint.OdometryAndWaypoint) -> float:
+    """
+    Heading in degrees from the drone to the next waypoint.
+    """
+    return math.degrees(
+        math.atan2(
+            odometry.next_waypoint.east - odometry.local_position.east,
+            odometry.next_waypoint.north - odometry.local_position.north,
+        )
+    )
+
+
+def vfh_decision_worker(
+    high_threshold: float,
+    low_threshold: float,
+    min_valley_width: float,
+    speed: float,
+    heading_tolerance: float,
+    compute_budget: float,
+    density_in_queue: queue_wrapper.QueueWrapper,
+    odometry_in_queue: queue_wrapper.QueueWrapper,
+    command_out_queue: queue_wrapper.QueueWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    high_threshold, low_threshold: density above which a sector is blocked, and below which
+        it is free again.
+    min_valley_width: angle in degrees of free sectors the drone needs to fly through.
+    speed: speed in metres per second to fly around obstacles.
+    heading_tolerance: change of heading in degrees before a new command is sent.
+    compute_budget: time in seconds a decision may take before the drone is stopped instead.
+    density_in_queue, odometry_in_queue, command_out_queue are data queues.
+    controller is how the main process communicates to this worker process.
+    """
+    decider = vfh_decision.VfhDecision(
+        high_threshold, low_threshold, min_valley_width, speed, heading_tolerance, compute_budget
+    )
+
+    odometry = None
+    over_budget_count = 0
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        density: polar_obstacle_density.PolarObstacleDensity = density_in_queue.queue.get()
+        if density is None:
+            break
+
+        # Only the latest odometry is used
+        while True:
+            try:
+                odometry = odometry_in_queue.queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if odometry is None:
+            continue
+
+        result, value = decider.run(
+            density, math.degrees(odometry.drone_orientation.yaw), target_heading(odometry)
+        )
+
+        if decider.over_budget_count > over_budget_count:
+            print(
+                f"Decision: took {decider.last_compute_time * 1000:.1f} ms, "
+                f"over budget of {compute_budget * 1000:.1f} ms."
+            )
+            over_budget_count = decider.over_budget_count
+
+        if not result:
+            continue
+
+        print(f"Decision: Command sent: {value}")
+        command_out_queue.put(value)
@@ -13,6 +13,7 @@ class DecisionCommand:
 
     * DecisionCommand.create_stop_command
     * DecisionCommand.create_resume_command
+    * DecisionCommand.create_heading_change_command
     """
 
     __create_key = object()
@@ -24,6 +25,7 @@ class DecisionCommand:
 
         STOP_MISSION_AND_HALT = 0
         RESUME_MISSION = 1
+        HEADING_CHANGE = 2
 
     @classmethod
     def create_stop_mission_and_halt_command(cls) -> "tuple[bool, DecisionCommand | None]":
@@ -41,16 +43,38 @@ class DecisionCommand:
         """
         return True, DecisionCommand(cls.__create_key, DecisionCommand.CommandType.RESUME_MISSION)
 
-    def __init__(self, create_key: object, command: CommandType) -> None:
+    @classmethod
+    def create_heading_change_command(
+        cls, heading: float, speed: float
+    ) -> "tuple[bool, DecisionCommand | None]":
+        """
+        Command to fly at a heading in degrees (clockwise from north, -180 to 180)
+        and a speed in metres per second.
+        """
+        if heading < -180 or heading >= 180 or speed < 0:
+            return False, None
+
+        return True, DecisionCommand(
+            cls.__create_key, DecisionCommand.CommandType.HEADING_CHANGE, heading, speed
+        )
+
+    def __init__(
+        self, create_key: object, command: CommandType, heading: float = 0.0, speed: float = 0.0
+    ) -> None:
         """
         Private constructor, use create() method.
         """
         assert create_key is DecisionCommand.__create_key, "Use create() method"
 
         self.command = command
+        self.heading = heading
+        self.speed = speed
 
     def __str__(self) -> str:
         """
         String representation
         """
+        if self.command == DecisionCommand.CommandType.HEADING_CHANGE:
+            return f"{self.__class__.__name__}: {self.command}, heading: {self.heading}, speed: {self.speed}"
+
         return f"{self.__class__.__name__}: {self.command}"
@@ -0,0 +1,75 @@
+"""
+CRC-16-CCITT used by the Lightware binary protocol.
+"""
+
+import typing
+
+POLYNOMIAL = 0x1021
+CRC_SIZE = 2  # bytes
+
+
+def __create_table() -> "tuple[int, ...]":
+    """
+    Precompute the CRC of every possible leading byte.
+    """
+    table = []
+    for byte in range(0, 256):
+        crc = byte << 8
+        for _ in range(0, 8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ POLYNOMIAL
+            else:
+                crc = crc << 1
+        table.append(crc & 0xFFFF)
+
+    return tuple(table)
+
+
+TABLE = __create_table()
+
+
+def create_crc(data: "bytes | bytearray | memoryview | list[int]") -> int:
+    """
+    Create a CRC-16-CCITT 0x1021 hash of the specified data.
+    """
+    table = TABLE
+    crc = 0
+
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+
+    return crc
+
+
+def verify_packet(packet: "bytes | bytearray | memoryview") -> bool:
+    """
+    Check the CRC (last 2 bytes, little endian) of a framed packet.
+    """
+    if len(packet) < CRC_SIZE:
+        return False
+
+    crc = packet[-2] | (packet[-1] << 8)
+    return crc == create_crc(packet[:-CRC_SIZE])
+
+
+def verify_packets(packets: "typing.Iterable[bytes | bytearray | memoryview]") -> "list[bool]":
+    """
+    Check the CRC of every framed packet.
+    Returns whether each packet is valid, in order.
+    """
+    table = TABLE
+    results = []
+
+    for packet in packets:
+        size = len(packet) - CRC_SIZE
+        if size < 0:
+            results.append(False)
+            continue
+
+        crc = 0
+        for i in range(0, size):
+            crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ packet[i]]
+
+        results.append(crc == (packet[size] | (packet[size + 1] << 8)))
+
+    return results
@@ -2,10 +2,15 @@
 Detects objects using lidar and combines with current odometry
 """
 
+import time
+
 from .. import lidar_detection
+from .. import lidar_detection_batch
+from . import detection_gate  # pylint: disable=unused-import
 from . import lidar_driver
 
 
+# pylint: disable-next=too-many-instance-attributes
 class Detection:
     """
     Configures and receives lidar data
@@ -20,6 +25,11 @@ class Detection:
         low_angle: float,
         high_angle: float,
         rotate_speed: int,
+        capture_path: str = "",
+        sensor_id: int = 0,
+        mount_yaw_offset: float = 0.0,
+        start_reader: bool = True,
+        gate: "detection_gate.DetectionGate | None" = None,
     ) -> None:
         """
         serial_port_name: port that the lidar is connected to
@@ -29,30 +39,103 @@ class Detection:
         low_angle: lidar low angle in degrees (must be between -170 and -5 inclusive)
         high_angle: lidar high angle in degrees (must be between 5 and 170 inclusive)
         rotate_speed: lidar rotational speed (must be integer between 5 and 2000 inclusive where 5 is the fastest)
+        capture_path: file to capture the raw lidar byte stream to, empty to not capture
+        sensor_id: identifies the lidar in its detections
+        mount_yaw_offset: yaw of the lidar relative to the drone in degrees
+        start_reader: read the lidar with its own thread, otherwise the caller must arrange reading
+            (e.g. with a LidarMultiplexer)
+        gate: discards readings before they are output, None to output every reading
         """
         self.update_rate = update_rate
         self.low_angle = low_angle
         self.high_angle = high_angle
         self.rotate_speed = rotate_speed
+        self.sensor_id = sensor_id
+        self.mount_yaw_offset = mount_yaw_offset
+        self.gate = gate
 
         self.lidar = lidar_driver.LidarDriver(serial_port_name, serial_port_baudrate, timeout)
 
-        # configure lidar
-        self.lidar.set_update_rate(self.lidar.serial_port, self.update_rate)
-        self.lidar.set_default_distance_output(self.lidar.serial_port)
-        self.lidar.set_low_angle(self.lidar.serial_port, self.low_angle)
-        self.lidar.set_high_angle(self.lidar.serial_port, self.high_angle)
-        self.lidar.set_speed(self.lidar.serial_port, self.rotate_speed)
+        if capture_path != "":
+            self.lidar.start_capture(capture_path)
+
+        # configure lidar and start streaming
+        start_time = time.monotonic()
+        result = self.lidar.configure(
+            self.lidar.serial_port,
+            self.update_rate,
+            self.low_angle,
+            self.high_angle,
+            self.rotate_speed,
+        )
+        configuration_time = time.monotonic() - start_time
+        if result:
+            print(f"Detection: lidar configured in {configuration_time:.3f} s.")
+        else:
+            print(f"Detection: lidar configuration incomplete after {configuration_time:.3f} s.")
+
+        # read in the background so that slow consumers do not stall the serial port
+        if start_reader:
+            self.lidar.start_reader(self.lidar.serial_port)
+
+    def stop(self) -> None:
+        """
+        Stops reading from the lidar.
+        """
+        self.lidar.stop_reader()
+        self.lidar.stop_capture()
+
+    def set_rate(self, update_rate: int, rotate_speed: int) -> bool:
+        """
+        Changes the lidar update rate and rotational speed while streaming.
+        """
+        if not self.lidar.set_update_rate(self.lidar.serial_port, update_rate):
+            return False
+
+        self.update_rate = update_rate
 
-        # start streaming
-        self.lidar.set_default_distance_output(self.lidar.serial_port)
-        self.lidar.set_distance_stream_enable(self.lidar.serial_port, True)
+        if not self.lidar.set_speed(self.lidar.serial_port, rotate_speed):
+            return False
+
+        self.rotate_speed = rotate_speed
+        return True
 
     def run(self) -> "tuple[bool, lidar_detection.LidarDetection | None]":
         """
         Returns a possible LidarDetection.
         """
 
-        distance, angle = self.lidar.wait_for_reading(self.lidar.serial_port)
+        distances, angles, timestamps = self.lidar.read_batch(self.lidar.serial_port, 1)
+        if self.gate is not None:
+            distances, angles, timestamps = self.gate.run(
+                distances, angles, timestamps, self.mount_yaw_offset
+            )
+
+        if len(distances) == 0:
+            return False, None
+
+        return lidar_detection.LidarDetection.create(
+            float(distances[0]),
+            float(angles[0]),
+            int(timestamps[0]),
+            self.sensor_id,
+            self.mount_yaw_offset,
+        )
+
+    def run_batch(
+        self, max_samples: int, timeout: float = 1
+    ) -> "tuple[bool, lidar_detection_batch.LidarDetectionBatch | None]":
+        """
+        Returns up to max_samples detections, waiting (up to timeout) for the first one.
+        """
+        distances, angles, timestamps = self.lidar.read_batch(
+            self.lidar.serial_port, max_samples, timeout
+        )
+        if self.gate is not None:
+            distances, angles, timestamps = self.gate.run(
+                distances, angles, timestamps, self.mount_yaw_offset
+            )
 
-        return lidar_detection.LidarDetection.create(distance, angle)
+        return lidar_detection_batch.LidarDetectionBatch.create(
+            distances, angles, timestamps, self.sensor_id, self.mount_yaw_offset
+        )
@@ -0,0 +1,95 @@
+"""
+Discards lidar readings that the rest of the pipeline does not use.
+"""
+
+import numpy as np
+
+
+class DetectionGate:
+    """
+    Keeps readings inside the angle windows and range limits, and optionally only the nearest
+    reading of each run of consecutive readings in the same angle bin.
+
+    Counts the readings rejected by each filter.
+    """
+
+    def __init__(
+        self,
+        angle_windows: "list[tuple[float, float]]",
+        min_distance: float,
+        max_distance: float,
+        decimation_bin: int,
+    ) -> None:
+        """
+        angle_windows: (low, high) angles in degrees relative to the drone to keep,
+            empty to keep every angle
+        min_distance: readings closer than this in metres are rejected
+        max_distance: readings further than this in metres are rejected
+        decimation_bin: width of the angle bins in centidegrees, 0 to keep every reading
+        """
+        self.angle_windows = angle_windows
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.decimation_bin = decimation_bin
+
+        self.angle_rejected_count = 0
+        self.range_rejected_count = 0
+        self.decimated_count = 0
+
+    def __decimate(self, distances: np.ndarray, angles: np.ndarray) -> np.ndarray:
+        """
+        Indices of the nearest reading of each run of readings in the same bin.
+        """
+        bins = np.floor(angles * 100 / self.decimation_bin)
+        runs = np.concatenate(([0], np.cumsum(bins[1:] != bins[:-1])))
+
+        # Nearest first within each run
+        order = np.lexsort((distances, runs))
+        first = np.concatenate(([True], runs[order][1:] != runs[order][:-1]))
+
+        return order[first]
+
+    def run(
+        self,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        timestamps: np.ndarray,
+        mount_yaw_offset: float = 0.0,
+    ) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+        """
+        Readings that pass, in order.
+        Angles are relative to the lidar, which is mounted at mount_yaw_offset degrees.
+        """
+        keep = np.ones(len(distances), dtype=bool)
+
+        if len(self.angle_windows) > 0:
+            drone_angles = (angles + mount_yaw_offset + 180) % 360 - 180
+            in_window = np.zeros(len(distances), dtype=bool)
+            for low, high in self.angle_windows:
+                in_window |= (drone_angles >= low) & (drone_angles <= high)
+
+            self.angle_rejected_count += int(np.count_nonzero(~in_window))
+            keep &= in_window
+
+        in_range = (distances >= self.min_distance) & (distances <= self.max_distance)
+        self.range_rejected_count += int(np.count_nonzero(keep & ~in_range))
+        keep &= in_range
+
+        distances = distances[keep]
+        angles = angles[keep]
+        timestamps = timestamps[keep]
+
+        if self.decimation_bin > 0 and len(distances) > 0:
+            nearest = self.__decimate(distances, angles)
+            self.decimated_count += len(distances) - len(nearest)
+            distances = distances[nearest]
+            angles = angles[nearest]
+            timestamps = timestamps[nearest]
+
+        return distances, angles, timestamps
+
+    def __str__(self) -> str:
+        """
+        Rejection counts.
+        """
+        return f"angle rejected: {self.angle_rejected_count}, range rejected: {self.range_rejected_count}, decimated: {self.decimated_count}"
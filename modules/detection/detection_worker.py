@@ -2,48 +2,259 @@
 Gets lidar readings.
 """
 
+import collections
+import os
+import time
+
+import numpy as np
+
+from modules import lidar_detection_batch
 from worker import queue_wrapper
+from worker import shared_memory_ring
 from worker import worker_controller
 from . import detection
+from . import detection_gate
+from . import lidar_multiplexer
+from . import rate_governor
+
+
+GOVERNOR_CHECK_PERIOD = 0.1  # seconds
 
 
 def detection_worker(
-    serial_port_name: str,
+    serial_port_names: "list[str]",
+    mount_yaw_offsets: "list[float]",
     serial_port_baudrate: int,
     port_timeout: float,
     update_rate: int,
     low_angle: float,
     high_angle: float,
     rotate_speed: int,
-    output_queue: queue_wrapper.QueueWrapper,
+    capture_path: str,
+    statistics_period: float,
+    min_update_rate: int,
+    governor_max_lag: float,
+    governor_hold_time: float,
+    batch_max_samples: int,
+    batch_max_latency: float,
+    gate_angle_windows: "list[tuple[float, float]]",
+    gate_min_distance: float,
+    gate_max_distance: float,
+    gate_decimation_bin: int,
+    output_queue: "queue_wrapper.QueueWrapper | shared_memory_ring.SharedMemoryRing",
     controller: worker_controller.WorkerController,
 ) -> None:
     """
     Worker process.
 
-    serial_port_name: port that the lidar is connected to
-    serial_port_baudrate: baudrate of the lidar port
+    serial_port_names: ports that the lidars are connected to, the sensor id of each lidar is its index
+    mount_yaw_offsets: yaw of each lidar relative to the drone in degrees
+    serial_port_baudrate: baudrate of the lidar ports
     port_timeout: timeout for connecting to serial port
     update_rate: frequency the lidar reads points (must be integer between 1 and 12 inclusive)
     low_angle: lidar low angle in degrees (must be between -170 and -5 inclusive)
     high_angle: lidar high angle in degrees (must be between 5 and 170 inclusive)
     rotate_speed: lidar rotational speed (must be integer between 5 and 2000 inclusive where 5 is the fastest)
+    capture_path: file to capture the raw lidar byte stream to, empty to not capture
+        (with several lidars, the sensor id is added to the name)
+    statistics_period: time in seconds between link quality reports, 0 to not report
+    min_update_rate: lowest update rate to step down to when the output falls behind,
+        update_rate to keep the update rate fixed
+    governor_max_lag: time in seconds after sampling that readings must be output by
+    governor_hold_time: time in seconds between update rate changes
+    batch_max_samples: number of readings of a lidar that are output together
+    batch_max_latency: time in seconds after sampling that a reading is output by,
+        even if its batch is not full
+    gate_angle_windows: (low, high) angles in degrees relative to the drone to output,
+        empty to output every angle
+    gate_min_distance: readings closer than this in metres are not output
+    gate_max_distance: readings further than this in metres are not output
+    gate_decimation_bin: only output the nearest reading in each bin of this many centidegrees,
+        0 to output every reading
+    output_queue: batches are put in a queue, or their readings written to a shared memory ring
     """
-    detector = detection.Detection(
-        serial_port_name,
-        serial_port_baudrate,
-        port_timeout,
-        update_rate,
-        low_angle,
-        high_angle,
-        rotate_speed,
+    if len(serial_port_names) == 0 or len(serial_port_names) != len(mount_yaw_offsets):
+        print("Detection: each lidar needs a serial port name and a mount yaw offset.")
+        return
+
+    detectors = []
+    for sensor_id, (serial_port_name, mount_yaw_offset) in enumerate(
+        zip(serial_port_names, mount_yaw_offsets)
+    ):
+        sensor_capture_path = capture_path
+        if capture_path != "" and len(serial_port_names) > 1:
+            root, extension = os.path.splitext(capture_path)
+            sensor_capture_path = f"{root}_{sensor_id}{extension}"
+
+        detectors.append(
+            detection.Detection(
+                serial_port_name,
+                serial_port_baudrate,
+                port_timeout,
+                update_rate,
+                low_angle,
+                high_angle,
+                rotate_speed,
+                sensor_capture_path,
+                sensor_id,
+                mount_yaw_offset,
+                start_reader=False,
+                gate=detection_gate.DetectionGate(
+                    gate_angle_windows, gate_min_distance, gate_max_distance, gate_decimation_bin
+                ),
+            )
+        )
+
+    # Read every lidar from one thread, or from its own if its port cannot be waited on
+    multiplexer = lidar_multiplexer.LidarMultiplexer()
+    for detector in detectors:
+        if not multiplexer.add(detector.lidar):
+            detector.lidar.start_reader(detector.lidar.serial_port)
+    multiplexer.start()
+
+    governors = []
+    for _ in detectors:
+        governor = None
+        if min_update_rate < update_rate:
+            governor = rate_governor.RateGovernor(
+                min_update_rate, update_rate, rotate_speed, governor_max_lag, governor_hold_time
+            )
+        governors.append(governor)
+
+    overrun_counts = [0] * len(detectors)
+    statistics = [detector.lidar.get_link_statistics() for detector in detectors]
+    governor_check_times = [0.0] * len(detectors)
+
+    # Readings of each lidar waiting to be output
+    pending_batches: "list[list[lidar_detection_batch.LidarDetectionBatch]]" = [
+        [] for _ in detectors
+    ]
+    pending_counts = [0] * len(detectors)
+
+    # Sensor id of the latest batches put in the output queue, the newest ones are those still
+    # in the queue (only needed for a bounded queue)
+    queued_sensor_ids = collections.deque(
+        maxlen=(
+            output_queue.max_size
+            if isinstance(output_queue, queue_wrapper.QueueWrapper) and output_queue.max_size > 0
+            else 0
+        )
     )
 
+    # Wait for the first reading of each lidar in turn
+    batch_timeout = port_timeout / len(detectors)
+
     while not controller.is_exit_requested():
         controller.check_pause()
 
-        result, value = detector.run()
-        if not result:
-            continue
+        for sensor_id, detector in enumerate(detectors):
+            if (
+                statistics_period > 0
+                and time.monotonic_ns() - statistics[sensor_id].timestamp >= statistics_period * 1e9
+            ):
+                current_statistics = detector.lidar.get_link_statistics()
+                print(
+                    f"Detection: lidar {sensor_id} link: "
+                    f"{current_statistics.report(statistics[sensor_id])}"
+                )
+                print(f"Detection: lidar {sensor_id} gate: {detector.gate}")
+                statistics[sensor_id] = current_statistics
+
+            # Do not wait past the output deadline of any pending reading
+            timeout = batch_timeout
+            for batches in pending_batches:
+                if len(batches) > 0:
+                    deadline = batches[0].timestamps[0] + batch_max_latency * 1e9
+                    timeout = min(timeout, max(deadline - time.monotonic_ns(), 0) / 1e9)
+
+            result, batch = detector.run_batch(
+                batch_max_samples - pending_counts[sensor_id], timeout
+            )
+
+            current_overrun_count = detector.lidar.overrun_count()
+            if current_overrun_count > overrun_counts[sensor_id]:
+                print(
+                    f"Detection: {current_overrun_count - overrun_counts[sensor_id]} "
+                    f"lidar {sensor_id} readings lost."
+                )
+                overrun_counts[sensor_id] = current_overrun_count
+
+            if result:
+                pending_batches[sensor_id].append(batch)
+                pending_counts[sensor_id] += len(batch)
+
+            batches = pending_batches[sensor_id]
+            if len(batches) == 0:
+                continue
+
+            lag = (time.monotonic_ns() - batches[0].timestamps[0]) / 1e9
+            if pending_counts[sensor_id] < batch_max_samples and lag < batch_max_latency:
+                continue
+
+            if len(batches) > 1:
+                _, batch = lidar_detection_batch.LidarDetectionBatch.create(
+                    np.concatenate([pending.distances for pending in batches]),
+                    np.concatenate([pending.angles for pending in batches]),
+                    np.concatenate([pending.timestamps for pending in batches]),
+                    detector.sensor_id,
+                    detector.mount_yaw_offset,
+                )
+            else:
+                batch = batches[0]
+
+            pending_batches[sensor_id] = []
+            pending_counts[sensor_id] = 0
+
+            governor = governors[sensor_id]
+            if (
+                governor is not None
+                and detector.lidar.update_rate is not None
+                and time.monotonic() - governor_check_times[sensor_id] >= GOVERNOR_CHECK_PERIOD
+            ):
+                governor_check_times[sensor_id] = time.monotonic()
+                current_update_rate = detector.lidar.update_rate
+                # Only the backlog of this lidar, against its share of the output, so that
+                # a lidar that backs up the output does not slow down the others
+                if isinstance(output_queue, shared_memory_ring.SharedMemoryRing):
+                    queue_size = output_queue.backlog(sensor_id)
+                    queue_max_size = output_queue.capacity
+                else:
+                    queued_count = min(output_queue.queue.qsize(), len(queued_sensor_ids))
+                    queue_size = list(queued_sensor_ids)[
+                        len(queued_sensor_ids) - queued_count :
+                    ].count(sensor_id)
+                    queue_max_size = output_queue.max_size
+
+                if queue_max_size > 0:
+                    queue_max_size = max(queue_max_size // len(detectors), 1)
+
+                result, new_update_rate = governor.run(
+                    current_update_rate, queue_size, queue_max_size, lag, time.monotonic()
+                )
+                if result and detector.set_rate(
+                    new_update_rate, governor.rotate_speed_for(new_update_rate)
+                ):
+                    print(
+                        f"Detection: lidar {sensor_id} update rate changed "
+                        f"from {current_update_rate} to {new_update_rate}."
+                    )
+                elif result:
+                    print(
+                        f"Detection: could not change lidar {sensor_id} update rate "
+                        f"to {new_update_rate}."
+                    )
+
+            if isinstance(output_queue, shared_memory_ring.SharedMemoryRing):
+                output_queue.write(
+                    batch.timestamps,
+                    batch.distances,
+                    batch.angles,
+                    batch.sensor_id,
+                    batch.mount_yaw_offset,
+                )
+            elif output_queue.put(batch):
+                queued_sensor_ids.append(sensor_id)
 
-        output_queue.queue.put(value)
+    multiplexer.stop()
+    for detector in detectors:
+        detector.stop()
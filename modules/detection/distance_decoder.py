@@ -0,0 +1,90 @@
+"""
+Vectorized decoding of Lightware distance packets (command 44, distance and yaw angle output).
+"""
+
+import numpy as np
+
+from . import crc16
+
+
+DISTANCE_COMMAND = 44
+PACKET_SIZE = 10  # bytes
+# Start byte, flags (5 byte payload, read) and command of every distance packet
+SIGNATURE = bytes([0xAA, 0x40, 0x01, DISTANCE_COMMAND])
+
+PACKET_DTYPE = np.dtype(
+    [
+        ("start", np.uint8),
+        ("flags", "<u2"),
+        ("command", np.uint8),
+        ("distance", "<u2"),  # cm
+        ("yaw", "<u2"),  # centidegrees, negative angles are offset by YAW_ANGLE_OFFSET
+        ("crc", "<u2"),
+    ]
+)
+
+MAX_DISTANCE = 50  # metres
+MIN_ANGLE = -170  # degrees, exclusive
+MAX_ANGLE = 170  # degrees, exclusive
+
+YAW_ANGLE_THRESHOLD = 32000
+YAW_ANGLE_OFFSET = 65535
+
+__CRC_TABLE = np.array(crc16.TABLE, dtype=np.uint32)
+__SIGNATURE_ARRAY = np.frombuffer(SIGNATURE, dtype=np.uint8)
+
+
+def packet_mask(raw: np.ndarray) -> np.ndarray:
+    """
+    raw: bytes of candidate packets, shape (count, PACKET_SIZE).
+    Returns whether each candidate is a distance packet with a valid CRC.
+    """
+    mask = (raw[:, : len(SIGNATURE)] == __SIGNATURE_ARRAY).all(axis=1)
+
+    crc = np.zeros(len(raw), dtype=np.uint32)
+    for column in range(0, PACKET_SIZE - crc16.CRC_SIZE):
+        crc = ((crc << 8) & 0xFFFF) ^ __CRC_TABLE[(crc >> 8) ^ raw[:, column]]
+
+    received_crc = raw[:, -2].astype(np.uint32) | (raw[:, -1].astype(np.uint32) << 8)
+
+    return mask & (crc == received_crc)
+
+
+def find_packets(data: "bytes | bytearray | memoryview") -> np.ndarray:
+    """
+    Find every distance packet with a valid CRC in data, wherever it starts.
+    Returns a copy of the packets as PACKET_DTYPE records, in order.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if len(buffer) < PACKET_SIZE:
+        return np.empty(0, dtype=PACKET_DTYPE)
+
+    windows = np.lib.stride_tricks.sliding_window_view(buffer, PACKET_SIZE)
+    offsets = np.flatnonzero(windows[:, 0] == SIGNATURE[0])
+    offsets = offsets[packet_mask(windows[offsets])]
+
+    # A valid packet could contain another one by chance, keep the first of any overlap
+    if len(offsets) > 1:
+        keep = np.ones(len(offsets), dtype=bool)
+        keep[1:] = np.diff(offsets) >= PACKET_SIZE
+        offsets = offsets[keep]
+
+    return windows[offsets].copy().view(PACKET_DTYPE).reshape(-1)
+
+
+def decode(packets: np.ndarray) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+    """
+    packets: PACKET_DTYPE records.
+    Returns distances (m), angles (degrees) and whether each reading is valid
+    (distance between 0 and MAX_DISTANCE, angle strictly between MIN_ANGLE and MAX_ANGLE).
+    """
+    distances = packets["distance"] / 100.0
+
+    yaw = packets["yaw"].astype(np.int32)
+    yaw = np.where(yaw > YAW_ANGLE_THRESHOLD, yaw - YAW_ANGLE_OFFSET, yaw)
+    angles = yaw / 100.0
+
+    valid = (distances >= 0) & (distances <= MAX_DISTANCE)
+    valid &= (angles > MIN_ANGLE) & (angles < MAX_ANGLE)
+
+    return distances, angles, valid
@@ -3,11 +3,26 @@ Lightware SF45/B Driver
 Lidar documentation: https://support.lightware.co.za/sf45b/#/commands
 """
 
+import collections
+import concurrent.futures
+import select
+import threading
 import time
 import struct
+import typing
+
+import numpy as np
 import serial
 
+from . import crc16
+from . import distance_decoder
+from . import link_statistics
+from . import packet_framer
+from . import reading_buffer
+from . import serial_capture
+
 
+# pylint: disable-next=too-many-instance-attributes
 class LidarDriver:
     """
     Wrapper for lidar
@@ -16,6 +31,22 @@ class LidarDriver:
     MIN_UPDATE_RATE = 1
     MAX_UPDATE_RATE = 12
 
+    # Sample frequency in Hz of each update rate setting
+    UPDATE_RATE_FREQUENCIES = {
+        1: 50,
+        2: 100,
+        3: 200,
+        4: 400,
+        5: 500,
+        6: 625,
+        7: 1000,
+        8: 1250,
+        9: 1538,
+        10: 2000,
+        11: 2500,
+        12: 5000,
+    }
+
     MAX_HIGH_ANGLE = 170  # degrees
     MIN_HIGH_ANGLE = 5  # degrees
 
@@ -45,41 +76,59 @@ class LidarDriver:
     __ENABLE_STREAMING_DATA = [5, 0, 0, 0]
     __DISABLE_STREAMING_DATA = [0, 0, 0, 0]
 
-    __YAW_ANGLE_THRESHOLD = 32000
-    __YAW_ANGLE_OFFSET = 65535
+    __READING_BUFFER_CAPACITY = 65536  # readings (about 13 s at 5000 Hz)
+    __READER_TIMEOUT = 0.1  # seconds
+    __ITER_CHUNK_SIZE = 1024  # readings
+    __CONFIGURE_TIMEOUT = 0.25  # seconds per attempt
+    __STREAM_PROBE_TIMEOUT = 0.05  # seconds, longer than the slowest sample period
 
-    def __init__(self, port_name: str, baudrate: int, timeout: float) -> None:
+    def __init__(
+        self,
+        port_name: str,
+        baudrate: int,
+        timeout: float,
+        port: "serial.Serial | serial_capture.CaptureReplay | None" = None,
+    ) -> None:
         """
         port_name: port that the lidar is connected to
         baudrate: baudrate of the lidar port
         timeout: timeout for connecting to serial port
+        port: already open port or capture replay to use instead of opening port_name
         """
-        self.serial_port = serial.Serial(port_name, baudrate, timeout=timeout)
-        self._packet_parse_state = 0
-        self._packet_payload_size = 0
-        self._packet_size = 0
-        self._packet_data = []
+        if port is None:
+            port = serial.Serial(port_name, baudrate, timeout=timeout)
 
-    @staticmethod
-    def __create_crc(data: "list[int]") -> int:
-        """
-        Create a CRC-16-CCITT 0x1021 hash of the specified data.
-        """
-        crc = 0
+        self.serial_port = port
+        self.__framer = packet_framer.PacketFramer()
+
+        # Distance readings
+        self.__readings = reading_buffer.ReadingBuffer(self.__READING_BUFFER_CAPACITY)
 
-        for i in data:
-            code = crc >> 8
-            code ^= int(i)
-            code ^= code >> 4
-            crc = crc << 8
-            crc ^= code
-            code = code << 5
-            crc ^= code
-            code = code << 7
-            crc ^= code
-            crc &= 0xFFFF
+        # Requests waiting for a response, oldest first for each command
+        self.__pending_requests: "dict[int, collections.deque[concurrent.futures.Future]]" = {}
+        self.__pending_requests_lock = threading.Lock()
+        self.__write_lock = threading.Lock()
 
-        return crc
+        # Notified after every read that received data
+        self.__received = threading.Condition()
+        # Held by the caller reading the port when there is no reader thread
+        self.__receive_lock = threading.Lock()
+
+        self.__reader_thread = None
+        self.__reader_stop = threading.Event()
+        # Another thread reads the port with poll()
+        self.__external_reader = False
+
+        # Last update rate setting written, None if unknown
+        self.update_rate = None
+
+        # Distance packets received, including invalid readings
+        self.__distance_packet_count = 0
+        self.__rejected_sample_count = 0
+        self.__last_sample_timestamp = 0
+
+        # Raw byte stream capture, None if not capturing
+        self.__capture = None
 
     def __build_packet(self, command: int, write: int, data: "list[int]" = None) -> bytearray:
         """
@@ -92,82 +141,310 @@ class LidarDriver:
         flags = (payload_length << 6) | (write & 0x1)
         packet_bytes = [0xAA, flags & 0xFF, (flags >> 8) & 0xFF, command]
         packet_bytes.extend(data)
-        crc = self.__create_crc(packet_bytes)
+        crc = crc16.create_crc(packet_bytes)
         packet_bytes.append(crc & 0xFF)
         packet_bytes.append((crc >> 8) & 0xFF)
 
         return bytearray(packet_bytes)
 
-    def __parse_packet(self, byte: int) -> bool:
+    @staticmethod
+    def __read_available(port: serial.Serial, timeout: float) -> bytes:
         """
-        Check for packet in byte stream.
+        Wait (up to timeout) for data and read every byte currently available.
         """
-        if self._packet_parse_state == 0:
-            if byte == 0xAA:
-                self._packet_parse_state = 1
-                self._packet_data = [0xAA]
+        try:
+            file_descriptor = port.fileno()
+        except (AttributeError, OSError):
+            file_descriptor = None
 
-            return False
+        if file_descriptor is None:
+            # Port cannot be polled (e.g. Windows), block on the port timeout instead
+            data = port.read(1)
+            if len(data) == 0:
+                return data
+
+            return data + port.read(port.in_waiting)
+
+        readable, _, _ = select.select([file_descriptor], [], [], max(timeout, 0))
+        if not readable:
+            return b""
 
-        if self._packet_parse_state == 1:
-            self._packet_parse_state = 2
-            self._packet_data.append(byte)
+        return port.read(max(port.in_waiting, 1))
+
+    def __dispatch_response(self, packet: bytes) -> None:
+        """
+        Complete the oldest request waiting for a response to this command.
+        Responses nobody is waiting for are dropped.
+        """
+        # Completed under the lock, so that a request timing out cannot be cancelled in between
+        with self.__pending_requests_lock:
+            requests = self.__pending_requests.get(packet[3])
+            if not requests:
+                return
+
+            requests.popleft().set_result(packet)
+
+    def __receive(self, port: serial.Serial, timeout: float) -> None:
+        """
+        Wait (up to timeout) for data and dispatch every packet received so far by command.
+        Distance readings go to the reading buffer, all other packets complete requests.
+
+        Data is stamped with the time it was read at (the time it was captured at for a replay).
+        Distance packets arrive at the update rate, so the time of each earlier reading in the
+        same read is back-computed from its order.
+        """
+        data = self.__read_available(port, timeout)
+        if len(data) == 0:
+            return
+
+        if isinstance(port, serial_capture.CaptureReplay):
+            timestamp = port.timestamp
+            if timestamp < self.__last_sample_timestamp:
+                # Next capture session, with an unrelated clock
+                self.__last_sample_timestamp = 0
+        else:
+            timestamp = time.monotonic_ns()
+
+        capture = self.__capture
+        if capture is not None:
+            capture.write(timestamp, data)
+
+        distance_packets, packets = self.__framer.feed_distance_packets(data)
+        for packet in packets:
+            self.__dispatch_response(packet)
+
+        count = len(distance_packets)
+        if count > 0:
+            self.__distance_packet_count += count
+
+            sample_period = 0
+            if self.update_rate is not None:
+                sample_period = 1_000_000_000 // self.UPDATE_RATE_FREQUENCIES[self.update_rate]
+
+            # Invalid readings still take up a sample period.
+            # Reads can arrive in bursts, so keep sample times between the previous sample
+            # and the time of this read.
+            first_timestamp = max(
+                timestamp - (count - 1) * sample_period,
+                self.__last_sample_timestamp + sample_period,
+            )
+            timestamps = np.minimum(
+                first_timestamp + np.arange(count, dtype=np.int64) * sample_period, timestamp
+            )
+            self.__last_sample_timestamp = int(timestamps[-1])
+
+            distances, angles, valid = distance_decoder.decode(distance_packets)
+            self.__rejected_sample_count += count - int(np.count_nonzero(valid))
+            self.__readings.push_many(timestamps[valid], distances[valid], angles[valid])
+
+        with self.__received:
+            self.__received.notify_all()
+
+    def __wait_until(
+        self, port: serial.Serial, is_done: "typing.Callable[[], bool]", timeout: float
+    ) -> bool:
+        """
+        Wait (up to timeout) until is_done() is True.
+        Without the reader thread, the waiting caller reads the port itself.
+        """
+        end_time = time.monotonic() + timeout
 
+        while not is_done():
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            if not self.__has_reader():
+                # pylint: disable-next=consider-using-with
+                if self.__receive_lock.acquire(timeout=remaining):
+                    try:
+                        self.__receive(port, remaining)
+                    finally:
+                        self.__receive_lock.release()
+                continue
+
+            with self.__received:
+                if not is_done():
+                    self.__received.wait(remaining)
+
+        return True
+
+    def __reader_loop(self, port: serial.Serial) -> None:
+        """
+        Reader thread: receive continuously until stopped.
+        """
+        while not self.__reader_stop.is_set():
+            try:
+                self.__receive(port, self.__READER_TIMEOUT)
+            except serial.SerialException as exception:
+                print(f"Lidar reader stopped: {exception}")
+                break
+
+    def __has_reader(self) -> bool:
+        """
+        Whether the port is read by a thread other than the callers waiting for data.
+        """
+        return self.__reader_thread is not None or self.__external_reader
+
+    def set_external_reader(self, enabled: bool) -> bool:
+        """
+        Declare that another thread (e.g. a LidarMultiplexer) reads the port by calling poll().
+        While enabled, all reads of the port are done by that thread.
+        """
+        if enabled and self.__reader_thread is not None:
             return False
 
-        if self._packet_parse_state == 2:
-            self._packet_parse_state = 3
-            self._packet_data.append(byte)
-            self._packet_payload_size = (self._packet_data[1] | (self._packet_data[2] << 8)) >> 6
-            self._packet_payload_size += 2
-            self._packet_size = 3
+        self.__external_reader = enabled
+        return True
 
-            if self._packet_payload_size > 1019:
-                self._packet_parse_state = 0
+    def poll(self, port: serial.Serial) -> None:
+        """
+        External reader: read and dispatch everything already received, without waiting.
+        """
+        self.__receive(port, 0)
 
+    def start_reader(self, port: serial.Serial) -> bool:
+        """
+        Start a background thread that reads the port into the reading buffer.
+        While it runs, all reads of the port are done by that thread.
+        """
+        if self.__has_reader():
             return False
 
-        if self._packet_parse_state == 3:
-            self._packet_data.append(byte)
-            self._packet_size += 1
-            self._packet_payload_size -= 1
+        self.__reader_stop.clear()
+        self.__reader_thread = threading.Thread(
+            target=self.__reader_loop, args=(port,), name="lidar_reader", daemon=True
+        )
+        self.__reader_thread.start()
+        return True
 
-            if self._packet_payload_size == 0:
-                self._packet_parse_state = 0
-                crc = self._packet_data[self._packet_size - 2] | (
-                    self._packet_data[self._packet_size - 1] << 8
-                )
-                verify_crc = self.__create_crc(self._packet_data[0:-2])
+    def stop_reader(self) -> None:
+        """
+        Stop the background reader thread.
+        """
+        if self.__reader_thread is None:
+            return
 
-                if crc == verify_crc:
-                    return True
+        self.__reader_stop.set()
+        self.__reader_thread.join()
+        self.__reader_thread = None
 
+    def get_link_statistics(self) -> link_statistics.LinkStatistics:
+        """
+        Snapshot of the link quality counters.
+        """
+        update_frequency = None
+        if self.update_rate is not None:
+            update_frequency = self.UPDATE_RATE_FREQUENCIES[self.update_rate]
+
+        return link_statistics.LinkStatistics(
+            time.monotonic_ns(),
+            self.__framer.byte_count,
+            self.__framer.packet_count,
+            self.__framer.crc_failure_count,
+            self.__framer.oversized_count,
+            self.__framer.discarded_byte_count,
+            self.__distance_packet_count,
+            self.__rejected_sample_count,
+            self.__readings.overrun_count,
+            update_frequency,
+        )
+
+    def start_capture(self, path: str) -> bool:
+        """
+        Append every byte read from the port, with the time it was read at, to a capture file.
+        """
+        if self.__capture is not None:
             return False
 
-        return False
+        try:
+            self.__capture = serial_capture.CaptureWriter(path)
+        except OSError as exception:
+            print(f"Could not open lidar capture {path}: {exception}")
+            return False
 
-    def __wait_for_packet(
-        self, port: serial.Serial, command: int, timeout: float = 1
-    ) -> "list[int] | None":
+        return True
+
+    def stop_capture(self) -> None:
+        """
+        Stop capturing and close the capture file.
+        """
+        capture = self.__capture
+        if capture is None:
+            return
+
+        self.__capture = None
+        capture.close()
+
+    def overrun_count(self) -> int:
+        """
+        Number of readings lost because the reading buffer was full.
+        """
+        return self.__readings.overrun_count
+
+    def __wait_for_readings(
+        self, port: serial.Serial, max_count: int, timeout: float
+    ) -> np.ndarray:
         """
-        Wait (up to timeout) for a packet of the specified command to be received.
+        Wait (up to timeout) for the first reading, then take up to max_count readings
+        that have already been received.
         """
-        self._packet_parse_state = 0
-        self._packet_data = []
-        self._packet_payload_size = 0
-        self._packet_size = 0
+        self.__wait_until(port, lambda: len(self.__readings) > 0, timeout)
+
+        if not self.__has_reader() and 0 < len(self.__readings) < max_count:
+            # Collect what else has already arrived
+            self.__wait_until(port, lambda: len(self.__readings) >= max_count, 0)
 
-        end_time = time.time() + timeout
+        return self.__readings.pop(max_count)
 
-        while time.time() < end_time:
-            c = port.read(1)
+    def __is_streaming(self, port: serial.Serial, timeout: float) -> bool:
+        """
+        Check whether distance packets arrive within timeout.
+        """
+        start_count = self.__distance_packet_count
 
-            if len(c) != 0:
-                b = ord(c)
-                if self.__parse_packet(b) is True:
-                    if self._packet_data[3] == command:
-                        return self._packet_data
-        return None
+        return self.__wait_until(port, lambda: self.__distance_packet_count != start_count, timeout)
+
+    def __submit_requests(
+        self, port: serial.Serial, requests: "list[tuple[int, int, list[int]]]"
+    ) -> "list[concurrent.futures.Future]":
+        """
+        Send (command, write, data) request packets back to back.
+        Returns a future for each request, completed with its response packet.
+        """
+        futures = []
+        packets = []
+        with self.__pending_requests_lock:
+            for command, write, data in requests:
+                future = concurrent.futures.Future()
+                self.__pending_requests.setdefault(command, collections.deque()).append(future)
+                futures.append(future)
+                packets.append(self.__build_packet(command, write, data))
+
+        with self.__write_lock:
+            port.write(b"".join(packets))
+
+        return futures
+
+    def __wait_for_futures(
+        self, port: serial.Serial, futures: "list[concurrent.futures.Future]", timeout: float
+    ) -> bool:
+        """
+        Wait (up to timeout) until every request has its response.
+        """
+        return self.__wait_until(port, lambda: all(future.done() for future in futures), timeout)
+
+    def __cancel_request(self, command: int, future: concurrent.futures.Future) -> bool:
+        """
+        Stop waiting for the response to a request.
+        Returns False if the response has already arrived.
+        """
+        with self.__pending_requests_lock:
+            requests = self.__pending_requests.get(command)
+            if requests is not None and future in requests:
+                requests.remove(future)
+
+            return future.cancel()
 
     def __execute_command(
         self,
@@ -177,27 +454,56 @@ class LidarDriver:
         data: "list[int]" = None,
         timeout: float = 1,
         retries: int = 4,
-    ) -> "tuple[bool, list[int]]":
+    ) -> "tuple[bool, bytes | None]":
         """
         Send a request packet and wait (up to timeout) for a response.
         """
         if data is None:
             data = []
 
-        packet = self.__build_packet(command, write, data)
+        responses = self.__execute_commands(port, [(command, write, data)], timeout, retries)
+        if command not in responses:
+            return False, None
 
+        return True, responses[command]
+
+    def __execute_commands(
+        self,
+        port: serial.Serial,
+        requests: "list[tuple[int, int, list[int]]]",
+        timeout: float = 1,
+        retries: int = 4,
+    ) -> "dict[int, bytes]":
+        """
+        Send (command, write, data) request packets back to back, then wait (up to timeout)
+        for the responses, which are matched by command as they arrive.
+        Only requests without a response are sent again.
+
+        Returns the response of each command that succeeded.
+        """
+        responses = {}
         for _ in range(0, retries):
-            port.write(packet)
+            futures = self.__submit_requests(port, requests)
+
+            self.__wait_for_futures(port, futures, timeout)
 
-            response = self.__wait_for_packet(port, command, timeout)
+            remaining_requests = []
+            for request, future in zip(requests, futures):
+                # The response can still arrive up to the cancellation
+                if not self.__cancel_request(request[0], future):
+                    responses[request[0]] = future.result()
+                    continue
 
-            if response is not None:
-                return True, response
+                remaining_requests.append(request)
 
-        return False, None
+            requests = remaining_requests
+            if len(requests) == 0:
+                break
+
+        return responses
 
     @staticmethod
-    def get_str16_from_packet(packet: "list[int]") -> str:
+    def get_str16_from_packet(packet: bytes) -> str:
         """
         Extract a 16 byte string from a string packet.
         """
@@ -236,6 +542,82 @@ class LidarDriver:
 
         return True
 
+    def configure(
+        self,
+        port: serial.Serial,
+        update_rate: int,
+        low_angle: float,
+        high_angle: float,
+        speed: int,
+        use_last_return: bool = False,
+    ) -> bool:
+        """
+        Set update rate, distance output, angles and speed, then enable streaming.
+        All settings are sent at once rather than waiting for each response in turn.
+
+        If the lidar is already streaming (e.g. after a restart), the current settings are read
+        back and only the ones that differ are written.
+        """
+        if update_rate < self.MIN_UPDATE_RATE or update_rate > self.MAX_UPDATE_RATE:
+            return False
+
+        if low_angle < self.MIN_LOW_ANGLE or low_angle > self.MAX_LOW_ANGLE:
+            return False
+
+        if high_angle < self.MIN_HIGH_ANGLE or high_angle > self.MAX_HIGH_ANGLE:
+            return False
+
+        if speed < self.MAX_SPEED or speed > self.MIN_SPEED:
+            return False
+
+        distance_output = self.__USE_FIRST_RETURN_DATA
+        if use_last_return:
+            distance_output = self.__USE_LAST_RETURN_DATA
+
+        requests = [
+            (self.__UPDATE_RATE, self.__WRITE, [update_rate]),
+            (self.__DISTANCE_OUTPUT, self.__WRITE, distance_output),
+            (self.__LOW_ANGLE, self.__WRITE, list(struct.pack("<f", low_angle))),
+            (self.__HIGH_ANGLE, self.__WRITE, list(struct.pack("<f", high_angle))),
+            (self.__ROTATION_SPEED, self.__WRITE, [speed & 0xFF, (speed >> 8) & 0xFF]),
+            # Stream last so that the settings apply to the first reading
+            (self.__STREAM, self.__WRITE, self.__ENABLE_STREAMING_DATA),
+        ]
+
+        if self.__is_streaming(port, self.__STREAM_PROBE_TIMEOUT):
+            read_requests = [(command, self.__NO_WRITE, []) for command, _, _ in requests]
+            current_settings = self.__execute_commands(
+                port, read_requests, self.__CONFIGURE_TIMEOUT
+            )
+
+            # An update rate read back outside the valid settings (e.g. corrupt) is written again
+            if self.__UPDATE_RATE in current_settings:
+                current_update_rate = current_settings[self.__UPDATE_RATE][4:-2]
+                if (
+                    len(current_update_rate) == 1
+                    and current_update_rate[0] in self.UPDATE_RATE_FREQUENCIES
+                ):
+                    self.update_rate = current_update_rate[0]
+                else:
+                    del current_settings[self.__UPDATE_RATE]
+
+            # Responses carry the setting in the same encoding as the request
+            requests = [
+                (command, write, data)
+                for command, write, data in requests
+                if command not in current_settings or list(current_settings[command][4:-2]) != data
+            ]
+
+        if len(requests) == 0:
+            return True
+
+        responses = self.__execute_commands(port, requests, self.__CONFIGURE_TIMEOUT)
+
+        if self.__UPDATE_RATE in responses:
+            self.update_rate = update_rate
+
+        return len(responses) == len(requests)
+
     def set_update_rate(self, port: serial.Serial, value: int) -> bool:
         """
         Set the frequency of the lidar.
@@ -261,6 +643,7 @@ class LidarDriver:
         if not result:
             return False
 
+        self.update_rate = value
         return True
 
     def set_default_distance_output(
@@ -310,28 +693,49 @@ class LidarDriver:
         """
         Gets lidar reading (distance in m and angle).
         """
-        response = self.__wait_for_packet(port, self.__DISTANCE, timeout)
+        records = self.__wait_for_readings(port, 1, timeout)
 
-        if response is None:
+        if len(records) == 0:
             return -1, 0
 
-        distance_in_cm = response[4] << 0 | response[5] << 8
-        distance_in_metres = distance_in_cm / 100.0
+        return float(records["distance"][0]), float(records["angle"][0])
 
-        if distance_in_metres < 0 or distance_in_metres > 50:
-            return -1, 0
+    def iter_readings(
+        self, port: serial.Serial, timeout: float = 1
+    ) -> "typing.Iterator[tuple[float, float, int]]":
+        """
+        Yields valid lidar readings (distance in m, angle, sample time in ns) as they arrive.
+        Stops when no reading arrives within timeout.
+        """
+        while True:
+            records = self.__wait_for_readings(port, self.__ITER_CHUNK_SIZE, timeout)
 
-        yaw_angle = response[6] << 0 | response[7] << 8
+            if len(records) == 0:
+                return
 
-        if yaw_angle > self.__YAW_ANGLE_THRESHOLD:
-            yaw_angle = yaw_angle - self.__YAW_ANGLE_OFFSET
+            yield from zip(
+                records["distance"].tolist(),
+                records["angle"].tolist(),
+                records["timestamp"].tolist(),
+            )
 
-        yaw_angle /= 100.0
+    def read_batch(
+        self, port: serial.Serial, max_samples: int, timeout: float = 1
+    ) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+        """
+        Gets up to max_samples valid lidar readings.
+        Waits (up to timeout) for the first reading, then returns every reading already received.
 
-        if yaw_angle <= self.MIN_LOW_ANGLE or yaw_angle >= self.MAX_HIGH_ANGLE:
-            return -1, 0
+        Returns contiguous arrays of distances in m, angles in degrees
+        and sample times in ns (monotonic clock).
+        """
+        records = self.__wait_for_readings(port, max_samples, timeout)
 
-        return distance_in_metres, yaw_angle
+        return (
+            np.ascontiguousarray(records["distance"]),
+            np.ascontiguousarray(records["angle"]),
+            np.ascontiguousarray(records["timestamp"]),
+        )
 
     def set_speed(self, port: serial.Serial, value: int) -> bool:
         """
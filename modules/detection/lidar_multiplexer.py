@@ -0,0 +1,93 @@
+"""
+Reads several lidars from a single thread.
+"""
+
+import selectors
+import threading
+
+import serial
+
+from . import lidar_driver
+
+
+class LidarMultiplexer:
+    """
+    Waits on the serial ports of every added lidar at once and reads each one as data arrives,
+    instead of running a reader thread per lidar.
+    """
+
+    __SELECT_TIMEOUT = 0.1  # seconds
+
+    def __init__(self) -> None:
+        self.__selector = selectors.DefaultSelector()
+        self.__lidars: "list[lidar_driver.LidarDriver]" = []
+        self.__file_descriptors: "list[int]" = []
+
+        self.__thread = None
+        self.__stop = threading.Event()
+
+    def add(self, lidar: lidar_driver.LidarDriver) -> bool:
+        """
+        Read this lidar from now on. Must be called before start().
+        Returns False if the port cannot be waited on (e.g. on Windows) or is already read.
+        """
+        if self.__thread is not None:
+            return False
+
+        try:
+            file_descriptor = lidar.serial_port.fileno()
+        except (AttributeError, OSError):
+            return False
+
+        if not lidar.set_external_reader(True):
+            return False
+
+        self.__selector.register(file_descriptor, selectors.EVENT_READ, lidar)
+        self.__lidars.append(lidar)
+        self.__file_descriptors.append(file_descriptor)
+        return True
+
+    def __loop(self) -> None:
+        """
+        Reader thread: read every port with data until stopped.
+        """
+        while not self.__stop.is_set():
+            for key, _ in self.__selector.select(self.__SELECT_TIMEOUT):
+                lidar = key.data
+                try:
+                    lidar.poll(lidar.serial_port)
+                except (serial.SerialException, OSError) as exception:
+                    print(
+                        f"Lidar multiplexer stopped reading {lidar.serial_port.name}: {exception}"
+                    )
+                    self.__selector.unregister(key.fileobj)
+
+    def start(self) -> bool:
+        """
+        Start the reader thread.
+        """
+        if self.__thread is not None:
+            return False
+
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__loop, name="lidar_multiplexer", daemon=True)
+        self.__thread.start()
+        return True
+
+    def stop(self) -> None:
+        """
+        Stop the reader thread and hand reading back to the lidars.
+        """
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+        registered = self.__selector.get_map()
+        for lidar, file_descriptor in zip(self.__lidars, self.__file_descriptors):
+            if file_descriptor in registered:
+                self.__selector.unregister(file_descriptor)
+            lidar.set_external_reader(False)
+
+        self.__lidars = []
+        self.__file_descriptors = []
@@ -0,0 +1,93 @@
+"""
+Lidar link quality counters.
+"""
+
+
+# pylint: disable-next=too-many-instance-attributes
+class LinkStatistics:
+    """
+    Snapshot of the lidar link counters since the driver was created.
+    """
+
+    def __init__(
+        self,
+        timestamp: int,
+        byte_count: int,
+        packet_count: int,
+        crc_failure_count: int,
+        oversized_count: int,
+        discarded_byte_count: int,
+        sample_count: int,
+        rejected_sample_count: int,
+        overrun_count: int,
+        update_frequency: "int | None",
+    ) -> None:
+        """
+        timestamp: time of the snapshot in ns (monotonic clock)
+        byte_count: bytes read from the port
+        packet_count: packets framed with a valid CRC
+        crc_failure_count: candidate packets with an invalid CRC
+        oversized_count: candidate headers with a payload larger than the maximum
+        discarded_byte_count: bytes that were not part of a valid packet
+        sample_count: distance packets received
+        rejected_sample_count: distance packets with an out of range distance or angle
+        overrun_count: readings lost because the reading buffer was full
+        update_frequency: configured sample frequency in Hz, None if unknown
+        """
+        self.timestamp = timestamp
+        self.byte_count = byte_count
+        self.packet_count = packet_count
+        self.crc_failure_count = crc_failure_count
+        self.oversized_count = oversized_count
+        self.discarded_byte_count = discarded_byte_count
+        self.sample_count = sample_count
+        self.rejected_sample_count = rejected_sample_count
+        self.overrun_count = overrun_count
+        self.update_frequency = update_frequency
+
+    def sample_rate(self, previous: "LinkStatistics") -> float:
+        """
+        Distance packets received per second since the previous snapshot.
+        """
+        duration = (self.timestamp - previous.timestamp) / 1e9
+        if duration <= 0:
+            return 0.0
+
+        return (self.sample_count - previous.sample_count) / duration
+
+    def report(self, previous: "LinkStatistics") -> str:
+        """
+        Rates and counts since the previous snapshot.
+        """
+        duration = (self.timestamp - previous.timestamp) / 1e9
+        if duration <= 0:
+            return "no time elapsed"
+
+        sample_rate = self.sample_rate(previous)
+        expected = ""
+        if self.update_frequency is not None:
+            expected = (
+                f" of {self.update_frequency} Hz ({100 * sample_rate / self.update_frequency:.1f}%)"
+            )
+
+        return (
+            f"{sample_rate:.0f} samples/s{expected}, "
+            f"{(self.byte_count - previous.byte_count) / duration:.0f} bytes/s, "
+            f"{self.packet_count - previous.packet_count} packets, "
+            f"{self.crc_failure_count - previous.crc_failure_count} CRC failures, "
+            f"{self.oversized_count - previous.oversized_count} oversized, "
+            f"{self.discarded_byte_count - previous.discarded_byte_count} bytes discarded, "
+            f"{self.rejected_sample_count - previous.rejected_sample_count} samples rejected, "
+            f"{self.overrun_count - previous.overrun_count} readings lost"
+        )
+
+    def __str__(self) -> str:
+        """
+        String representation.
+        """
+        return (
+            f"{self.__class__.__name__}: bytes: {self.byte_count}, packets: {self.packet_count}, "
+            f"CRC failures: {self.crc_failure_count}, oversized: {self.oversized_count}, "
+            f"discarded bytes: {self.discarded_byte_count}, samples: {self.sample_count}, "
+            f"rejected samples: {self.rejected_sample_count}, overruns: {self.overrun_count}"
+        )
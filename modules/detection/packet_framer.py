@@ -0,0 +1,200 @@
+"""
+Frames Lightware binary protocol packets from a serial byte stream.
+"""
+
+import numpy as np
+
+from . import crc16
+from . import distance_decoder
+
+
+# pylint: disable-next=too-many-instance-attributes
+class PacketFramer:
+    """
+    Extracts every complete, CRC verified packet from buffered serial data.
+
+    Packet layout:
+    0xAA | flags (2 bytes, payload length in the upper 10 bits) | payload (command, data) | CRC (2 bytes)
+    """
+
+    START_BYTE = 0xAA
+    HEADER_SIZE = 3
+    CRC_SIZE = crc16.CRC_SIZE
+
+    # Largest accepted payload (including CRC) in bytes
+    MAX_PAYLOAD_SIZE = 1019
+
+    __DEFAULT_CAPACITY = 4096  # bytes
+
+    def __init__(self, capacity: int = __DEFAULT_CAPACITY) -> None:
+        """
+        capacity: initial size of the receive buffer in bytes (grows if required).
+        """
+        self.__buffer = bytearray(capacity)
+        self.__start = 0
+        self.__end = 0
+
+        # Link quality counters
+        self.byte_count = 0  # bytes fed
+        self.packet_count = 0  # valid packets framed
+        self.crc_failure_count = 0
+        self.oversized_count = 0  # headers with a payload larger than MAX_PAYLOAD_SIZE
+        self.discarded_byte_count = 0  # bytes skipped while searching for a valid packet
+
+    def reset(self) -> None:
+        """
+        Discard any buffered bytes.
+        """
+        self.discarded_byte_count += self.__end - self.__start
+        self.__start = 0
+        self.__end = 0
+
+    def buffered_size(self) -> int:
+        """
+        Number of bytes waiting for the rest of their packet.
+        """
+        return self.__end - self.__start
+
+    def resync_count(self) -> int:
+        """
+        Number of times framing was lost and the next start byte had to be searched for.
+        """
+        return self.crc_failure_count + self.oversized_count
+
+    def __append(self, data: "bytes | bytearray") -> None:
+        """
+        Copy data to the end of the buffer, reusing the space of already framed bytes.
+        """
+        size = len(data)
+        self.byte_count += size
+        if self.__end + size > len(self.__buffer):
+            # Move the unframed bytes to the front
+            remaining = self.__end - self.__start
+            self.__buffer[0:remaining] = self.__buffer[self.__start : self.__end]
+            self.__start = 0
+            self.__end = remaining
+
+            if self.__end + size > len(self.__buffer):
+                self.__buffer.extend(bytes(self.__end + size - len(self.__buffer)))
+
+        self.__buffer[self.__end : self.__end + size] = data
+        self.__end += size
+
+    def __distance_run_length(self, start: int, end: int) -> int:
+        """
+        Number of consecutive valid distance packets from start.
+        """
+        count = (end - start) // distance_decoder.PACKET_SIZE
+        if count == 0:
+            return 0
+
+        raw = np.frombuffer(
+            self.__buffer, dtype=np.uint8, count=count * distance_decoder.PACKET_SIZE, offset=start
+        ).reshape(count, distance_decoder.PACKET_SIZE)
+        mask = distance_decoder.packet_mask(raw)
+        if mask.all():
+            return count
+
+        return int(np.argmin(mask))
+
+    def feed(self, data: "bytes | bytearray") -> "list[bytes]":
+        """
+        Add received bytes and return all packets completed by them.
+        Bytes that do not belong to a valid packet are skipped.
+        """
+        if len(data) > 0:
+            self.__append(data)
+
+        return self.__frame(None)
+
+    def feed_distance_packets(self, data: "bytes | bytearray") -> "tuple[np.ndarray, list[bytes]]":
+        """
+        Same as feed(), but distance packets are returned separately, as
+        distance_decoder.PACKET_DTYPE records, and their runs are checked all at once.
+        Returns the distance packets and every other packet, each in order.
+        """
+        if len(data) > 0:
+            self.__append(data)
+
+        distance_runs = []
+        packets = self.__frame(distance_runs)
+        if len(distance_runs) == 0:
+            return np.empty(0, dtype=distance_decoder.PACKET_DTYPE), packets
+
+        if len(distance_runs) == 1:
+            return distance_runs[0], packets
+
+        return np.concatenate(distance_runs), packets
+
+    def __frame(self, distance_runs: "list[np.ndarray] | None") -> "list[bytes]":
+        """
+        Frame the buffered bytes. If distance_runs is a list, runs of distance packets
+        are added to it instead of being returned.
+        """
+        packets = []
+        buffer = self.__buffer
+        view = memoryview(buffer)
+        start = self.__start
+        end = self.__end
+        discarded_byte_count = 0
+
+        while True:
+            next_start = buffer.find(self.START_BYTE, start, end)
+            if next_start < 0:
+                next_start = end
+
+            discarded_byte_count += next_start - start
+            start = next_start
+            if start == end:
+                break
+
+            if distance_runs is not None and buffer.startswith(distance_decoder.SIGNATURE, start):
+                count = self.__distance_run_length(start, end)
+                if count > 0:
+                    distance_runs.append(
+                        np.frombuffer(
+                            buffer, dtype=distance_decoder.PACKET_DTYPE, count=count, offset=start
+                        ).copy()
+                    )
+                    self.packet_count += count
+                    start += count * distance_decoder.PACKET_SIZE
+                    continue
+
+            if end - start < self.HEADER_SIZE:
+                break
+
+            payload_size = (buffer[start + 1] | (buffer[start + 2] << 8)) >> 6
+            if payload_size + self.CRC_SIZE > self.MAX_PAYLOAD_SIZE:
+                # Not a real header, resynchronise on the next start byte
+                self.oversized_count += 1
+                discarded_byte_count += 1
+                start += 1
+                continue
+
+            crc_start = start + self.HEADER_SIZE + payload_size
+            packet_end = crc_start + self.CRC_SIZE
+            if packet_end > end:
+                break
+
+            crc = buffer[crc_start] | (buffer[crc_start + 1] << 8)
+            if crc != crc16.create_crc(view[start:crc_start]):
+                self.crc_failure_count += 1
+                discarded_byte_count += 1
+                start += 1
+                continue
+
+            self.packet_count += 1
+            packets.append(bytes(buffer[start:packet_end]))
+            start = packet_end
+
+        view.release()
+        self.discarded_byte_count += discarded_byte_count
+
+        if start == end:
+            start = 0
+            end = 0
+
+        self.__start = start
+        self.__end = end
+
+        return packets
@@ -0,0 +1,107 @@
+"""
+Adjusts the lidar sample rate to what the rest of the pipeline can process.
+"""
+
+from . import lidar_driver
+
+
+# pylint: disable-next=too-many-instance-attributes
+class RateGovernor:
+    """
+    Steps the update rate down when the output queue backs up or readings are processed late,
+    and back up (to at most the configured rate) once the backlog has cleared.
+
+    The rotation speed is scaled with the sample frequency so that the angle between samples
+    stays the same.
+    """
+
+    def __init__(
+        self,
+        min_update_rate: int,
+        max_update_rate: int,
+        rotate_speed: int,
+        max_lag: float,
+        hold_time: float,
+        high_queue_fill: float = 0.75,
+        low_queue_fill: float = 0.25,
+    ) -> None:
+        """
+        min_update_rate: lowest update rate setting to step down to
+        max_update_rate: configured update rate setting, never exceeded
+        rotate_speed: configured rotation speed at max_update_rate
+        max_lag: time in seconds after sampling that readings must be processed by
+        hold_time: time in seconds to wait after a change, and with no backlog before stepping up
+        high_queue_fill: fraction of the output queue that is a backlog
+        low_queue_fill: fraction of the output queue that is no backlog
+        """
+        self.min_update_rate = max(min_update_rate, lidar_driver.LidarDriver.MIN_UPDATE_RATE)
+        self.max_update_rate = max_update_rate
+        self.rotate_speed = rotate_speed
+        self.max_lag = max_lag
+        self.hold_time = hold_time
+        self.high_queue_fill = high_queue_fill
+        self.low_queue_fill = low_queue_fill
+
+        # Seconds (monotonic clock), None if never
+        self.__last_change_time = None
+        self.__clear_since_time = None
+
+    def rotate_speed_for(self, update_rate: int) -> int:
+        """
+        Rotation speed that keeps the configured angle between samples at this update rate.
+        """
+        frequencies = lidar_driver.LidarDriver.UPDATE_RATE_FREQUENCIES
+        speed = round(
+            self.rotate_speed * frequencies[self.max_update_rate] / frequencies[update_rate]
+        )
+
+        return min(
+            max(speed, lidar_driver.LidarDriver.MAX_SPEED), lidar_driver.LidarDriver.MIN_SPEED
+        )
+
+    def run(
+        self, update_rate: int, queue_size: int, queue_max_size: int, lag: float, now: float
+    ) -> "tuple[bool, int | None]":
+        """
+        update_rate: current update rate setting
+        queue_size: number of items in the output queue
+        queue_max_size: capacity of the output queue, 0 if unbounded
+        lag: time in seconds between sampling and processing of the oldest reading just processed
+        now: current time in seconds (monotonic clock)
+
+        Returns the update rate to change to, if a change is required.
+        """
+        queue_fill = 0.0
+        if queue_max_size > 0:
+            queue_fill = queue_size / queue_max_size
+
+        holding = self.__last_change_time is not None and (
+            now - self.__last_change_time < self.hold_time
+        )
+
+        if queue_fill >= self.high_queue_fill or lag >= self.max_lag:
+            self.__clear_since_time = None
+
+            # Give the previous change time to take effect
+            if update_rate <= self.min_update_rate or holding:
+                return False, None
+
+            self.__last_change_time = now
+            return True, update_rate - 1
+
+        if queue_fill > self.low_queue_fill or lag >= self.max_lag / 2:
+            self.__clear_since_time = None
+            return False, None
+
+        if self.__clear_since_time is None:
+            self.__clear_since_time = now
+
+        if update_rate >= self.max_update_rate or holding:
+            return False, None
+
+        if now - self.__clear_since_time < self.hold_time:
+            return False, None
+
+        self.__last_change_time = now
+        self.__clear_since_time = now
+        return True, update_rate + 1
@@ -0,0 +1,109 @@
+"""
+Preallocated ring buffer of lidar readings.
+"""
+
+import numpy as np
+
+
+class ReadingBuffer:
+    """
+    Fixed-width (sample time, distance, angle) records shared between one producer thread
+    and one consumer thread.
+
+    The producer only advances the write index and the consumer only advances the read index,
+    so no lock is required. Readings that do not fit are dropped and counted as overruns.
+    """
+
+    RECORD_DTYPE = np.dtype(
+        [
+            ("timestamp", np.int64),  # ns, monotonic clock
+            ("distance", np.float64),  # metres
+            ("angle", np.float64),  # degrees
+        ]
+    )
+
+    def __init__(self, capacity: int) -> None:
+        """
+        capacity: maximum number of buffered readings.
+        """
+        self.capacity = capacity
+        self.__records = np.zeros(capacity, dtype=self.RECORD_DTYPE)
+
+        # Total number of readings written and read, indices are taken modulo capacity
+        self.__write_index = 0
+        self.__read_index = 0
+
+        self.overrun_count = 0
+
+    def __len__(self) -> int:
+        """
+        Number of readings waiting to be read.
+        """
+        return self.__write_index - self.__read_index
+
+    def push(self, timestamp: int, distance: float, angle: float) -> bool:
+        """
+        Producer: add a single reading.
+        Returns False if the buffer is full and the reading was dropped.
+        """
+        if self.__write_index - self.__read_index >= self.capacity:
+            self.overrun_count += 1
+            return False
+
+        self.__records[self.__write_index % self.capacity] = (timestamp, distance, angle)
+        self.__write_index += 1
+        return True
+
+    def push_many(self, timestamps: np.ndarray, distances: np.ndarray, angles: np.ndarray) -> int:
+        """
+        Producer: add readings from arrays of equal length.
+        Returns the number of readings added, the rest are dropped.
+        """
+        free = self.capacity - (self.__write_index - self.__read_index)
+        count = min(len(timestamps), free)
+        self.overrun_count += len(timestamps) - count
+        if count <= 0:
+            return 0
+
+        start = self.__write_index % self.capacity
+        first = min(count, self.capacity - start)
+
+        records = self.__records
+        records["timestamp"][start : start + first] = timestamps[:first]
+        records["distance"][start : start + first] = distances[:first]
+        records["angle"][start : start + first] = angles[:first]
+
+        second = count - first
+        if second > 0:
+            records["timestamp"][:second] = timestamps[first:count]
+            records["distance"][:second] = distances[first:count]
+            records["angle"][:second] = angles[first:count]
+
+        self.__write_index += count
+        return count
+
+    def pop(self, max_count: int) -> np.ndarray:
+        """
+        Consumer: remove up to max_count of the oldest readings.
+        Returns a copy of the records.
+        """
+        count = min(max_count, self.__write_index - self.__read_index)
+        if count <= 0:
+            return np.empty(0, dtype=self.RECORD_DTYPE)
+
+        start = self.__read_index % self.capacity
+        first = min(count, self.capacity - start)
+
+        if first == count:
+            records = self.__records[start : start + count].copy()
+        else:
+            records = np.concatenate((self.__records[start:], self.__records[: count - first]))
+
+        self.__read_index += count
+        return records
+
+    def clear(self) -> None:
+        """
+        Consumer: discard all buffered readings.
+        """
+        self.__read_index = self.__write_index
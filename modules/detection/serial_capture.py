@@ -0,0 +1,246 @@
+"""
+Capture of the raw lidar serial byte stream and replay of captures.
+
+File format (little endian), one or more sessions, each appended when capturing starts:
+session header: magic (8 bytes), session start wall clock time in ns (int64),
+    session start monotonic clock time in ns (int64)
+records: read time in ns (int64, monotonic clock), size in bytes (uint32), data
+
+Read times of different sessions may be from different monotonic clocks (e.g. after a reboot).
+A record never starts with the magic, as a monotonic time that large would be centuries.
+"""
+
+import io
+import mmap
+import struct
+import threading
+import time
+
+
+MAGIC = b"SF45CAP2"
+SESSION_HEADER_FORMAT = "<8sqq"
+RECORD_HEADER_FORMAT = "<qI"
+
+SESSION_HEADER_SIZE = struct.calcsize(SESSION_HEADER_FORMAT)
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_HEADER_FORMAT)
+
+
+class CaptureWriter:
+    """
+    Appends every chunk of bytes read from the serial port to a capture file, as a new session.
+    """
+
+    def __init__(self, path: str, flush_period: float = 1.0) -> None:
+        """
+        path: capture file, created if it does not exist and appended to otherwise.
+        flush_period: time in seconds between writes to disk, which limits what is lost
+            if the process is terminated without closing the capture.
+        """
+        self.flush_period = flush_period
+        self.__file = open(path, "ab")  # pylint: disable=consider-using-with
+        self.__lock = threading.Lock()
+
+        self.__file.write(
+            struct.pack(SESSION_HEADER_FORMAT, MAGIC, time.time_ns(), time.monotonic_ns())
+        )
+        self.__file.flush()
+        self.__last_flush_time = time.monotonic()
+
+        self.bytes_written = 0
+
+    def write(self, timestamp: int, data: bytes) -> None:
+        """
+        Append data read at timestamp (ns, monotonic clock).
+        """
+        with self.__lock:
+            if self.__file.closed:
+                return
+
+            self.__file.write(struct.pack(RECORD_HEADER_FORMAT, timestamp, len(data)))
+            self.__file.write(data)
+            self.bytes_written += len(data)
+
+            now = time.monotonic()
+            if now - self.__last_flush_time >= self.flush_period:
+                self.__file.flush()
+                self.__last_flush_time = now
+
+    def close(self) -> None:
+        """
+        Flush and close the capture file.
+        """
+        with self.__lock:
+            self.__file.close()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CaptureReplay:
+    """
+    Serves a memory-mapped capture file through the subset of the serial port interface
+    used by LidarDriver, so that only the chunks being read are paged in.
+
+    Sessions are served one after the other, or only one of them. Real time replay starts
+    each session without waiting for the gap between sessions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        real_time: bool = True,
+        timeout: float = 0.1,
+        session: "int | None" = None,
+    ) -> None:
+        """
+        path: capture file.
+        real_time: serve each chunk at the time it was captured, otherwise as fast as possible.
+        timeout: maximum time in seconds a read waits for the next chunk.
+        session: index of the only session to serve, None to serve every session.
+        """
+        self.real_time = real_time
+        self.timeout = timeout
+        self.session = session
+
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if not self.__is_session_header(0):
+            self.__map.close()
+            raise ValueError(f"Not a lidar capture: {path}")
+
+        self.__position = 0
+        # Start and end of the unread part of the current chunk
+        self.__chunk_start = 0
+        self.__chunk_end = 0
+        self.__ended = False
+
+        self.__first_timestamp = None
+        self.__replay_start_time = None
+
+        # Index of the current session, and the wall clock and monotonic clock times (ns)
+        # it started at
+        self.session_index = -1
+        self.start_time = None
+        self.monotonic_start_time = None
+
+        # Capture time (ns, monotonic clock) of the last chunk served, the read time of its data
+        self.timestamp = None
+
+    def fileno(self) -> int:
+        """
+        Replays cannot be polled.
+        """
+        raise io.UnsupportedOperation("fileno")
+
+    def close(self) -> None:
+        """
+        Release the memory map.
+        """
+        self.__map.close()
+
+    def at_end(self) -> bool:
+        """
+        Whether every chunk has been served.
+        """
+        if self.__chunk_start != self.__chunk_end:
+            return False
+
+        return self.__ended or self.__position >= len(self.__map)
+
+    def __is_session_header(self, position: int) -> bool:
+        """
+        Whether a session header starts at the position.
+        """
+        return (
+            position + SESSION_HEADER_SIZE <= len(self.__map)
+            and self.__map[position : position + len(MAGIC)] == MAGIC
+        )
+
+    def __skip_session(self) -> None:
+        """
+        Move past the records of the current session.
+        """
+        while self.__position + RECORD_HEADER_SIZE <= len(self.__map):
+            if self.__is_session_header(self.__position):
+                return
+
+            _, size = struct.unpack_from(RECORD_HEADER_FORMAT, self.__map, self.__position)
+            self.__position += RECORD_HEADER_SIZE + size
+
+    def __next_record(self) -> bool:
+        """
+        Move to the next record, past any session headers.
+        Returns False if there are no more records to serve.
+        """
+        while not self.__ended and self.__is_session_header(self.__position):
+            if self.session is not None and self.session_index == self.session:
+                self.__ended = True
+                break
+
+            _, self.start_time, self.monotonic_start_time = struct.unpack_from(
+                SESSION_HEADER_FORMAT, self.__map, self.__position
+            )
+            self.__position += SESSION_HEADER_SIZE
+            self.session_index += 1
+
+            # The clock of each session is unrelated to the previous one
+            self.__first_timestamp = None
+
+            if self.session is not None and self.session_index < self.session:
+                self.__skip_session()
+
+        return not self.__ended and self.__position + RECORD_HEADER_SIZE <= len(self.__map)
+
+    def __next_chunk(self, timeout: float) -> bool:
+        """
+        Make the next chunk current, waiting (up to timeout) until it is due in real time.
+        """
+        if not self.__next_record():
+            return False
+
+        timestamp, size = struct.unpack_from(RECORD_HEADER_FORMAT, self.__map, self.__position)
+
+        if self.real_time:
+            now = time.monotonic_ns()
+            if self.__first_timestamp is None:
+                self.__first_timestamp = timestamp
+                self.__replay_start_time = now
+
+            delay = (timestamp - self.__first_timestamp) - (now - self.__replay_start_time)
+            if delay > timeout * 1e9:
+                time.sleep(timeout)
+                return False
+
+            if delay > 0:
+                time.sleep(delay / 1e9)
+
+        self.__chunk_start = self.__position + RECORD_HEADER_SIZE
+        self.__chunk_end = min(self.__chunk_start + size, len(self.__map))
+        self.__position = self.__chunk_end
+        self.timestamp = timestamp
+        return True
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        Number of bytes of the current chunk not yet read.
+        """
+        return self.__chunk_end - self.__chunk_start
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Read up to size bytes, waiting (up to timeout) for the next chunk if the current one is done.
+        """
+        if self.__chunk_start == self.__chunk_end:
+            if not self.__next_chunk(self.timeout):
+                return b""
+
+        end = min(self.__chunk_start + size, self.__chunk_end)
+        data = self.__map[self.__chunk_start : end]
+        self.__chunk_start = end
+        return data
+
+    def write(self, data: bytes) -> int:
+        """
+        Commands cannot be sent to a replay, they are discarded.
+        """
+        return len(data)
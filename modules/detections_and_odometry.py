@@ -2,13 +2,17 @@
 LiDAR detection and local odometry data structure.
 """
 
+import numpy as np
+
 from . import drone_odometry_local
 from . import lidar_detection
+from . import lidar_detection_batch
 
 
 class DetectionsAndOdometry:
     """
     Contains LiDAR readings and current local odometry.
+    Readings are kept as individual detections or as batches.
     """
 
     __create_key = object()
@@ -22,18 +26,32 @@ class DetectionsAndOdometry:
         """
         Combines lidar readings with local odometry
         """
-        if len(detections) == 0:
+        return cls.create_with_batches(detections, [], local_odometry)
+
+    @classmethod
+    def create_with_batches(
+        cls,
+        detections: "list[lidar_detection.LidarDetection]",
+        batches: "list[lidar_detection_batch.LidarDetectionBatch]",
+        local_odometry: drone_odometry_local.DroneOdometryLocal,
+    ) -> "tuple[bool, DetectionsAndOdometry | None]":
+        """
+        Combines lidar readings, individual and in batches, with local odometry.
+        Batches are kept as arrays.
+        """
+        if len(detections) == 0 and len(batches) == 0:
             return False, None
 
         if local_odometry is None:
             return False, None
 
-        return True, DetectionsAndOdometry(cls.__create_key, detections, local_odometry)
+        return True, DetectionsAndOdometry(cls.__create_key, detections, batches, local_odometry)
 
     def __init__(
         self,
         create_key: object,
         detections: "list[lidar_detection.LidarDetection]",
+        batches: "list[lidar_detection_batch.LidarDetectionBatch]",
         local_odometry: drone_odometry_local.DroneOdometryLocal,
     ) -> None:
         """
@@ -41,12 +59,47 @@ class DetectionsAndOdometry:
         """
         assert create_key is DetectionsAndOdometry.__create_key, "Use create() method"
 
-        self.detections = detections
+        self.batches = batches
         self.odometry = local_odometry
 
+        self.__detections = detections
+        self.__batch_detections = None
+
+    @property
+    def detections(self) -> "list[lidar_detection.LidarDetection]":
+        """
+        All readings as LidarDetection objects, those of batches are made on first use.
+        """
+        if self.__batch_detections is None:
+            self.__batch_detections = []
+            for batch in self.batches:
+                self.__batch_detections.extend(batch.to_detections())
+
+        return self.__detections + self.__batch_detections
+
+    def min_distance(self) -> float:
+        """
+        Distance of the closest reading in metres, infinity if there are no valid readings.
+        """
+        distance = min((detection.distance for detection in self.__detections), default=np.inf)
+        for batch in self.batches:
+            # -1 is an invalid reading
+            valid = batch.distances[batch.distances != -1]
+            if len(valid) > 0:
+                distance = min(distance, float(valid.min()))
+
+        return float(distance)
+
+    def __len__(self) -> int:
+        """
+        Number of readings.
+        """
+        return len(self.__detections) + sum(len(batch) for batch in self.batches)
+
     def __str__(self) -> str:
         """
         String representation.
         """
-        detections_str = ", ".join(str(detection) for detection in self.detections)
-        return f"{self.__class__.__name__}, Detections ({len(self.detections)}): {detections_str}, str{self.odometry}"
+        detections_str = ", ".join(str(detection) for detection in self.__detections)
+        batches_str = ", ".join(str(batch) for batch in self.batches)
+        return f"{self.__class__.__name__}, Detections ({len(self.__detections)}): {detections_str}, Batches ({len(self.batches)}): {batches_str}, str{self.odometry}"
@@ -3,6 +3,7 @@ Creates flight controller and produces local drone odometry coupled with a times
 """
 
 import math
+import time
 
 from modules import decision_command
 from modules import drone_odometry_local
@@ -19,6 +20,14 @@ class FlightInterface:
 
     __create_key = object()
 
+    # Heading change setpoints (MAVLink SET_POSITION_TARGET_LOCAL_NED): velocity in the local
+    # north, east, down frame and yaw, ignoring position, acceleration and yaw rate
+    __MAV_FRAME_LOCAL_NED = 1
+    __VELOCITY_AND_YAW_TYPE_MASK = 0b0000100111000111
+
+    # The autopilot stops the drone if velocity setpoints are not repeated within 3 seconds
+    __SETPOINT_PERIOD = 1.0  # seconds
+
     @classmethod
     def create(
         cls, address: str, timeout_home: float, first_waypoint_distance_tolerance: float
@@ -83,6 +92,11 @@ class FlightInterface:
         self.first_waypoint_distance_tolerance = first_waypoint_distance_tolerance
         self.__run = False
 
+        # Heading in degrees and speed in metres per second flown in GUIDED mode,
+        # None while flying the mission or stopped
+        self.__heading_setpoint = None
+        self.__last_setpoint_time = 0.0
+
     def __distance_to_first_waypoint_squared(
         self, local_position: drone_odometry_local.DronePositionLocal
     ) -> float:
@@ -117,6 +131,12 @@ class FlightInterface:
 
         flight_mode = drone_odometry_local.FlightMode(flight_mode.value)
 
+        if (
+            self.__heading_setpoint is not None
+            and time.monotonic() - self.__last_setpoint_time >= self.__SETPOINT_PERIOD
+        ):
+            self.__send_heading_setpoint()
+
         if not self.__run:
             distance_to_first_waypoint_squared = self.__distance_to_first_waypoint_squared(
                 local_position
@@ -140,6 +160,10 @@ class FlightInterface:
             return self.resume_handler()
         if command.command == decision_command.DecisionCommand.CommandType.STOP_MISSION_AND_HALT:
             return self.stop_handler()
+        if command.command == decision_command.DecisionCommand.CommandType.HEADING_CHANGE:
+            return self.heading_change_handler(command.heading, command.speed)
+
+        print(f"Flight interface: Unsupported command: {command}")
         return False
 
     def resume_handler(self) -> bool:
@@ -148,6 +172,7 @@ class FlightInterface:
         """
         result = self.controller.set_flight_mode("AUTO")
         if result:
+            self.__heading_setpoint = None
             print("Flight interface: Successfully set flight mode to AUTO.")
         return result
 
@@ -157,5 +182,59 @@ class FlightInterface:
         """
         result = self.controller.set_flight_mode("LOITER")
         if result:
+            self.__heading_setpoint = None
             print("Flight interface: Successfully set flight mode to LOITER.")
         return result
+
+    def heading_change_handler(self, heading: float, speed: float) -> bool:
+        """
+        Flies at a heading in degrees and a speed in metres per second in GUIDED mode,
+        until the mission is resumed (back to AUTO) or the drone is stopped.
+        """
+        if self.__heading_setpoint is None:
+            result = self.controller.set_flight_mode("GUIDED")
+            if not result:
+                return False
+
+            print("Flight interface: Successfully set flight mode to GUIDED.")
+
+        self.__heading_setpoint = (heading, speed)
+        result = self.__send_heading_setpoint()
+        if result:
+            print(f"Flight interface: Flying at heading {heading:.1f} degrees, {speed:.1f} m/s.")
+        return result
+
+    def __send_heading_setpoint(self) -> bool:
+        """
+        Sends the velocity and yaw of the heading setpoint to the drone.
+        """
+        heading, speed = self.__heading_setpoint
+        heading_in_radians = math.radians(heading)
+
+        drone = self.controller.drone
+        message = drone.message_factory.set_position_target_local_ned_encode(
+            0,
+            0,
+            0,
+            self.__MAV_FRAME_LOCAL_NED,
+            self.__VELOCITY_AND_YAW_TYPE_MASK,
+            0,
+            0,
+            0,
+            speed * math.cos(heading_in_radians),
+            speed * math.sin(heading_in_radians),
+            0,
+            0,
+            0,
+            0,
+            heading_in_radians,
+            0,
+        )
+        try:
+            drone.send_mavlink(message)
+        except OSError as exception:
+            print(f"Flight interface: Could not send heading setpoint: {exception}")
+            return False
+
+        self.__last_setpoint_time = time.monotonic()
+        return True
@@ -47,7 +47,7 @@ def flight_interface_worker(
                 print("Obstacle avoidance killed. Check flight mode.")
                 controller.request_exit()
                 break
-            odometry_out_queue.queue.put(value)
+            odometry_out_queue.put(value)
 
         try:
             command: decision_command.DecisionCommand = command_in_queue.queue.get_nowait()
@@ -2,6 +2,8 @@
 LiDAR detection data structure.
 """
 
+import time
+
 
 class LidarDetection:
     """
@@ -11,17 +13,41 @@ class LidarDetection:
     __create_key = object()
 
     @classmethod
-    def create(cls, distance: float, angle: float) -> "tuple[bool, LidarDetection | None]":
+    def create(
+        cls,
+        distance: float,
+        angle: float,
+        timestamp: "int | None" = None,
+        sensor_id: int = 0,
+        mount_yaw_offset: float = 0.0,
+    ) -> "tuple[bool, LidarDetection | None]":
         """
         Distance is in metres.
-        Angle is in degrees.
+        Angle is in degrees, relative to the lidar.
+        Timestamp is the sample time in nanoseconds (monotonic clock), defaults to now.
+        Sensor id identifies the lidar.
+        Mount yaw offset is the yaw of the lidar relative to the drone in degrees.
         """
         # lidar_driver.py returns -1 for an invalid LiDAR reading.
         if distance == -1:
             return False, None
-        return True, LidarDetection(cls.__create_key, distance, angle)
 
-    def __init__(self, create_key: object, distance: float, angle: float) -> None:
+        if timestamp is None:
+            timestamp = time.monotonic_ns()
+
+        return True, LidarDetection(
+            cls.__create_key, distance, angle, timestamp, sensor_id, mount_yaw_offset
+        )
+
+    def __init__(
+        self,
+        create_key: object,
+        distance: float,
+        angle: float,
+        timestamp: int,
+        sensor_id: int,
+        mount_yaw_offset: float,
+    ) -> None:
         """
         Private constructor, use create() method.
         """
@@ -29,9 +55,12 @@ class LidarDetection:
 
         self.distance = distance
         self.angle = angle
+        self.timestamp = timestamp
+        self.sensor_id = sensor_id
+        self.mount_yaw_offset = mount_yaw_offset
 
     def __str__(self) -> str:
         """
         String representation.
         """
-        return f"{self.__class__.__name__}: distance: {self.distance}, angle: {self.angle}. "
+        return f"{self.__class__.__name__}: distance: {self.distance}, angle: {self.angle}, timestamp: {self.timestamp}, sensor id: {self.sensor_id}, mount yaw offset: {self.mount_yaw_offset}. "
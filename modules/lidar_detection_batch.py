@@ -0,0 +1,109 @@
+"""
+Batch of LiDAR detections data structure.
+"""
+
+import numpy as np
+
+from . import lidar_detection
+
+
+class LidarDetectionBatch:
+    """
+    Consecutive lidar scans of one lidar, stored as arrays.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        timestamps: np.ndarray,
+        sensor_id: int = 0,
+        mount_yaw_offset: float = 0.0,
+    ) -> "tuple[bool, LidarDetectionBatch | None]":
+        """
+        Distances are in metres.
+        Angles are in degrees, relative to the lidar.
+        Timestamps are the sample times in nanoseconds (monotonic clock).
+        Sensor id identifies the lidar.
+        Mount yaw offset is the yaw of the lidar relative to the drone in degrees.
+        """
+        if len(distances) == 0:
+            return False, None
+
+        if len(distances) != len(angles) or len(distances) != len(timestamps):
+            return False, None
+
+        return True, LidarDetectionBatch(
+            cls.__create_key,
+            np.asarray(distances, dtype=np.float64),
+            np.asarray(angles, dtype=np.float64),
+            np.asarray(timestamps, dtype=np.int64),
+            sensor_id,
+            mount_yaw_offset,
+        )
+
+    def __init__(
+        self,
+        create_key: object,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        timestamps: np.ndarray,
+        sensor_id: int,
+        mount_yaw_offset: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert create_key is LidarDetectionBatch.__create_key, "Use create() method"
+
+        self.distances = distances
+        self.angles = angles
+        self.timestamps = timestamps
+        self.sensor_id = sensor_id
+        self.mount_yaw_offset = mount_yaw_offset
+
+    def __len__(self) -> int:
+        """
+        Number of detections.
+        """
+        return len(self.distances)
+
+    def copy(self) -> "LidarDetectionBatch":
+        """
+        Batch with its own copy of the arrays, for keeping a batch read from shared memory.
+        """
+        return LidarDetectionBatch(
+            LidarDetectionBatch.__create_key,
+            self.distances.copy(),
+            self.angles.copy(),
+            self.timestamps.copy(),
+            self.sensor_id,
+            self.mount_yaw_offset,
+        )
+
+    def to_detections(self) -> "list[lidar_detection.LidarDetection]":
+        """
+        Individual detections, in order.
+        """
+        detections = []
+        for distance, angle, timestamp in zip(
+            self.distances.tolist(), self.angles.tolist(), self.timestamps.tolist()
+        ):
+            result, detection = lidar_detection.LidarDetection.create(
+                distance, angle, timestamp, self.sensor_id, self.mount_yaw_offset
+            )
+            if not result:
+                continue
+
+            detections.append(detection)
+
+        return detections
+
+    def __str__(self) -> str:
+        """
+        String representation.
+        """
+        return f"{self.__class__.__name__}: detections: {len(self)}, sensor id: {self.sensor_id}, mount yaw offset: {self.mount_yaw_offset}, timestamps: {self.timestamps[0]} to {self.timestamps[-1]}. "
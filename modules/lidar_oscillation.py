@@ -2,39 +2,150 @@
 Representing a LiDAR Oscillation
 """
 
+import enum
+
+import numpy as np
+
 from . import lidar_detection
 
 
+class Direction(enum.Enum):
+    """
+    Enum for LiDAR scan direction.
+    """
+
+    UP = 1
+    DOWN = 2
+    NONE = 3
+
+
+# pylint: disable-next=too-many-instance-attributes
 class LidarOscillation:
     """
-    Class to represent a collection of LiDAR readings that make up an oscillation.
+    Class to represent a collection of LiDAR readings of one lidar that make up an oscillation.
+    The readings are stored as arrays, LidarDetection objects are only made if asked for.
     """
 
     __create_key = object()
 
     @classmethod
     def create(
-        cls, readings: list[lidar_detection.LidarDetection]
+        cls,
+        readings: list[lidar_detection.LidarDetection],
+        sweep_id: int = 0,
+        direction: Direction = Direction.NONE,
+        is_partial: bool = False,
     ) -> "tuple[bool, LidarOscillation | None]":
         """
         Create a new LidarOscillation object from a list of LidarReading objects.
+        Sweep id counts the sweeps of the lidar, direction is the direction of the sweep.
+        A partial oscillation is a sector of a sweep that is still in progress.
         """
         if not readings:
             return False, None
-        return True, LidarOscillation(cls.__create_key, readings)
+
+        count = len(readings)
+        return True, LidarOscillation(
+            cls.__create_key,
+            np.fromiter((reading.distance for reading in readings), np.float64, count),
+            np.fromiter((reading.angle for reading in readings), np.float64, count),
+            np.fromiter((reading.timestamp for reading in readings), np.int64, count),
+            readings[0].sensor_id,
+            readings[0].mount_yaw_offset,
+            sweep_id,
+            direction,
+            is_partial,
+            readings,
+        )
+
+    @classmethod
+    def create_from_arrays(
+        cls,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        timestamps: np.ndarray,
+        sensor_id: int = 0,
+        mount_yaw_offset: float = 0.0,
+        sweep_id: int = 0,
+        direction: Direction = Direction.NONE,
+        is_partial: bool = False,
+    ) -> "tuple[bool, LidarOscillation | None]":
+        """
+        Create a new LidarOscillation object from arrays of equal length, like
+        LidarDetectionBatch.create(), without making a LidarDetection for each reading.
+        """
+        if len(distances) == 0:
+            return False, None
+
+        if len(distances) != len(angles) or len(distances) != len(timestamps):
+            return False, None
+
+        return True, LidarOscillation(
+            cls.__create_key,
+            np.asarray(distances, dtype=np.float64),
+            np.asarray(angles, dtype=np.float64),
+            np.asarray(timestamps, dtype=np.int64),
+            sensor_id,
+            mount_yaw_offset,
+            sweep_id,
+            direction,
+            is_partial,
+            None,
+        )
 
     def __init__(
-        self, class_private_create_key: object, readings: list[lidar_detection.LidarDetection]
+        self,
+        class_private_create_key: object,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        timestamps: np.ndarray,
+        sensor_id: int,
+        mount_yaw_offset: float,
+        sweep_id: int,
+        direction: Direction,
+        is_partial: bool,
+        readings: "list[lidar_detection.LidarDetection] | None",
     ) -> None:
         """
         Private constructor, use create() method to instantiate.
         """
         assert class_private_create_key is LidarOscillation.__create_key, "Use the create() method"
 
-        self.readings = readings
-        angles = [reading.angle for reading in readings]
-        self.min_angle = min(angles)
-        self.max_angle = max(angles)
+        self.distances = distances
+        self.angles = angles
+        self.timestamps = timestamps
+        self.sensor_id = sensor_id
+        self.mount_yaw_offset = mount_yaw_offset
+        self.sweep_id = sweep_id
+        self.direction = direction
+        self.is_partial = is_partial
+        self.min_angle = float(angles.min())
+        self.max_angle = float(angles.max())
+
+        self.__readings = readings
+
+    @property
+    def readings(self) -> "list[lidar_detection.LidarDetection]":
+        """
+        Readings as LidarDetection objects, made on first use.
+        """
+        if self.__readings is None:
+            self.__readings = []
+            for distance, angle, timestamp in zip(
+                self.distances.tolist(), self.angles.tolist(), self.timestamps.tolist()
+            ):
+                _, reading = lidar_detection.LidarDetection.create(
+                    distance, angle, timestamp, self.sensor_id, self.mount_yaw_offset
+                )
+                self.__readings.append(reading)
+
+        return self.__readings
+
+    def __len__(self) -> int:
+        """
+        Number of readings.
+        """
+        return len(self.distances)
 
     def __str__(self) -> str:
         """
@@ -44,4 +155,4 @@ class LidarOscillation:
         for reading in self.readings:
             reading_strs.append(str(reading))
         formatted_readings = ", ".join(reading_strs)
-        return f"LidarOscillation: {len(self.readings)} readings, Min angle: {self.min_angle}, Max angle: {self.max_angle}, Readings: {formatted_readings}."
+        return f"LidarOscillation: sweep {self.sweep_id}, {self.direction.name}, partial: {self.is_partial}, {len(self.readings)} readings, Min angle: {self.min_angle}, Max angle: {self.max_angle}, Readings: {formatted_readings}."
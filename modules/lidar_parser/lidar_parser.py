@@ -2,37 +2,179 @@
 Module to parse LiDAR data, detect oscillations, and return oscillation objects.
 """
 
-import enum
+import numpy as np
 
 from modules import lidar_detection
+from modules import lidar_detection_batch
 from modules import lidar_oscillation
 
 
-class Direction(enum.Enum):
-    """
-    Enum for LiDAR scan direction.
-    """
+# Moved to lidar_oscillation so that oscillations can be tagged with it
+Direction = lidar_oscillation.Direction
+
+# Sign of the angle change in each direction
+DIRECTION_SIGNS = {Direction.UP: 1, Direction.DOWN: -1, Direction.NONE: 0}
+SIGN_DIRECTIONS = {sign: direction for direction, sign in DIRECTION_SIGNS.items()}
 
-    UP = 1
-    DOWN = 2
-    NONE = 3
 
+# Readings of the sweep in progress
+SWEEP_DTYPE = np.dtype([("distance", np.float64), ("angle", np.float64), ("timestamp", np.int64)])
 
+
+# pylint: disable-next=too-many-instance-attributes
 class LidarParser:
     """
     Class to handle parsing of LiDAR data stream and detecting complete oscillations.
+
+    Optionally also outputs partial oscillations, each time the current sweep covers another
+    sector, so that the start of a slow sweep is not held back until the sweep completes.
+
+    The sweep in progress is kept in arrays, objects are only made for output oscillations.
     """
 
-    def __init__(self) -> None:
+    # Readings the sweep buffer starts with room for, it grows as needed
+    __INITIAL_SWEEP_CAPACITY = 1024
+
+    def __init__(self, sector_width: float = 0.0) -> None:
         """
         Private constructor for LidarParser. Use create() method.
+
+        sector_width: angle in degrees covered by each partial oscillation,
+            0 to only output complete oscillations
         """
+        self.sector_width = sector_width
 
-        self.lidar_readings = []
         self.current_oscillation = None
 
         self.last_angle = None
         self.direction = Direction.NONE
+        self.sweep_id = 0
+
+        # Sweep in progress, the lidar is the one of the latest reading
+        self.__sweep = np.empty(self.__INITIAL_SWEEP_CAPACITY, SWEEP_DTYPE)
+        self.__sweep_length = 0
+        self.__sensor_id = 0
+        self.__mount_yaw_offset = 0.0
+
+        # First reading of the current sector, and the angle that the sector is measured from
+        self.__sector_start = 0
+        self.__sector_start_angle = None
+
+    def reset(self) -> None:
+        """
+        Discard the sweep in progress, the next reading starts a new sweep.
+        """
+        if self.last_angle is not None:
+            self.sweep_id += 1
+
+        self.last_angle = None
+        self.direction = Direction.NONE
+        self.__sweep_length = 0
+        self.__sector_start = 0
+        self.__sector_start_angle = None
+
+    @property
+    def lidar_readings(self) -> "list[lidar_detection.LidarDetection]":
+        """
+        Readings of the sweep in progress.
+        """
+        readings = []
+        for record in self.__sweep[: self.__sweep_length].tolist():
+            _, reading = lidar_detection.LidarDetection.create(
+                record[0], record[1], record[2], self.__sensor_id, self.__mount_yaw_offset
+            )
+            readings.append(reading)
+
+        return readings
+
+    def __append(
+        self,
+        distances: "np.ndarray | float",
+        angles: "np.ndarray | float",
+        timestamps: "np.ndarray | int",
+        count: int,
+    ) -> None:
+        """
+        Add count readings to the sweep in progress.
+        """
+        end = self.__sweep_length + count
+        if end > len(self.__sweep):
+            grown = np.empty(max(end, 2 * len(self.__sweep)), SWEEP_DTYPE)
+            grown[: self.__sweep_length] = self.__sweep[: self.__sweep_length]
+            self.__sweep = grown
+
+        records = self.__sweep[self.__sweep_length : end]
+        records["distance"] = distances
+        records["angle"] = angles
+        records["timestamp"] = timestamps
+        self.__sweep_length = end
+
+    def __oscillation(
+        self, start: int, end: int, is_partial: bool
+    ) -> "tuple[bool, lidar_oscillation.LidarOscillation | None]":
+        """
+        Oscillation of the readings of the sweep in progress from start up to end.
+        """
+        records = self.__sweep[start:end]
+        return lidar_oscillation.LidarOscillation.create_from_arrays(
+            records["distance"].copy(),
+            records["angle"].copy(),
+            records["timestamp"].copy(),
+            self.__sensor_id,
+            self.__mount_yaw_offset,
+            self.sweep_id,
+            self.direction,
+            is_partial,
+        )
+
+    def __complete_sweep(
+        self, distance: float, angle: float, timestamp: int, direction: Direction
+    ) -> "tuple[bool, lidar_oscillation.LidarOscillation | None]":
+        """
+        Output the sweep and start the next one, in the other direction, from the reading.
+        """
+        result, oscillation = self.__oscillation(0, self.__sweep_length, False)
+        self.sweep_id += 1
+        self.direction = direction
+        self.__sweep_length = 0
+        self.__append(distance, angle, timestamp, 1)
+        self.last_angle = angle
+        self.__sector_start = 0
+        self.__sector_start_angle = angle
+        return result, oscillation
+
+    def __complete_sector(
+        self, end: int
+    ) -> "tuple[bool, lidar_oscillation.LidarOscillation | None]":
+        """
+        Output the readings of the current sector up to end as a partial oscillation.
+        """
+        start = self.__sector_start
+        self.__sector_start = end
+        self.__sector_start_angle = float(self.__sweep["angle"][end - 1])
+        return self.__oscillation(start, end, True)
+
+    def __complete_sectors(self, angles: np.ndarray) -> "list[lidar_oscillation.LidarOscillation]":
+        """
+        Partial oscillations completed by the latest readings of the sweep, which have angles.
+        """
+        sign = DIRECTION_SIGNS[self.direction]
+        first = self.__sweep_length - len(angles)
+
+        oscillations = []
+        index = 0
+        while True:
+            # Angles only move in the sweep direction
+            covered = (angles[index:] - self.__sector_start_angle) * sign
+            index += int(np.searchsorted(covered, self.sector_width))
+            if index >= len(angles):
+                return oscillations
+
+            result, oscillation = self.__complete_sector(first + index + 1)
+            if result:
+                oscillations.append(oscillation)
+
+            index += 1
 
     def run(
         self, detection: lidar_detection.LidarDetection
@@ -41,30 +183,118 @@ class LidarParser:
         Process a single LidarDetection and return the oscillation if complete.
         """
         current_angle = detection.angle
+        self.__sensor_id = detection.sensor_id
+        self.__mount_yaw_offset = detection.mount_yaw_offset
 
         if self.last_angle is None:
             self.last_angle = current_angle
-            self.lidar_readings.append(detection)
+            self.__append(detection.distance, current_angle, detection.timestamp, 1)
+            self.__sector_start_angle = current_angle
             return False, None
 
         # Detect oscillation on angle change with correct direction reset
         if current_angle > self.last_angle and self.direction == Direction.DOWN:
-            result, oscillation = lidar_oscillation.LidarOscillation.create(self.lidar_readings)
-            self.direction = Direction.UP
-            self.lidar_readings = [detection]
-            self.last_angle = current_angle
-            return result, oscillation
+            return self.__complete_sweep(
+                detection.distance, current_angle, detection.timestamp, Direction.UP
+            )
 
         if current_angle < self.last_angle and self.direction == Direction.UP:
-            result, oscillation = lidar_oscillation.LidarOscillation.create(self.lidar_readings)
-            self.direction = Direction.DOWN
-            self.lidar_readings = [detection]
-            self.last_angle = current_angle
-            return result, oscillation
+            return self.__complete_sweep(
+                detection.distance, current_angle, detection.timestamp, Direction.DOWN
+            )
 
         if self.direction is Direction.NONE:
             self.direction = Direction.UP if current_angle > self.last_angle else Direction.DOWN
 
-        self.lidar_readings.append(detection)
+        self.__append(detection.distance, current_angle, detection.timestamp, 1)
         self.last_angle = current_angle
+
+        if (
+            self.sector_width > 0
+            and abs(current_angle - self.__sector_start_angle) >= self.sector_width
+        ):
+            return self.__complete_sector(self.__sweep_length)
+
         return False, None
+
+    def run_batch(
+        self, batch: lidar_detection_batch.LidarDetectionBatch
+    ) -> "tuple[bool, list[lidar_oscillation.LidarOscillation] | None]":
+        """
+        Process a batch of detections and return every oscillation (and partial oscillation)
+        it completes. Same as calling run() on each detection in order.
+        Works on the arrays of the batch, without making a LidarDetection for each reading.
+        """
+        valid = batch.distances != -1
+        distances = batch.distances[valid]
+        angles = batch.angles[valid]
+        timestamps = batch.timestamps[valid]
+        if len(angles) == 0:
+            return False, None
+
+        self.__sensor_id = batch.sensor_id
+        self.__mount_yaw_offset = batch.mount_yaw_offset
+
+        start = 0
+        if self.last_angle is None:
+            self.last_angle = float(angles[0])
+            self.__append(distances[0], angles[0], timestamps[0], 1)
+            self.__sector_start_angle = float(angles[0])
+            start = 1
+
+        # Angle change at each detection from start on
+        signs = np.sign(np.diff(angles[start:], prepend=self.last_angle)).astype(np.int8)
+        if len(signs) == 0:
+            return False, None
+
+        # The first change sets the direction, no change counts as down
+        initial_sign = DIRECTION_SIGNS[self.direction]
+        if initial_sign == 0 and signs[0] == 0:
+            signs[0] = -1
+
+        # Direction after each detection: sign of the latest change
+        latest_change = np.maximum.accumulate(np.where(signs != 0, np.arange(len(signs)), -1))
+        directions = np.where(latest_change >= 0, signs[np.maximum(latest_change, 0)], initial_sign)
+        previous_directions = np.concatenate(([initial_sign], directions[:-1]))
+
+        reversals = (
+            np.flatnonzero(
+                (signs != 0) & (previous_directions != 0) & (signs != previous_directions)
+            )
+            + start
+        )
+
+        oscillations = []
+        segment_start = start
+        for segment_end in reversals.tolist() + [len(angles)]:
+            self.__append(
+                distances[segment_start:segment_end],
+                angles[segment_start:segment_end],
+                timestamps[segment_start:segment_end],
+                segment_end - segment_start,
+            )
+            if segment_end > segment_start:
+                self.direction = SIGN_DIRECTIONS[int(directions[segment_end - 1 - start])]
+                if self.sector_width > 0:
+                    oscillations.extend(self.__complete_sectors(angles[segment_start:segment_end]))
+
+            if segment_end == len(angles):
+                break
+
+            result, oscillation = self.__complete_sweep(
+                float(distances[segment_end]),
+                float(angles[segment_end]),
+                int(timestamps[segment_end]),
+                SIGN_DIRECTIONS[int(directions[segment_end - start])],
+            )
+            if result:
+                oscillations.append(oscillation)
+
+            segment_start = segment_end + 1
+
+        self.last_angle = float(angles[-1])
+
+        if len(oscillations) == 0:
+            return False, None
+
+        return True, oscillations
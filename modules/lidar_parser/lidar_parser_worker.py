@@ -2,36 +2,78 @@
 Gets detections and outputs oscillations when complete.
 """
 
+import queue
+
 from . import lidar_parser
 from modules import lidar_detection
+from modules import lidar_detection_batch
 from modules import lidar_oscillation
 from worker import queue_wrapper
+from worker import shared_memory_ring
 from worker import worker_controller
 
 
+RING_TIMEOUT = 0.1  # seconds
+
+
 def lidar_oscillation_worker(
-    detection_in_queue: queue_wrapper.QueueWrapper,
+    sector_width: float,
+    detection_in_queue: "queue_wrapper.QueueWrapper | shared_memory_ring.SharedMemoryRingConsumer",
     oscillation_out_queue: queue_wrapper.QueueWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
     """
-    Feeding LidarParser continuously with a stream of LidarDetection.
+    Feeding LidarParser continuously with a stream of LidarDetection or LidarDetectionBatch,
+    one LidarParser for each lidar (sensor id).
+
+    sector_width: angle in degrees of the partial oscillations output while a sweep is in
+        progress, 0 to only output complete oscillations
     """
 
-    parser = lidar_parser.LidarParser()
-    if not parser:
-        print("Failed to initialise LidarParser.")
-        return
+    # Each lidar sweeps on its own, so readings of different lidars are parsed separately
+    parsers: "dict[int, lidar_parser.LidarParser]" = {}
+    # Batches discarded because they were overwritten in shared memory while being read
+    overwritten_count = 0
 
     while not controller.is_exit_requested():
         controller.check_pause()
 
-        lidar_reading: lidar_detection.LidarDetection = detection_in_queue.queue.get()
+        lidar_reading: "lidar_detection.LidarDetection | lidar_detection_batch.LidarDetectionBatch"
+        if isinstance(detection_in_queue, shared_memory_ring.SharedMemoryRingConsumer):
+            try:
+                lidar_reading = detection_in_queue.get(timeout=RING_TIMEOUT)
+            except queue.Empty:
+                continue
+        else:
+            lidar_reading = detection_in_queue.queue.get()
+
         if lidar_reading is None:
             break
-        result, oscillation = parser.run(lidar_reading)
+
+        if lidar_reading.sensor_id not in parsers:
+            parsers[lidar_reading.sensor_id] = lidar_parser.LidarParser(sector_width)
+        parser = parsers[lidar_reading.sensor_id]
+
+        if isinstance(lidar_reading, lidar_detection_batch.LidarDetectionBatch):
+            result, oscillations = parser.run_batch(lidar_reading)
+        else:
+            result, oscillation = parser.run(lidar_reading)
+            oscillations = [oscillation]
+
+        if isinstance(detection_in_queue, shared_memory_ring.SharedMemoryRingConsumer):
+            if detection_in_queue.is_overwritten():
+                # The oscillations and the sweep in progress may hold corrupt readings
+                overwritten_count += 1
+                print(
+                    "Lidar oscillation: lidar readings were overwritten while being read, "
+                    f"sweep discarded ({overwritten_count} times)."
+                )
+                parser.reset()
+                continue
+
         if not result:
             continue
 
-        print(f"Oscillation sent to VFH")
-        oscillation_out_queue.queue.put(oscillation)
+        for oscillation in oscillations:
+            print(f"Oscillation sent to VFH")
+            oscillation_out_queue.put(oscillation)
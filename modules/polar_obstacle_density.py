@@ -2,13 +2,15 @@
 Classes to store object densities as a histogram.
 """
 
+import numpy as np
+
 
 class SectorObstacleDensity:
     """
     Represents the obstacle density within a specific angular sector, measuring
     the level of obstruction in that sector based on LiDAR data.
 
-    Each sector has a width of 2 degrees, covering an angular range from -90 to +90 degrees.
+    Sectors are of equal width, set by the histogram they belong to.
     """
 
     __create_key = object()
@@ -56,25 +58,43 @@ class PolarObstacleDensity:
     Represents a collection of obstacle densities across multiple angular sectors
     for a single oscillation.
 
-    Contains a list of SectorObstacleDensity objects that store the obstacle density for each individual sector
+    Stores the density of each sector in an array, sectors of equal width starting at angle_start.
+    Can be updated in place as oscillations arrive, with the densities decaying over time.
     """
 
     __create_key = object()
 
     @classmethod
     def create(
-        cls, sector_densities: list[SectorObstacleDensity]
+        cls,
+        densities: np.ndarray,
+        angle_start: float,
+        sector_width: float,
+        timestamp: "int | None" = None,
     ) -> "tuple[bool, PolarObstacleDensity | None]":
         """
-        Create a new PolarObstacleDensity object from a list of SectorObstacleDensity objects.
+        Create a new PolarObstacleDensity object from an array of sector densities.
 
         Parameters:
-        - sector_densities: List of SectorDensity objects.
+        - densities: Density of each sector, see SectorObstacleDensity.
+        - angle_start: The starting angle of the first sector in degrees.
+        - sector_width: The width of each sector in degrees.
+        - timestamp: Time of the densities in nanoseconds (monotonic clock), None if never measured.
         """
-        return True, PolarObstacleDensity(cls.__create_key, sector_densities)
+        if len(densities) == 0 or sector_width <= 0:
+            return False, None
+
+        return True, PolarObstacleDensity(
+            cls.__create_key, densities, angle_start, sector_width, timestamp
+        )
 
     def __init__(
-        self, class_private_create_key: object, sector_densities: list[SectorObstacleDensity]
+        self,
+        class_private_create_key: object,
+        densities: np.ndarray,
+        angle_start: float,
+        sector_width: float,
+        timestamp: "int | None",
     ) -> None:
         """
         Private constructor, use create() method.
@@ -83,12 +103,96 @@ class PolarObstacleDensity:
             class_private_create_key is PolarObstacleDensity.__create_key
         ), "Use the create() method"
 
-        self.sector_densities = sector_densities
+        self.densities = densities
+        self.angle_start = angle_start
+        self.sector_width = sector_width
+        self.timestamp = timestamp
+
+    def update(
+        self,
+        sector_indices: np.ndarray,
+        sector_densities: np.ndarray,
+        timestamp: int,
+        decay_time: float,
+        smoothing: float,
+    ) -> None:
+        """
+        Decays every sector by the time elapsed, then blends new densities into some sectors.
+
+        Parameters:
+        - sector_indices: Sectors that were measured, each at most once.
+        - sector_densities: Measured density of each of those sectors.
+        - timestamp: Time of the measurement in nanoseconds (monotonic clock).
+        - decay_time: Time constant in seconds of the exponential decay towards clear,
+            0 to not decay.
+        - smoothing: Weight of the measurement against the decayed density (0 < x ≤ 1),
+            1 to replace the density.
+        """
+        if self.timestamp is not None and decay_time > 0:
+            elapsed = max(timestamp - self.timestamp, 0) / 1e9
+            self.densities *= np.exp(-elapsed / decay_time)
+
+        self.densities[sector_indices] += smoothing * (
+            sector_densities - self.densities[sector_indices]
+        )
+
+        if self.timestamp is None or timestamp > self.timestamp:
+            self.timestamp = timestamp
+
+    def copy(self) -> "PolarObstacleDensity":
+        """
+        Copy that is not changed by later updates.
+        """
+        return PolarObstacleDensity(
+            PolarObstacleDensity.__create_key,
+            self.densities.copy(),
+            self.angle_start,
+            self.sector_width,
+            self.timestamp,
+        )
+
+    def __len__(self) -> int:
+        """
+        Number of sectors.
+        """
+        return len(self.densities)
+
+    def sector_index(self, angle: float) -> "tuple[bool, int | None]":
+        """
+        Index of the sector containing the angle in degrees.
+        """
+        index = int((angle - self.angle_start) // self.sector_width)
+        if index < 0 or index >= len(self.densities):
+            return False, None
+
+        return True, index
+
+    def density_at(self, angle: float) -> "tuple[bool, float | None]":
+        """
+        Density of the sector containing the angle in degrees.
+        """
+        result, index = self.sector_index(angle)
+        if not result:
+            return False, None
+
+        return True, float(self.densities[index])
+
+    def sector(self, index: int) -> "tuple[bool, SectorObstacleDensity | None]":
+        """
+        Sector at the index.
+        """
+        if index < 0 or index >= len(self.densities):
+            return False, None
+
+        angle_start = self.angle_start + index * self.sector_width
+        return SectorObstacleDensity.create(
+            angle_start, angle_start + self.sector_width, float(self.densities[index])
+        )
 
     def __str__(self) -> str:
         """
         String Representation.
         """
-        density_strs = [str(sector) for sector in self.sector_densities]
+        density_strs = [str(self.sector(index)[1]) for index in range(0, len(self.densities))]
         formatted_densities = ", ".join(density_strs)
-        return f"PolarObstacleDensity: {len(self.sector_densities)} sectors, Densities: {formatted_densities}."
+        return f"PolarObstacleDensity: {len(self.densities)} sectors, Densities: {formatted_densities}."
@@ -0,0 +1,100 @@
+"""
+Vector field histogram: obstacle density around the drone from lidar oscillations.
+"""
+
+import math
+
+import numpy as np
+
+from modules import lidar_oscillation
+from modules import polar_obstacle_density
+
+
+class VectorFieldHistogram:
+    """
+    Bins the readings of each oscillation into sectors around the drone, from -180 degrees.
+
+    The density of a sector is the mean of (1 - distance / max_distance) over its readings,
+    so 0 is clear and close to 1 is obstructed. Each oscillation (complete or partial) updates
+    the sectors it sweeps over, and every sector decays towards clear as time passes, so
+    the histogram stays the same size however many oscillations it has seen.
+    """
+
+    ANGLE_START = -180.0  # degrees
+
+    def __init__(
+        self,
+        sector_width: float,
+        max_distance: float,
+        decay_time: float = 0.0,
+        smoothing: float = 1.0,
+    ) -> None:
+        """
+        sector_width: width of each sector in degrees (the last sector is narrower if the
+            width does not divide 360)
+        max_distance: readings at or beyond this distance in metres add no density
+        decay_time: time constant in seconds of the decay towards clear, 0 to not decay
+        smoothing: weight of each oscillation against the previous density of a sector
+            (0 < x ≤ 1), 1 to replace it
+        """
+        self.sector_width = sector_width
+        self.max_distance = max_distance
+        self.decay_time = decay_time
+        self.smoothing = smoothing
+        self.sector_count = math.ceil(360 / sector_width)
+
+        _, self.__histogram = polar_obstacle_density.PolarObstacleDensity.create(
+            np.zeros(self.sector_count), self.ANGLE_START, self.sector_width
+        )
+
+    def __sector_of(self, offsets: "float | np.ndarray") -> "int | np.ndarray":
+        """
+        Sector of angles from ANGLE_START, from 0 to 360 degrees.
+        """
+        positions = np.floor_divide(offsets, self.sector_width).astype(np.int64)
+        # Offsets just below 0 round to 360
+        return np.minimum(positions, self.sector_count - 1)
+
+    def run(
+        self, oscillation: lidar_oscillation.LidarOscillation
+    ) -> "tuple[bool, polar_obstacle_density.PolarObstacleDensity | None]":
+        """
+        Returns the histogram including the oscillation.
+        """
+        if len(oscillation) == 0:
+            return False, None
+
+        timestamp = int(oscillation.timestamps.max())
+        distances = oscillation.distances
+        angles = oscillation.angles + oscillation.mount_yaw_offset
+
+        # Angle of each reading from ANGLE_START, wrapped to one turn
+        offsets = (angles - self.ANGLE_START) % 360
+        bins = self.__sector_of(offsets)
+
+        weights = np.clip(1 - distances / self.max_distance, 0, 1)
+        sums = np.bincount(bins, weights, self.sector_count)
+        counts = np.bincount(bins, minlength=self.sector_count)
+
+        # Sectors swept over, including those without readings.
+        # The angles of an oscillation do not wrap, so it sweeps from its lowest angle up by
+        # its extent, past ANGLE_START + 360 onto the first sectors if needed
+        extent = angles.max() - angles.min()
+        start_offset = offsets[np.argmin(angles)]
+        end_offset = start_offset + extent
+        if extent >= 360:
+            swept = np.arange(0, self.sector_count)
+        elif end_offset < 360:
+            swept = np.arange(self.__sector_of(start_offset), self.__sector_of(end_offset) + 1)
+        else:
+            swept = np.union1d(
+                np.arange(self.__sector_of(start_offset), self.sector_count),
+                np.arange(0, self.__sector_of(end_offset - 360) + 1),
+            )
+
+        # Swept sectors without readings are clear
+        densities = sums[swept] / np.maximum(counts[swept], 1)
+
+        self.__histogram.update(swept, densities, timestamp, self.decay_time, self.smoothing)
+
+        return True, self.__histogram.copy()
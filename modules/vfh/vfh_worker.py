@@ -0,0 +1,41 @@
+"""
+Gets oscillations and outputs polar obstacle densities.
+"""
+
+from modules import lidar_oscillation
+from worker import queue_wrapper
+from worker import worker_controller
+from . import vfh
+
+
+def vfh_worker(
+    sector_width: float,
+    max_distance: float,
+    decay_time: float,
+    smoothing: float,
+    oscillation_in_queue: queue_wrapper.QueueWrapper,
+    density_out_queue: queue_wrapper.QueueWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    sector_width: width of each histogram sector in degrees.
+    max_distance: readings at or beyond this distance in metres add no density.
+    decay_time: time constant in seconds of the decay of old densities, 0 to not decay.
+    smoothing: weight of each oscillation against the previous densities, 1 to replace them.
+    """
+    histogram = vfh.VectorFieldHistogram(sector_width, max_distance, decay_time, smoothing)
+
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        oscillation: lidar_oscillation.LidarOscillation = oscillation_in_queue.queue.get()
+        if oscillation is None:
+            break
+
+        result, density = histogram.run(oscillation)
+        if not result:
+            continue
+
+        density_out_queue.put(density)
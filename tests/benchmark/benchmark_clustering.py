@@ -0,0 +1,70 @@
+"""
+Benchmark of clustering lidar detections (single core).
+"""
+
+import time
+
+import numpy as np
+
+from modules import lidar_detection_batch
+from modules.clustering import clustering
+
+
+# Constants
+SAMPLE_RATE = 5000  # Hz (update rate 12)
+SAMPLE_COUNT = 50000
+BATCH_SIZE = 500  # readings
+MAX_CLUSTER_DISTANCE = 0.5  # metres
+
+
+def report(name: str, duration: float) -> None:
+    """
+    Print sample throughput and single core load at the sample rate.
+    """
+    rate = SAMPLE_COUNT / duration
+    print(f"{name}: {rate:,.0f} samples/s, {100 * SAMPLE_RATE / rate:.1f}% of a core at 5000 Hz")
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    sweep = np.concatenate((np.arange(-170, 170, 0.2), np.arange(170, -170, -0.2)))
+    angles = np.resize(sweep, SAMPLE_COUNT)
+    distances = 5 + 2 * np.sin(np.radians(angles) * 7) + (np.arange(0, SAMPLE_COUNT) % 97 == 0) * 10
+
+    batches = []
+    for start in range(0, SAMPLE_COUNT, BATCH_SIZE):
+        end = start + BATCH_SIZE
+        _, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            distances[start:end], angles[start:end], np.arange(start, end)
+        )
+        batches.append(batch)
+
+    detections = [detection for batch in batches for detection in batch.to_detections()]
+
+    clusterer = clustering.Clustering(MAX_CLUSTER_DISTANCE)
+    start_time = time.perf_counter()
+    for detection in detections:
+        clusterer.run(detection)
+    report("Per detection", time.perf_counter() - start_time)
+
+    clusterer = clustering.Clustering(MAX_CLUSTER_DISTANCE)
+    start_time = time.perf_counter()
+    cluster_count = 0
+    for batch in batches:
+        result, clusters = clusterer.run_batch(batch)
+        if result:
+            cluster_count += len(clusters)
+    report("Batches", time.perf_counter() - start_time)
+    print(f"Clusters: {cluster_count}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
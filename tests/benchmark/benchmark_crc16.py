@@ -0,0 +1,82 @@
+"""
+Benchmark of lidar packet CRC verification (single core).
+"""
+
+import time
+
+from modules.detection import crc16
+
+
+# Constants
+STREAM_RATE = 5000  # Hz (update rate 12)
+PACKET_COUNT = 50000
+# Distance packet: 2.5 m at 10 degrees
+DISTANCE_PACKET_DATA = [0xAA, 0x40, 0x01, 44, 250, 0, 232, 3]
+
+
+def create_crc_bitwise(data: "list[int]") -> int:
+    """
+    Previous shift and xor implementation, kept for comparison.
+    """
+    crc = 0
+
+    for i in data:
+        code = crc >> 8
+        code ^= int(i)
+        code ^= code >> 4
+        crc = crc << 8
+        crc ^= code
+        code = code << 5
+        crc ^= code
+        code = code << 7
+        crc ^= code
+        crc &= 0xFFFF
+
+    return crc
+
+
+def report(name: str, duration: float) -> None:
+    """
+    Print packet throughput and single core load at the stream rate.
+    """
+    packets_per_second = PACKET_COUNT / duration
+    load = STREAM_RATE / packets_per_second * 100
+    print(
+        f"{name}: {packets_per_second:,.0f} packets/s ({load:.2f}% of a core at {STREAM_RATE} Hz)"
+    )
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    crc = crc16.create_crc(DISTANCE_PACKET_DATA)
+    packet = bytes(DISTANCE_PACKET_DATA + [crc & 0xFF, (crc >> 8) & 0xFF])
+    packets = [packet] * PACKET_COUNT
+    data_as_list = list(packet[:-2])
+
+    start_time = time.perf_counter()
+    for _ in range(0, PACKET_COUNT):
+        create_crc_bitwise(data_as_list)
+    report("Bitwise (list)", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for item in packets:
+        crc16.verify_packet(memoryview(item))
+    report("Table (memoryview)", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    results = crc16.verify_packets(packets)
+    report("Table (batch)", time.perf_counter() - start_time)
+
+    assert all(results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,166 @@
+"""
+Benchmark of Detection and detection_worker against the SF45/B emulator (Linux only).
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+from modules.detection import detection
+from modules.detection import detection_worker
+from modules.detection import lidar_driver
+from tests.emulator import sf45b_emulator
+from worker import queue_wrapper
+from worker import worker_controller
+
+
+# Constants
+QUEUE_MAX_SIZE = 10
+
+SERIAL_PORT_BAUDRATE = 921600
+PORT_TIMEOUT = 0.1  # seconds
+LOW_ANGLE = -170
+HIGH_ANGLE = 170
+ROTATE_SPEED = 5
+CAPTURE_PATH = ""
+MOUNT_YAW_OFFSETS = [0.0]  # degrees
+STATISTICS_PERIOD = 0  # seconds
+GOVERNOR_MAX_LAG = 0.5  # seconds
+GOVERNOR_HOLD_TIME = 2.0  # seconds
+BATCH_MAX_LATENCY = 0.005  # seconds
+GATE_ANGLE_WINDOWS = []  # every angle
+GATE_MIN_DISTANCE = 0.0  # metres
+GATE_MAX_DISTANCE = 50.0  # metres
+GATE_DECIMATION_BIN = 0  # every reading
+
+BATCH_MAX_SAMPLES = 5000
+DURATION = 2.0  # seconds
+WORKER_JOIN_TIMEOUT = 2.0  # seconds
+
+
+def benchmark_detection(update_rate: int) -> None:
+    """
+    Receive readings with Detection.run_batch() for DURATION.
+    """
+    emulator = sf45b_emulator.Sf45bEmulator()
+    emulator.start()
+
+    detector = detection.Detection(
+        emulator.port_name,
+        SERIAL_PORT_BAUDRATE,
+        PORT_TIMEOUT,
+        update_rate,
+        LOW_ANGLE,
+        HIGH_ANGLE,
+        ROTATE_SPEED,
+    )
+
+    count = 0
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < DURATION:
+        result, detections = detector.run_batch(BATCH_MAX_SAMPLES)
+        if result:
+            count += len(detections)
+
+    duration = time.monotonic() - start_time
+    detector.stop()
+    emulator.stop()
+
+    frequency = lidar_driver.LidarDriver.UPDATE_RATE_FREQUENCIES[update_rate]
+    print(
+        f"Detection, update rate {update_rate} ({frequency} Hz): "
+        f"{count / duration:,.0f} samples/s, "
+        f"{detector.lidar.overrun_count()} lost, {emulator.bytes_dropped} bytes dropped"
+    )
+
+
+def benchmark_detection_worker(update_rate: int) -> None:
+    """
+    Receive readings from detection_worker through its output queue for DURATION.
+    """
+    emulator = sf45b_emulator.Sf45bEmulator()
+    emulator.start()
+
+    controller = worker_controller.WorkerController()
+    mp_manager = mp.Manager()
+    output_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
+
+    worker = mp.Process(
+        target=detection_worker.detection_worker,
+        args=(
+            [emulator.port_name],
+            MOUNT_YAW_OFFSETS,
+            SERIAL_PORT_BAUDRATE,
+            PORT_TIMEOUT,
+            update_rate,
+            LOW_ANGLE,
+            HIGH_ANGLE,
+            ROTATE_SPEED,
+            CAPTURE_PATH,
+            STATISTICS_PERIOD,
+            update_rate,
+            GOVERNOR_MAX_LAG,
+            GOVERNOR_HOLD_TIME,
+            BATCH_MAX_SAMPLES,
+            BATCH_MAX_LATENCY,
+            GATE_ANGLE_WINDOWS,
+            GATE_MIN_DISTANCE,
+            GATE_MAX_DISTANCE,
+            GATE_DECIMATION_BIN,
+            output_queue,
+            controller,
+        ),
+    )
+    worker.start()
+
+    # Wait for the first reading so that startup is not measured
+    output_queue.queue.get()
+
+    count = 0
+    batch_count = 0
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < DURATION:
+        try:
+            batch = output_queue.queue.get(timeout=PORT_TIMEOUT)
+            count += len(batch)
+            batch_count += 1
+        except queue.Empty:
+            continue
+
+    duration = time.monotonic() - start_time
+
+    controller.request_exit()
+    output_queue.fill_and_drain_queue()
+    worker.join(WORKER_JOIN_TIMEOUT)
+    if worker.is_alive():
+        worker.terminate()
+
+    emulator.stop()
+
+    frequency = lidar_driver.LidarDriver.UPDATE_RATE_FREQUENCIES[update_rate]
+    print(
+        f"detection_worker, update rate {update_rate} ({frequency} Hz): "
+        f"{count / duration:,.0f} samples/s in {batch_count / duration:,.0f} batches/s"
+    )
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    for update_rate in range(
+        lidar_driver.LidarDriver.MIN_UPDATE_RATE, lidar_driver.LidarDriver.MAX_UPDATE_RATE + 1
+    ):
+        benchmark_detection(update_rate)
+
+    benchmark_detection_worker(lidar_driver.LidarDriver.MAX_UPDATE_RATE)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,84 @@
+"""
+Benchmark of framing and decoding lidar distance packets (single core).
+"""
+
+import time
+
+from modules.detection import distance_decoder
+from modules.detection import packet_framer
+from tests.emulator import sf45b_emulator
+
+
+# Constants
+STREAM_RATE = 5000  # Hz (update rate 12)
+PACKET_COUNT = 50000
+READ_SIZE = 4096  # bytes
+
+
+def decode_packet(packet: bytes) -> "tuple[float, float]":
+    """
+    Previous per packet decoding, kept for comparison.
+    """
+    distance = (packet[4] | packet[5] << 8) / 100.0
+    if distance < 0 or distance > distance_decoder.MAX_DISTANCE:
+        return -1, 0
+
+    yaw = packet[6] | packet[7] << 8
+    if yaw > distance_decoder.YAW_ANGLE_THRESHOLD:
+        yaw = yaw - distance_decoder.YAW_ANGLE_OFFSET
+
+    angle = yaw / 100.0
+    if angle <= distance_decoder.MIN_ANGLE or angle >= distance_decoder.MAX_ANGLE:
+        return -1, 0
+
+    return distance, angle
+
+
+def report(name: str, duration: float) -> None:
+    """
+    Print packet throughput and single core load at the stream rate.
+    """
+    rate = PACKET_COUNT / duration
+    print(f"{name}: {rate:,.0f} packets/s, {100 * STREAM_RATE / rate:.1f}% of a core at 5000 Hz")
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    data = b"".join(
+        sf45b_emulator.Sf45bEmulator.build_packet(
+            distance_decoder.DISTANCE_COMMAND,
+            [(i % 5000) & 0xFF, (i % 5000) >> 8, (i * 7) & 0xFF, ((i * 7) >> 8) & 0xFF],
+        )
+        for i in range(0, PACKET_COUNT)
+    )
+    reads = [data[i : i + READ_SIZE] for i in range(0, len(data), READ_SIZE)]
+
+    framer = packet_framer.PacketFramer()
+    start_time = time.perf_counter()
+    for read in reads:
+        for packet in framer.feed(read):
+            decode_packet(packet)
+    report("Per packet", time.perf_counter() - start_time)
+
+    framer = packet_framer.PacketFramer()
+    start_time = time.perf_counter()
+    for read in reads:
+        distance_packets, _ = framer.feed_distance_packets(read)
+        distance_decoder.decode(distance_packets)
+    report("Vectorized", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    distance_decoder.decode(distance_decoder.find_packets(data))
+    report("Whole buffer", time.perf_counter() - start_time)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,52 @@
+"""
+Benchmark of LidarDriver decoding a lidar capture replayed at unlimited speed.
+
+Usage: python -m tests.benchmark.benchmark_replay <capture file> [update rate]
+"""
+
+import sys
+import time
+
+from modules.detection import lidar_driver
+from modules.detection import serial_capture
+
+
+# Constants
+BATCH_MAX_SAMPLES = 5000
+READ_TIMEOUT = 0.1  # seconds
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return -1
+
+    replay = serial_capture.CaptureReplay(sys.argv[1], real_time=False)
+    lidar = lidar_driver.LidarDriver("", 0, 0, port=replay)
+    if len(sys.argv) > 2:
+        # Only used for sample times
+        lidar.update_rate = int(sys.argv[2])
+
+    count = 0
+    start_time = time.monotonic()
+    while not replay.at_end():
+        distances, _, _ = lidar.read_batch(replay, BATCH_MAX_SAMPLES, READ_TIMEOUT)
+        count += len(distances)
+
+    duration = time.monotonic() - start_time
+    replay.close()
+
+    print(f"Replay: {count} readings in {duration:.3f} s, {count / duration:,.0f} samples/s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,66 @@
+"""
+Benchmark of the trig lookup table against computing sine and cosine (single core).
+"""
+
+import math
+import time
+
+import numpy as np
+
+from modules import trig_lookup
+
+
+# Constants
+SAMPLE_COUNT = 200000
+BATCH_SIZE = 500  # readings
+
+
+def report(name: str, duration: float) -> None:
+    """
+    Print angle throughput.
+    """
+    print(f"{name}: {SAMPLE_COUNT / duration:,.0f} angles/s")
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    # Lidar angles, in steps of 0.01 degrees over the sweep
+    angles = np.resize(np.arange(-17000, 17001, 3), SAMPLE_COUNT) / 100
+    angle_list = angles.tolist()
+    batches = [angles[i : i + BATCH_SIZE] for i in range(0, SAMPLE_COUNT, BATCH_SIZE)]
+
+    start_time = time.perf_counter()
+    for angle in angle_list:
+        angle_in_radians = angle * math.pi / 180
+        math.sin(angle_in_radians)
+        math.cos(angle_in_radians)
+    report("math.sin and math.cos", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for angle in angle_list:
+        trig_lookup.sin_cos(angle)
+    report("sin_cos", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for batch in batches:
+        angles_in_radians = batch * math.pi / 180
+        np.sin(angles_in_radians)
+        np.cos(angles_in_radians)
+    report("np.sin and np.cos", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for batch in batches:
+        trig_lookup.sin_cos_array(batch)
+    report("sin_cos_array", time.perf_counter() - start_time)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
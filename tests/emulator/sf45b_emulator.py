@@ -0,0 +1,280 @@
+"""
+Lightware SF45/B emulator on a pseudo-terminal (Linux).
+Lidar documentation: https://support.lightware.co.za/sf45b/#/commands
+"""
+
+import os
+import pty
+import select
+import struct
+import threading
+import time
+import tty
+import typing
+
+from modules.detection import crc16
+from modules.detection import lidar_driver
+from modules.detection import packet_framer
+
+
+def default_scene(angle: float) -> float:
+    """
+    Wall 20 m away with a 3 m away obstacle between -10 and 10 degrees.
+    Returns distance in metres.
+    """
+    if -10.0 <= angle <= 10.0:
+        return 3.0
+
+    return 20.0
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Sf45bEmulator:
+    """
+    Answers the commands used by LidarDriver and streams distance (44) packets
+    at the configured update rate, sweeping between the low and high angles.
+    """
+
+    PRODUCT_NAME = 0
+    FIRMWARE_VERSION = 2
+    SERIAL_NUMBER = 3
+    DISTANCE_OUTPUT = 27
+    STREAM = 30
+    DISTANCE = 44
+    UPDATE_RATE = 66
+    ROTATION_SPEED = 85
+    LOW_ANGLE = 98
+    HIGH_ANGLE = 99
+
+    STREAM_DISTANCE = 5
+
+    # Approximation of the sweep rate: degrees per second is this divided by the speed setting
+    SWEEP_RATE_CONSTANT = 17000
+
+    # Distance output bits (in order of output)
+    __FIRST_RETURN_RAW = 0
+    __FIRST_RETURN_STRENGTH = 2
+    __LAST_RETURN_STRENGTH = 5
+    __BACKGROUND_NOISE = 6
+    __TEMPERATURE = 7
+    __YAW_ANGLE = 8
+    __OUTPUT_BITS = 9
+
+    __LOOP_PERIOD = 0.001  # seconds
+    __MAX_SAMPLES_PER_LOOP = 1000
+
+    def __init__(self, scene: "typing.Callable[[float], float]" = default_scene) -> None:
+        """
+        scene: distance in metres seen at an angle in degrees.
+        """
+        self.__scene = scene
+
+        self.__master, self.__slave = pty.openpty()
+        tty.setraw(self.__slave)
+        os.set_blocking(self.__master, False)
+        self.port_name = os.ttyname(self.__slave)
+
+        self.settings = {
+            self.PRODUCT_NAME: list(b"SF45".ljust(16, b"\0")),
+            self.FIRMWARE_VERSION: [0, 1, 2, 0],
+            self.SERIAL_NUMBER: list(b"EMULATOR".ljust(16, b"\0")),
+            self.DISTANCE_OUTPUT: [0, 0, 0, 0],
+            self.STREAM: [0, 0, 0, 0],
+            self.UPDATE_RATE: [1],
+            self.ROTATION_SPEED: list(struct.pack("<H", 5)),
+            self.LOW_ANGLE: list(struct.pack("<f", -45.0)),
+            self.HIGH_ANGLE: list(struct.pack("<f", 45.0)),
+        }
+
+        # Data sent instead of the setting in responses to read requests, by command
+        self.read_overrides = {}
+
+        # Statistics
+        self.requests_received = 0
+        self.writes_received = 0
+        self.samples_sent = 0
+        self.bytes_dropped = 0
+
+        self.__angle = 0.0
+        self.__sweep_direction = 1
+        self.__stream_start_time = 0.0
+        self.__stream_samples = 0
+
+        self.__framer = packet_framer.PacketFramer()
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def start(self) -> None:
+        """
+        Start answering and streaming in a background thread.
+        """
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name="sf45b_emulator", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread and close the pseudo-terminal.
+        """
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+        os.close(self.__master)
+        os.close(self.__slave)
+
+    def set_streaming(self, update_rate: int, low_angle: float, high_angle: float) -> None:
+        """
+        Put the emulator in a streaming state, as if configured by a previous run.
+        Must be called before start().
+        """
+        self.settings[self.DISTANCE_OUTPUT] = [8, 1, 0, 0]
+        self.settings[self.UPDATE_RATE] = [update_rate]
+        self.settings[self.LOW_ANGLE] = list(struct.pack("<f", low_angle))
+        self.settings[self.HIGH_ANGLE] = list(struct.pack("<f", high_angle))
+        self.settings[self.STREAM] = [self.STREAM_DISTANCE, 0, 0, 0]
+
+    @staticmethod
+    def build_packet(command: int, data: "list[int] | bytes") -> bytes:
+        """
+        Create raw bytes for a response packet.
+        """
+        flags = (1 + len(data)) << 6
+        packet = bytearray([0xAA, flags & 0xFF, (flags >> 8) & 0xFF, command])
+        packet.extend(data)
+        crc = crc16.create_crc(packet)
+        packet.append(crc & 0xFF)
+        packet.append((crc >> 8) & 0xFF)
+
+        return bytes(packet)
+
+    def __write(self, data: bytes) -> None:
+        """
+        Send data to the host. Data the host has no room for is lost, like on a real serial line.
+        """
+        try:
+            written = os.write(self.__master, data)
+        except BlockingIOError:
+            written = 0
+
+        self.bytes_dropped += len(data) - written
+
+    def __handle_request(self, packet: bytes) -> None:
+        """
+        Apply a write request and respond with the current value.
+        """
+        command = packet[3]
+        if command not in self.settings:
+            return
+
+        self.requests_received += 1
+
+        if packet[1] & 0x1:
+            self.writes_received += 1
+            self.settings[command] = list(packet[4:-2])
+
+            if command in (self.STREAM, self.UPDATE_RATE):
+                self.__stream_start_time = time.monotonic()
+                self.__stream_samples = 0
+
+            self.__write(self.build_packet(command, self.settings[command]))
+            return
+
+        self.__write(
+            self.build_packet(command, self.read_overrides.get(command, self.settings[command]))
+        )
+
+    def __is_streaming(self) -> bool:
+        """
+        Whether distance streaming is enabled.
+        """
+        return self.settings[self.STREAM][0] == self.STREAM_DISTANCE
+
+    def __next_angle(self, sample_period: float) -> float:
+        """
+        Advance the sweep by one sample period.
+        """
+        low_angle = struct.unpack("<f", bytes(self.settings[self.LOW_ANGLE]))[0]
+        high_angle = struct.unpack("<f", bytes(self.settings[self.HIGH_ANGLE]))[0]
+        speed = struct.unpack("<H", bytes(self.settings[self.ROTATION_SPEED]))[0]
+
+        self.__angle += self.__sweep_direction * self.SWEEP_RATE_CONSTANT / speed * sample_period
+
+        if self.__angle >= high_angle:
+            self.__angle = high_angle
+            self.__sweep_direction = -1
+        elif self.__angle <= low_angle:
+            self.__angle = low_angle
+            self.__sweep_direction = 1
+
+        return self.__angle
+
+    def __build_distance_packet(self, angle: float) -> bytes:
+        """
+        Create a distance packet with the fields selected by the distance output setting.
+        """
+        output = struct.unpack("<I", bytes(self.settings[self.DISTANCE_OUTPUT]))[0]
+        distance_in_cm = min(int(self.__scene(angle) * 100), 0xFFFF)
+
+        data = bytearray()
+        for bit in range(0, self.__OUTPUT_BITS):
+            if not output & (1 << bit):
+                continue
+
+            if bit == self.__YAW_ANGLE:
+                data.extend(struct.pack("<h", round(angle * 100)))
+            elif bit in (self.__FIRST_RETURN_STRENGTH, self.__LAST_RETURN_STRENGTH):
+                data.extend(struct.pack("<h", 100))
+            elif bit == self.__BACKGROUND_NOISE:
+                data.extend(struct.pack("<h", 0))
+            elif bit == self.__TEMPERATURE:
+                data.extend(struct.pack("<h", 2500))
+            else:
+                data.extend(struct.pack("<H", distance_in_cm))
+
+        return self.build_packet(self.DISTANCE, data)
+
+    def __stream(self) -> None:
+        """
+        Send every sample due since streaming started.
+        """
+        frequency = lidar_driver.LidarDriver.UPDATE_RATE_FREQUENCIES[
+            self.settings[self.UPDATE_RATE][0]
+        ]
+        sample_period = 1 / frequency
+
+        due = int((time.monotonic() - self.__stream_start_time) * frequency) - self.__stream_samples
+        due = min(due, self.__MAX_SAMPLES_PER_LOOP)
+        if due <= 0:
+            return
+
+        packets = [
+            self.__build_distance_packet(self.__next_angle(sample_period)) for _ in range(0, due)
+        ]
+        self.__write(b"".join(packets))
+        self.__stream_samples += due
+        self.samples_sent += due
+
+    def __run(self) -> None:
+        """
+        Emulator thread.
+        """
+        self.__stream_start_time = time.monotonic()
+
+        while not self.__stop.is_set():
+            readable, _, _ = select.select([self.__master], [], [], self.__LOOP_PERIOD)
+            if readable:
+                try:
+                    data = os.read(self.__master, 4096)
+                except (BlockingIOError, OSError):
+                    data = b""
+
+                for packet in self.__framer.feed(data):
+                    self.__handle_request(packet)
+
+            if self.__is_streaming():
+                self.__stream()
+            else:
+                self.__stream_start_time = time.monotonic()
+                self.__stream_samples = 0
@@ -8,20 +8,31 @@ import queue
 from worker import worker_controller
 from worker import queue_wrapper
 
-from modules import lidar_detection
+from modules import lidar_detection_batch
 from modules.detection import detection_worker
 
 
 # Constants
 QUEUE_MAX_SIZE = 10
 
-SERIAL_PORT_NAME = "/dev/tty.usbmodem38S45_158681"
+SERIAL_PORT_NAMES = ["/dev/tty.usbmodem38S45_158681"]
+MOUNT_YAW_OFFSETS = [0.0]  # degrees
 SERIAL_PORT_BAUDRATE = 921600
 PORT_TIMEOUT = 0.1  # seconds
 UPDATE_RATE = 5
 HIGH_ANGLE = 170
 LOW_ANGLE = -170
 ROTATE_SPEED = 5
+BATCH_MAX_SAMPLES = 500
+CAPTURE_PATH = ""
+STATISTICS_PERIOD = 0  # seconds
+GOVERNOR_MAX_LAG = 0.5  # seconds
+GOVERNOR_HOLD_TIME = 2.0  # seconds
+BATCH_MAX_LATENCY = 0.005  # seconds
+GATE_ANGLE_WINDOWS = []  # every angle
+GATE_MIN_DISTANCE = 0.0  # metres
+GATE_MAX_DISTANCE = 50.0  # metres
+GATE_DECIMATION_BIN = 0  # every reading
 
 
 def main() -> int:
@@ -36,13 +47,25 @@ def main() -> int:
     worker = mp.Process(
         target=detection_worker.detection_worker,
         args=(
-            SERIAL_PORT_NAME,
+            SERIAL_PORT_NAMES,
+            MOUNT_YAW_OFFSETS,
             SERIAL_PORT_BAUDRATE,
             PORT_TIMEOUT,
             UPDATE_RATE,
             HIGH_ANGLE,
             LOW_ANGLE,
             ROTATE_SPEED,
+            CAPTURE_PATH,
+            STATISTICS_PERIOD,
+            UPDATE_RATE,
+            GOVERNOR_MAX_LAG,
+            GOVERNOR_HOLD_TIME,
+            BATCH_MAX_SAMPLES,
+            BATCH_MAX_LATENCY,
+            GATE_ANGLE_WINDOWS,
+            GATE_MIN_DISTANCE,
+            GATE_MAX_DISTANCE,
+            GATE_DECIMATION_BIN,
             detection_out_queue,
             controller,
         ),
@@ -52,8 +75,13 @@ def main() -> int:
 
     while True:
         try:
-            input_data: lidar_detection.LidarDetection = detection_out_queue.queue.get_nowait()
-            assert str(type(input_data)) == "<class 'modules.lidar_detection.LidarDetection'>"
+            input_data: lidar_detection_batch.LidarDetectionBatch = (
+                detection_out_queue.queue.get_nowait()
+            )
+            assert (
+                str(type(input_data))
+                == "<class 'modules.lidar_detection_batch.LidarDetectionBatch'>"
+            )
 
             assert input_data is not None
 
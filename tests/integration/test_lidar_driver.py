@@ -10,6 +10,7 @@ from modules.detection import lidar_driver
 PORT_NAME = "/dev/tty.usbmodem38S45_158681"
 BAUDRATE = 921600
 TIMEOUT = 0.1
+BATCH_MAX_SAMPLES = 5000
 
 
 def output_scan(lidar: lidar_driver.LidarDriver, duration: float) -> None:
@@ -30,6 +31,24 @@ def output_scan(lidar: lidar_driver.LidarDriver, duration: float) -> None:
     time.sleep(0.5)
 
 
+def output_batches(lidar: lidar_driver.LidarDriver, duration: float) -> None:
+    """
+    Output number of lidar readings received per batch.
+    """
+    time.sleep(2)
+
+    t_end = time.time() + duration
+    while time.time() < t_end:
+        distances, angles, _ = lidar.read_batch(lidar.serial_port, BATCH_MAX_SAMPLES)
+
+        if len(distances) == 0:
+            continue
+
+        print(f"{len(distances)} readings, last: {distances[-1]} m {angles[-1]} deg")
+
+    time.sleep(0.5)
+
+
 def main() -> None:
     """
     Conduct tests of lidar driver methods.
@@ -57,6 +76,9 @@ def main() -> None:
     lidar.set_update_rate(lidar.serial_port, lidar.MAX_UPDATE_RATE)
     output_scan(lidar, 3)
 
+    print("Testing batch output at max update rate:")
+    output_batches(lidar, 3)
+
     print("Decreasing update rate to min (50 Hz)")
     lidar.set_update_rate(lidar.serial_port, lidar.MIN_UPDATE_RATE)
     output_scan(lidar, 3)
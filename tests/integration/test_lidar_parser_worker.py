@@ -13,6 +13,7 @@ from worker import worker_controller
 
 # Constants
 QUEUE_MAX_SIZE = 10
+SECTOR_WIDTH = 0.0  # degrees, complete oscillations only
 
 # pylint: disable=duplicate-code
 
@@ -68,7 +69,7 @@ def main() -> int:
 
     worker = mp.Process(
         target=lidar_parser_worker.lidar_parser_worker,
-        args=(detection_in_queue, oscillation_out_queue, controller),
+        args=(SECTOR_WIDTH, detection_in_queue, oscillation_out_queue, controller),
     )
 
     # Run
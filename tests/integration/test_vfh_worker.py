@@ -0,0 +1,100 @@
+"""
+Integration test for vfh_worker.
+"""
+
+import multiprocessing as mp
+
+from modules import lidar_detection
+from modules import lidar_oscillation
+from modules import polar_obstacle_density
+from modules.vfh import vfh_worker
+from worker import queue_wrapper
+from worker import worker_controller
+
+# Constants
+QUEUE_MAX_SIZE = 10
+SECTOR_WIDTH = 10.0  # degrees
+MAX_DISTANCE = 20.0  # metres
+DECAY_TIME = 0.0  # no decay
+SMOOTHING = 1.0  # latest oscillation only
+OSCILLATION_COUNT = 4
+
+# pylint: disable=duplicate-code
+
+
+def simulate_lidar_parser_worker(oscillation_in_queue: queue_wrapper.QueueWrapper) -> None:
+    """
+    Places oscillations sweeping up and down into the input queue, with an obstacle ahead.
+    """
+    for i in range(0, OSCILLATION_COUNT):
+        angles = range(-90, 91, 2) if i % 2 == 0 else range(90, -91, -2)
+
+        readings = []
+        for angle in angles:
+            distance = 5.0 if -10 <= angle < 10 else 30.0
+            result, detection = lidar_detection.LidarDetection.create(distance, angle)
+            assert result
+            assert detection is not None
+            readings.append(detection)
+
+        result, oscillation = lidar_oscillation.LidarOscillation.create(readings, i)
+        assert result
+        assert oscillation is not None
+        oscillation_in_queue.queue.put(oscillation)
+
+    oscillation_in_queue.queue.put(None)
+
+
+def main() -> int:
+    """
+    Main function to test vfh_worker.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    mp_manager = mp.Manager()
+
+    oscillation_in_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
+    density_out_queue = queue_wrapper.QueueWrapper(mp_manager, QUEUE_MAX_SIZE)
+
+    worker = mp.Process(
+        target=vfh_worker.vfh_worker,
+        args=(
+            SECTOR_WIDTH,
+            MAX_DISTANCE,
+            DECAY_TIME,
+            SMOOTHING,
+            oscillation_in_queue,
+            density_out_queue,
+            controller,
+        ),
+    )
+
+    # Run
+    worker.start()
+
+    simulate_lidar_parser_worker(oscillation_in_queue)
+
+    # Test
+    for _ in range(0, OSCILLATION_COUNT):
+        density: polar_obstacle_density.PolarObstacleDensity = density_out_queue.queue.get(
+            timeout=5
+        )
+
+        assert isinstance(density, polar_obstacle_density.PolarObstacleDensity)
+        assert density.density_at(0.0) == (True, 0.75)
+        assert density.density_at(45.0) == (True, 0.0)
+        print(density)
+
+    # Teardown
+    controller.request_exit()
+    worker.join()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
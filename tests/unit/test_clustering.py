@@ -2,9 +2,11 @@
 Test for clustering module.
 """
 
+import numpy as np
 import pytest
 
 from modules import lidar_detection
+from modules import lidar_detection_batch
 from modules.clustering import clustering
 
 MAX_CLUSTER_DISTANCE = 0.5  # metres
@@ -101,3 +103,95 @@ class TestClustering:
         assert result
         assert cluster is not None
         assert len(cluster.detections) == expected
+
+
+def cluster_batches(
+    clusterer: clustering.Clustering,
+    distances: "list[float]",
+    angles: "list[float]",
+    batch_size: int,
+) -> "list[list[tuple[float, float]]]":
+    """
+    Clusters from run_batch(), as rounded (x, y) of each point.
+    """
+    clusters = []
+    for start in range(0, len(distances), batch_size):
+        end = start + batch_size
+        result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            np.array(distances[start:end]),
+            np.array(angles[start:end]),
+            np.arange(start, min(end, len(distances))),
+        )
+        assert result
+        assert batch is not None
+
+        result, batch_clusters = clusterer.run_batch(batch)
+        if result:
+            for cluster in batch_clusters:
+                clusters.append(
+                    [(round(point.x, 6), round(point.y, 6)) for point in cluster.detections]
+                )
+
+    return clusters
+
+
+class TestClusteringBatch:
+    """
+    Test for the Clustering.run_batch() method.
+    """
+
+    def test_split_on_gap_and_direction(self, clustering_maker: clustering.Clustering) -> None:
+        """
+        Clusters end where consecutive points are too far apart or the sweep turns.
+        """
+        distances = [1.0, 1.0, 1.0, 3.0, 3.0, 3.0, 3.0, 3.0]
+        angles = [-11.0, -9.0, -7.0, -5.0, -5.0, -4.0, -3.0, -4.0]
+
+        clusters = cluster_batches(clustering_maker, distances, angles, len(distances))
+
+        # First turn is clockwise after starting anticlockwise
+        assert [len(cluster) for cluster in clusters] == [1, 2, 4]
+        assert len(clustering_maker.cluster) == 1
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 5, 13, 10000])
+    def test_same_as_run(self, batch_size: int) -> None:
+        """
+        Batches of any size give the clusters of run(), carrying over between batches.
+        """
+        rng = np.random.default_rng(0)
+        angles = np.concatenate((np.arange(-170, 170, 0.5), np.arange(170, -170, -0.5)))
+        angles = angles.tolist()
+        distances = np.round(rng.choice([1.0, 1.1, 4.0], len(angles)), 1).tolist()
+
+        clusterer = clustering.Clustering(MAX_CLUSTER_DISTANCE)
+        expected = []
+        for timestamp, (distance, angle) in enumerate(zip(distances, angles)):
+            _, detection = lidar_detection.LidarDetection.create(distance, angle, timestamp)
+            result, cluster = clusterer.run(detection)
+            if result:
+                expected.append(
+                    [(round(point.x, 6), round(point.y, 6)) for point in cluster.detections]
+                )
+
+        actual = cluster_batches(
+            clustering.Clustering(MAX_CLUSTER_DISTANCE), distances, angles, batch_size
+        )
+
+        assert len(expected) > 2
+        assert actual == expected
+
+    def test_mount_yaw_offset(self, clustering_maker: clustering.Clustering) -> None:
+        """
+        Points of a lidar mounted facing backwards are behind the drone.
+        """
+        result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            np.array([1.0, 1.0, 3.0]), np.array([2.0, 1.0, 0.0]), np.arange(0, 3), 1, 180.0
+        )
+        assert result
+        assert batch is not None
+
+        result, clusters = clustering_maker.run_batch(batch)
+
+        assert result
+        assert len(clusters) == 1
+        assert all(point.x < 0 for point in clusters[0].detections)
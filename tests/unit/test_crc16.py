@@ -0,0 +1,36 @@
+"""
+Test for CRC-16-CCITT module.
+"""
+
+from modules.detection import crc16
+
+
+class TestCrc16:
+    """
+    Test for CRC creation and verification.
+    """
+
+    def test_check_value(self) -> None:
+        """
+        Standard check value of CRC-16-CCITT (initial value 0) for "123456789".
+        """
+        expected = 0x31C3
+
+        assert crc16.create_crc(b"123456789") == expected
+        assert crc16.create_crc(memoryview(b"123456789")) == expected
+        assert crc16.create_crc(list(b"123456789")) == expected
+
+    def test_verify_packets(self) -> None:
+        """
+        Batch verification matches single packet verification.
+        """
+        data = [0xAA, 0x40, 0x01, 44, 250, 0, 232, 3]
+        crc = crc16.create_crc(data)
+        valid = bytes(data + [crc & 0xFF, (crc >> 8) & 0xFF])
+        invalid = bytes(data + [(crc + 1) & 0xFF, (crc >> 8) & 0xFF])
+
+        results = crc16.verify_packets([valid, invalid, b"\xaa", valid])
+
+        assert results == [True, False, False, True]
+        assert crc16.verify_packet(valid)
+        assert not crc16.verify_packet(invalid)
@@ -2,12 +2,14 @@
 Test for decision module.
 """
 
+import numpy as np
 import pytest
 
 from modules import decision_command
 from modules import detections_and_odometry
 from modules import drone_odometry_local
 from modules import lidar_detection
+from modules import lidar_detection_batch
 from modules.common.mavlink.modules import drone_odometry
 from modules.decision import decision
 
@@ -69,6 +71,43 @@ def object_within_proximity_limit_while_moving() -> detections_and_odometry.Dete
     yield merged
 
 
+@pytest.fixture()
+def batch_within_proximity_limit_while_moving() -> detections_and_odometry.DetectionsAndOdometry:  # type: ignore
+    """
+    Creates a DetectionsAndOdometry instance of a batch within the proximity limit.
+    The invalid readings (-1) are not counted as close.
+    """
+    result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+        np.array([6.0, -1.0, 4.8, 6.0]), np.full(4, 3.0), np.arange(0, 4)
+    )
+    assert result
+    assert batch is not None
+
+    result, position = drone_odometry_local.DronePositionLocal.create(0.0, 0.0, 0.0)
+    assert result
+    assert position is not None
+
+    result, orientation = drone_odometry.DroneOrientation.create(0.0, 0.0, 0.0)
+    assert result
+    assert orientation is not None
+
+    flight_mode = drone_odometry_local.FlightMode.MOVING
+
+    result, odometry = drone_odometry_local.DroneOdometryLocal.create(
+        position, orientation, flight_mode
+    )
+    assert result
+    assert odometry is not None
+
+    result, merged = detections_and_odometry.DetectionsAndOdometry.create_with_batches(
+        [], [batch], odometry
+    )
+    assert result
+    assert merged is not None
+
+    yield merged
+
+
 @pytest.fixture()
 def object_within_proximity_limit_while_stopped() -> detections_and_odometry.DetectionsAndOdometry:  # type: ignore
     """
@@ -201,6 +240,24 @@ class TestDecision:
         assert command is not None
         assert command.command == expected
 
+    def test_decision_batch_within_proximity_limit_while_moving(
+        self,
+        decision_maker: decision.Decision,
+        batch_within_proximity_limit_while_moving: detections_and_odometry.DetectionsAndOdometry,
+    ) -> None:
+        """
+        Readings kept as a batch are checked against the proximity limit.
+        """
+        expected = decision_command.DecisionCommand.CommandType.STOP_MISSION_AND_HALT
+
+        result, command = decision_maker.run(batch_within_proximity_limit_while_moving)
+
+        assert result
+        assert command is not None
+        assert command.command == expected
+        assert batch_within_proximity_limit_while_moving.min_distance() == 4.8
+        assert len(batch_within_proximity_limit_while_moving.detections) == 3
+
     def test_decision_within_proximity_limit_while_stopped(
         self,
         decision_maker: decision.Decision,
@@ -0,0 +1,82 @@
+"""
+Test for detection gate.
+"""
+
+import numpy as np
+
+from modules.detection import detection_gate
+
+
+def readings(
+    distances: "list[float]", angles: "list[float]"
+) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+    """
+    Arrays of readings, timestamped by index.
+    """
+    return (
+        np.array(distances, dtype=np.float64),
+        np.array(angles, dtype=np.float64),
+        np.arange(0, len(distances), dtype=np.int64),
+    )
+
+
+class TestDetectionGate:
+    """
+    Test for the DetectionGate.run() method.
+    """
+
+    def test_pass_everything(self) -> None:
+        """
+        An open gate keeps every reading.
+        """
+        gate = detection_gate.DetectionGate([], 0.0, 50.0, 0)
+
+        distances, angles, timestamps = gate.run(*readings([1.0, 2.0], [-100.0, 100.0]))
+
+        assert distances.tolist() == [1.0, 2.0]
+        assert angles.tolist() == [-100.0, 100.0]
+        assert timestamps.tolist() == [0, 1]
+        assert str(gate) == "angle rejected: 0, range rejected: 0, decimated: 0"
+
+    def test_angle_windows(self) -> None:
+        """
+        Windows are relative to the drone, after the mount yaw offset.
+        """
+        gate = detection_gate.DetectionGate([(-30.0, 30.0), (150.0, 180.0)], 0.0, 50.0, 0)
+
+        _, angles, timestamps = gate.run(*readings([1.0] * 4, [0.0, 45.0, -10.0, 170.0]))
+        assert timestamps.tolist() == [0, 2, 3]
+        assert angles.tolist() == [0.0, -10.0, 170.0]
+        assert gate.angle_rejected_count == 1
+
+        # Lidar facing backwards
+        _, _, timestamps = gate.run(*readings([1.0] * 3, [90.0, 170.0, -160.0]), 180.0)
+        assert timestamps.tolist() == [1, 2]
+        assert gate.angle_rejected_count == 2
+
+    def test_range(self) -> None:
+        """
+        Readings outside the range limits are rejected and counted once.
+        """
+        gate = detection_gate.DetectionGate([(-30.0, 30.0)], 0.5, 10.0, 0)
+
+        distances, _, _ = gate.run(*readings([0.2, 5.0, 20.0, 20.0], [0.0, 0.0, 0.0, 90.0]))
+
+        assert distances.tolist() == [5.0]
+        assert gate.range_rejected_count == 2
+        assert gate.angle_rejected_count == 1
+
+    def test_decimation(self) -> None:
+        """
+        The nearest reading of each run in the same bin is kept, in order.
+        """
+        gate = detection_gate.DetectionGate([], 0.0, 50.0, 100)
+
+        distances, angles, timestamps = gate.run(
+            *readings([3.0, 2.0, 4.0, 1.0, 5.0, 6.0], [0.1, 0.5, 0.9, 1.2, 1.8, 0.5])
+        )
+
+        assert distances.tolist() == [2.0, 1.0, 6.0]
+        assert angles.tolist() == [0.5, 1.2, 0.5]
+        assert timestamps.tolist() == [1, 3, 5]
+        assert gate.decimated_count == 3
@@ -0,0 +1,117 @@
+"""
+Test for distance decoder.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from modules.detection import crc16
+from modules.detection import distance_decoder
+
+# pylint: disable=redefined-outer-name
+
+
+def build_distance_packet(distance_in_cm: int, yaw: int) -> bytes:
+    """
+    Create raw bytes for a distance packet, yaw is the raw unsigned field.
+    """
+    packet = struct.pack("<BHBHH", 0xAA, 0x0140, 44, distance_in_cm, yaw)
+    crc = crc16.create_crc(packet)
+
+    return packet + struct.pack("<H", crc)
+
+
+def decode_reference(distance_in_cm: int, yaw: int) -> "tuple[float, float]":
+    """
+    Per packet decoding, returns -1, 0 for an invalid reading.
+    """
+    distance = distance_in_cm / 100.0
+    if distance < 0 or distance > 50:
+        return -1, 0
+
+    if yaw > 32000:
+        yaw = yaw - 65535
+
+    angle = yaw / 100.0
+    if angle <= -170 or angle >= 170:
+        return -1, 0
+
+    return distance, angle
+
+
+@pytest.fixture()
+def fields() -> "list[tuple[int, int]]":  # type: ignore
+    """
+    Raw (distance, yaw) fields including every validity boundary.
+    """
+    yield [
+        (0, 0),
+        (250, 1000),
+        (5000, 16999),
+        (5001, 0),
+        (65535, 0),
+        (300, 17000),
+        (300, 17001),
+        (300, 65535 - 16999),
+        (300, 65535 - 17000),
+        (300, 32000),
+        (300, 32001),
+        (300, 65535),
+    ]
+
+
+class TestDistanceDecoder:
+    """
+    Test for the distance decoder functions.
+    """
+
+    def test_decode_matches_reference(self, fields: "list[tuple[int, int]]") -> None:
+        """
+        Vectorized decoding applies the same scaling and validity rules as per packet decoding.
+        """
+        data = b"".join(build_distance_packet(distance, yaw) for distance, yaw in fields)
+        packets = np.frombuffer(data, dtype=distance_decoder.PACKET_DTYPE)
+
+        distances, angles, valid = distance_decoder.decode(packets)
+
+        for i, (distance, yaw) in enumerate(fields):
+            expected_distance, expected_angle = decode_reference(distance, yaw)
+            assert valid[i] == (expected_distance != -1)
+            if valid[i]:
+                assert distances[i] == expected_distance
+                assert angles[i] == expected_angle
+
+    def test_find_packets(self) -> None:
+        """
+        Only distance packets with a valid CRC are found, wherever they start.
+        """
+        first = build_distance_packet(250, 1000)
+        second = build_distance_packet(300, 2000)
+        corrupted = bytearray(build_distance_packet(400, 3000))
+        corrupted[4] ^= 0xFF
+        update_rate_response = bytes([0xAA, 0x80, 0x00, 66, 5, 0x00, 0x00])
+
+        data = b"\x01\xaa" + first + bytes(corrupted) + update_rate_response + second + first[:5]
+
+        packets = distance_decoder.find_packets(data)
+
+        assert packets["distance"].tolist() == [250, 300]
+        assert packets["yaw"].tolist() == [1000, 2000]
+
+    def test_packet_mask(self) -> None:
+        """
+        Candidates are rejected for a wrong signature or CRC.
+        """
+        good = build_distance_packet(250, 1000)
+        bad_crc = bytearray(good)
+        bad_crc[-1] ^= 0x01
+        other_command = bytearray(good)
+        other_command[3] = 27
+
+        raw = np.frombuffer(good + bytes(bad_crc) + bytes(other_command), dtype=np.uint8)
+
+        mask = distance_decoder.packet_mask(raw.reshape(-1, distance_decoder.PACKET_SIZE))
+
+        assert mask.tolist() == [True, False, False]
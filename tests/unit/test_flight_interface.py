@@ -2,6 +2,12 @@
 Test for flight interface by printing to device.
 """
 
+import math
+
+import pytest
+
+from modules import decision_command
+from modules.flight_interface import conversions
 from modules.flight_interface import flight_interface
 
 
@@ -20,6 +26,96 @@ def create_flight_interface_instance(
     return result, flight_interface_instance
 
 
+class FakeDrone:
+    """
+    Records the MAVLink messages sent.
+    """
+
+    def __init__(self) -> None:
+        self.message_factory = self
+        self.messages = []
+
+    # pylint: disable-next=invalid-name
+    def set_position_target_local_ned_encode(self, *args: float) -> "tuple[float, ...]":
+        """
+        Message as its fields.
+        """
+        return args
+
+    def send_mavlink(self, message: "tuple[float, ...]") -> None:
+        """
+        Record the message.
+        """
+        self.messages.append(message)
+
+
+class FakeFlightController:
+    """
+    Flight controller that records flight mode changes.
+    """
+
+    def __init__(self) -> None:
+        self.drone = FakeDrone()
+        self.flight_modes = []
+
+    def get_home_location(self, _: float) -> "tuple[bool, object]":
+        """
+        Any home location.
+        """
+        return True, object()
+
+    def get_next_waypoint(self) -> "tuple[bool, object]":
+        """
+        Any waypoint.
+        """
+        return True, object()
+
+    def set_flight_mode(self, mode: str) -> bool:
+        """
+        Record the mode.
+        """
+        self.flight_modes.append(mode)
+        return True
+
+
+class TestFlightInterfaceHeadingChange:
+    """
+    Heading change commands, with a fake flight controller.
+    """
+
+    def test_heading_change_then_resume(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        A heading change flies the heading in GUIDED mode until the mission is resumed.
+        """
+        controller = FakeFlightController()
+        monkeypatch.setattr(
+            flight_interface.flight_controller.FlightController,
+            "create",
+            lambda _: (True, controller),
+        )
+        monkeypatch.setattr(conversions, "position_global_to_local", lambda *_: (True, None))
+
+        result, instance = flight_interface.FlightInterface.create("", 1.0, 1.0)
+        assert result
+        assert instance is not None
+
+        _, command = decision_command.DecisionCommand.create_heading_change_command(90.0, 2.0)
+        assert instance.heading_change_handler(command.heading, command.speed)
+        assert instance.heading_change_handler(100.0, 2.0)
+
+        # GUIDED is only set once
+        assert controller.flight_modes == ["GUIDED"]
+        assert len(controller.drone.messages) == 2
+        north, east, down = controller.drone.messages[0][8:11]
+        assert north == pytest.approx(0.0, abs=1e-9)
+        assert east == pytest.approx(2.0)
+        assert down == 0
+        assert controller.drone.messages[0][14] == pytest.approx(math.pi / 2)
+
+        assert instance.resume_handler()
+        assert controller.flight_modes == ["GUIDED", "AUTO"]
+
+
 class TestFlightInterface:
     """
     Flight interface tests.
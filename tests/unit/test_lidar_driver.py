@@ -0,0 +1,239 @@
+"""
+Test for lidar driver using the SF45/B emulator.
+"""
+
+import concurrent.futures
+import pathlib
+import struct
+import sys
+import threading
+import time
+
+import pytest
+
+from modules.detection import lidar_driver
+from modules.detection import serial_capture
+
+if not sys.platform.startswith("linux"):
+    pytest.skip("SF45/B emulator requires a Linux pseudo-terminal", allow_module_level=True)
+
+# pylint: disable=wrong-import-position
+from tests.emulator import sf45b_emulator
+
+# pylint: enable=wrong-import-position
+
+BAUDRATE = 921600
+TIMEOUT = 0.1  # seconds
+UPDATE_RATE = 12  # 5000 Hz
+LOW_ANGLE = -170.0  # degrees
+HIGH_ANGLE = 170.0  # degrees
+SPEED = 5
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def emulator() -> sf45b_emulator.Sf45bEmulator:  # type: ignore
+    """
+    Emulated lidar, not yet configured.
+    """
+    emulator_instance = sf45b_emulator.Sf45bEmulator()
+    emulator_instance.start()
+    yield emulator_instance
+    emulator_instance.stop()
+
+
+@pytest.fixture()
+def streaming_emulator() -> sf45b_emulator.Sf45bEmulator:  # type: ignore
+    """
+    Emulated lidar already streaming with the test configuration.
+    """
+    emulator_instance = sf45b_emulator.Sf45bEmulator()
+    emulator_instance.set_streaming(UPDATE_RATE, LOW_ANGLE, HIGH_ANGLE)
+    emulator_instance.start()
+    yield emulator_instance
+    emulator_instance.stop()
+
+
+def configure(lidar: lidar_driver.LidarDriver) -> bool:
+    """
+    Configure lidar with the test configuration.
+    """
+    return lidar.configure(lidar.serial_port, UPDATE_RATE, LOW_ANGLE, HIGH_ANGLE, SPEED)
+
+
+class TestLidarDriver:
+    """
+    Test for LidarDriver against the emulator.
+    """
+
+    def test_configure(self, emulator: sf45b_emulator.Sf45bEmulator) -> None:
+        """
+        Configuration writes every setting and starts streaming.
+        """
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+
+        assert configure(lidar)
+        assert lidar.update_rate == UPDATE_RATE
+        assert emulator.settings[emulator.UPDATE_RATE] == [UPDATE_RATE]
+        assert emulator.settings[emulator.LOW_ANGLE] == list(struct.pack("<f", LOW_ANGLE))
+        assert emulator.settings[emulator.STREAM][0] == emulator.STREAM_DISTANCE
+
+        distance, angle = lidar.wait_for_reading(lidar.serial_port)
+
+        assert distance > 0
+        assert LOW_ANGLE < angle < HIGH_ANGLE
+
+    def test_warm_reattach(self, streaming_emulator: sf45b_emulator.Sf45bEmulator) -> None:
+        """
+        Only settings that differ are written when the lidar is already streaming.
+        """
+        streaming_emulator.settings[streaming_emulator.ROTATION_SPEED] = list(
+            struct.pack("<H", SPEED + 1)
+        )
+        lidar = lidar_driver.LidarDriver(streaming_emulator.port_name, BAUDRATE, TIMEOUT)
+
+        assert configure(lidar)
+        assert streaming_emulator.writes_received == 1
+        assert lidar.update_rate == UPDATE_RATE
+
+    def test_warm_reattach_invalid_update_rate(
+        self, streaming_emulator: sf45b_emulator.Sf45bEmulator
+    ) -> None:
+        """
+        An update rate read back outside the valid settings is written again.
+        """
+        streaming_emulator.read_overrides[streaming_emulator.UPDATE_RATE] = [13]
+        lidar = lidar_driver.LidarDriver(streaming_emulator.port_name, BAUDRATE, TIMEOUT)
+
+        assert configure(lidar)
+        assert streaming_emulator.writes_received == 1
+        assert streaming_emulator.settings[streaming_emulator.UPDATE_RATE] == [UPDATE_RATE]
+        assert lidar.update_rate == UPDATE_RATE
+
+    def test_read_batch(self, emulator: sf45b_emulator.Sf45bEmulator) -> None:
+        """
+        Batches contain every streamed reading in order.
+        """
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+        assert configure(lidar)
+        assert lidar.start_reader(lidar.serial_port)
+
+        time.sleep(0.2)
+        distances, angles, timestamps = lidar.read_batch(lidar.serial_port, 100000)
+        lidar.stop_reader()
+
+        assert len(distances) > 100
+        assert len(distances) == len(angles) == len(timestamps)
+        assert ((distances == 3.0) | (distances == 20.0)).all()
+        assert (angles > LOW_ANGLE).all() and (angles < HIGH_ANGLE).all()
+        assert (timestamps[1:] >= timestamps[:-1]).all()
+
+    def test_command_while_streaming(self, emulator: sf45b_emulator.Sf45bEmulator) -> None:
+        """
+        Changing settings while streaming does not lose readings.
+        """
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+        assert configure(lidar)
+        assert lidar.start_reader(lidar.serial_port)
+
+        for speed in range(SPEED, SPEED + 10):
+            assert lidar.set_speed(lidar.serial_port, speed)
+
+        lidar.stop_reader()
+
+        assert lidar.overrun_count() == 0
+        assert emulator.bytes_dropped == 0
+        assert emulator.settings[emulator.ROTATION_SPEED] == list(struct.pack("<H", SPEED + 9))
+
+    def test_cancel_while_response_in_flight(
+        self, emulator: sf45b_emulator.Sf45bEmulator, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        A request timing out while its response is being dispatched gets the response,
+        and the reader thread keeps reading.
+        """
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+        assert configure(lidar)
+        assert lidar.start_reader(lidar.serial_port)
+
+        # Hold the first response in dispatch until after the request times out (1 s)
+        dispatching = threading.Event()
+
+        class SlowFuture(concurrent.futures.Future):
+            """
+            Future that is slow to complete the first time.
+            """
+
+            def set_result(self, result: bytes) -> None:
+                if not dispatching.is_set():
+                    dispatching.set()
+                    time.sleep(1.2)
+
+                super().set_result(result)
+
+        monkeypatch.setattr(concurrent.futures, "Future", SlowFuture)
+        requests_received = emulator.requests_received
+
+        assert lidar.set_speed(lidar.serial_port, SPEED + 1)
+        assert dispatching.is_set()
+        # The response was used, not requested again
+        assert emulator.requests_received == requests_received + 1
+
+        # Reader thread still running
+        lidar.read_batch(lidar.serial_port, 100000, 0)
+        time.sleep(0.1)
+        distances, _, _ = lidar.read_batch(lidar.serial_port, 100000, 0)
+        lidar.stop_reader()
+
+        assert len(distances) > 0
+
+    def test_capture_replay(
+        self, emulator: sf45b_emulator.Sf45bEmulator, tmp_path: pathlib.Path
+    ) -> None:
+        """
+        Replaying a capture produces the readings received while capturing.
+        """
+        path = str(tmp_path / "lidar.cap")
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+        assert lidar.start_capture(path)
+        assert configure(lidar)
+        assert lidar.start_reader(lidar.serial_port)
+
+        time.sleep(0.2)
+        lidar.stop_reader()
+        lidar.stop_capture()
+        distances, angles, _ = lidar.read_batch(lidar.serial_port, 100000, 0)
+
+        replay = serial_capture.CaptureReplay(path, real_time=False)
+        replay_lidar = lidar_driver.LidarDriver("", 0, 0, port=replay)
+        replay_distances = []
+        replay_angles = []
+        while not replay.at_end():
+            batch_distances, batch_angles, _ = replay_lidar.read_batch(replay, 100000, 0.1)
+            replay_distances.extend(batch_distances.tolist())
+            replay_angles.extend(batch_angles.tolist())
+        replay.close()
+
+        assert len(distances) > 100
+        assert replay_distances == distances.tolist()
+        assert replay_angles == angles.tolist()
+
+    def test_link_statistics(self, emulator: sf45b_emulator.Sf45bEmulator) -> None:
+        """
+        Link statistics count every streamed sample at the configured rate.
+        """
+        lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+        assert configure(lidar)
+        start_statistics = lidar.get_link_statistics()
+        assert lidar.start_reader(lidar.serial_port)
+
+        time.sleep(0.5)
+        lidar.stop_reader()
+        statistics = lidar.get_link_statistics()
+
+        assert statistics.update_frequency == 5000
+        assert statistics.crc_failure_count == 0
+        assert statistics.sample_count == emulator.samples_sent
+        assert statistics.sample_rate(start_statistics) > 0.8 * 5000
+        assert "samples/s of 5000 Hz" in statistics.report(start_statistics)
@@ -0,0 +1,75 @@
+"""
+Test for lidar multiplexer using the SF45/B emulator.
+"""
+
+import sys
+import time
+
+import pytest
+
+from modules.detection import lidar_driver
+from modules.detection import lidar_multiplexer
+
+if not sys.platform.startswith("linux"):
+    pytest.skip("SF45/B emulator requires a Linux pseudo-terminal", allow_module_level=True)
+
+# pylint: disable=wrong-import-position
+from tests.emulator import sf45b_emulator
+
+# pylint: enable=wrong-import-position
+
+BAUDRATE = 921600
+TIMEOUT = 0.1  # seconds
+UPDATE_RATE = 12  # 5000 Hz
+LOW_ANGLE = -170.0  # degrees
+HIGH_ANGLE = 170.0  # degrees
+SPEED = 5
+LIDAR_COUNT = 2
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def emulators() -> "list[sf45b_emulator.Sf45bEmulator]":  # type: ignore
+    """
+    Emulated lidars, not yet configured.
+    """
+    emulator_instances = [sf45b_emulator.Sf45bEmulator() for _ in range(0, LIDAR_COUNT)]
+    for emulator in emulator_instances:
+        emulator.start()
+
+    yield emulator_instances
+
+    for emulator in emulator_instances:
+        emulator.stop()
+
+
+class TestLidarMultiplexer:
+    """
+    Test for LidarMultiplexer against emulators.
+    """
+
+    def test_reads_every_lidar(self, emulators: "list[sf45b_emulator.Sf45bEmulator]") -> None:
+        """
+        Every lidar is read by the one thread and still accepts commands.
+        """
+        lidars = []
+        multiplexer = lidar_multiplexer.LidarMultiplexer()
+        for emulator in emulators:
+            lidar = lidar_driver.LidarDriver(emulator.port_name, BAUDRATE, TIMEOUT)
+            assert lidar.configure(lidar.serial_port, UPDATE_RATE, LOW_ANGLE, HIGH_ANGLE, SPEED)
+            assert multiplexer.add(lidar)
+            lidars.append(lidar)
+
+        assert not lidars[0].start_reader(lidars[0].serial_port)
+        assert multiplexer.start()
+
+        assert lidars[1].set_speed(lidars[1].serial_port, SPEED + 1)
+        time.sleep(0.3)
+        multiplexer.stop()
+
+        for lidar, emulator in zip(lidars, emulators):
+            distances, _, _ = lidar.read_batch(lidar.serial_port, 100000, 0)
+            assert len(distances) > 0.8 * emulator.samples_sent
+            assert lidar.overrun_count() == 0
+            assert emulator.bytes_dropped == 0
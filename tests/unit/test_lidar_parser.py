@@ -2,10 +2,18 @@
 Unit tests for lidar_parser module.
 """
 
+import multiprocessing as mp
+
+import numpy as np
 import pytest
 
 from modules import lidar_detection
+from modules import lidar_detection_batch
+from modules import lidar_oscillation
 from modules.lidar_parser import lidar_parser
+from modules.lidar_parser import lidar_parser_worker
+from worker import queue_wrapper
+from worker import worker_controller
 
 # pylint: disable=redefined-outer-name, duplicate-code
 
@@ -205,3 +213,240 @@ class TestLidarParser:
         result, oscillation = lidar_parser_instance.run(lidar_detection_down)
         assert result
         assert oscillation is not None
+
+
+def describe(oscillation: lidar_oscillation.LidarOscillation) -> "tuple":
+    """
+    Sweep id, direction, partial and (angle, timestamp) of each reading.
+    """
+    return (
+        oscillation.sweep_id,
+        oscillation.direction,
+        oscillation.is_partial,
+        [(reading.angle, reading.timestamp) for reading in oscillation.readings],
+    )
+
+
+def run_each(parser: lidar_parser.LidarParser, angles: "list[float]") -> "list[tuple]":
+    """
+    Oscillations from run().
+    """
+    oscillations = []
+    for timestamp, angle in enumerate(angles):
+        result, detection = lidar_detection.LidarDetection.create(5.0, angle, timestamp)
+        assert result
+        assert detection is not None
+
+        result, oscillation = parser.run(detection)
+        if result:
+            oscillations.append(describe(oscillation))
+
+    return oscillations
+
+
+def run_batches(
+    parser: lidar_parser.LidarParser, angles: "list[float]", batch_size: int
+) -> "list[tuple]":
+    """
+    Oscillations from run_batch().
+    """
+    oscillations = []
+    for start in range(0, len(angles), batch_size):
+        batch_angles = np.array(angles[start : start + batch_size])
+        result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            np.full(len(batch_angles), 5.0),
+            batch_angles,
+            np.arange(start, start + len(batch_angles)),
+        )
+        assert result
+        assert batch is not None
+
+        result, batch_oscillations = parser.run_batch(batch)
+        if result:
+            for oscillation in batch_oscillations:
+                oscillations.append(describe(oscillation))
+
+    return oscillations
+
+
+class TestLidarParserBatch:
+    """
+    Tests for the LidarParser run_batch() method.
+    """
+
+    @pytest.mark.parametrize("sector_width", [0.0, 10.0, 45.0])
+    @pytest.mark.parametrize("batch_size", [1, 2, 3, 7, 100])
+    def test_same_as_run(self, batch_size: int, sector_width: float) -> None:
+        """
+        Batches of any size split the oscillations and sectors like run(),
+        including repeated angles.
+        """
+        angles = [0.0, 0.0, 5.0, 10.0, 10.0, 15.0, 10.0, 5.0, 5.0, -5.0, 0.0, 20.0, 30.0, 25.0]
+        rng = np.random.default_rng(0)
+        angles += np.round(rng.uniform(-170, 170, 50)).tolist()
+
+        angles += list(range(-170, 171, 3)) + list(range(170, -171, -4))
+
+        expected_parser = lidar_parser.LidarParser(sector_width)
+        batch_parser = lidar_parser.LidarParser(sector_width)
+
+        expected = run_each(expected_parser, angles)
+        actual = run_batches(batch_parser, angles, batch_size)
+
+        assert actual == expected
+        assert batch_parser.direction == expected_parser.direction
+        assert batch_parser.last_angle == expected_parser.last_angle
+        assert [reading.timestamp for reading in batch_parser.lidar_readings] == [
+            reading.timestamp for reading in expected_parser.lidar_readings
+        ]
+
+    def test_arrays_only(
+        self, lidar_parser_instance: lidar_parser.LidarParser, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Batches are parsed as arrays, oscillations keep the lidar of the batch.
+        """
+
+        def to_detections(_: lidar_detection_batch.LidarDetectionBatch) -> None:
+            raise AssertionError("Detections made for each reading")
+
+        monkeypatch.setattr(
+            lidar_detection_batch.LidarDetectionBatch, "to_detections", to_detections
+        )
+
+        result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            np.array([5.0, -1.0, 5.0, 6.0, 7.0]),
+            np.array([-10.0, -5.0, 0.0, 10.0, 5.0]),
+            np.arange(0, 5),
+            2,
+            90.0,
+        )
+        assert result
+        assert batch is not None
+
+        result, oscillations = lidar_parser_instance.run_batch(batch)
+
+        assert result
+        assert len(oscillations) == 1
+        assert oscillations[0].distances.tolist() == [5.0, 5.0, 6.0]
+        assert oscillations[0].angles.tolist() == [-10.0, 0.0, 10.0]
+        assert oscillations[0].timestamps.tolist() == [0, 2, 3]
+        assert oscillations[0].sensor_id == 2
+        assert oscillations[0].mount_yaw_offset == 90.0
+        assert [reading.angle for reading in oscillations[0].readings] == [-10.0, 0.0, 10.0]
+
+    def test_sweeps(self, lidar_parser_instance: lidar_parser.LidarParser) -> None:
+        """
+        A batch of several sweeps returns each completed one.
+        """
+        angles = list(range(-10, 11, 5)) + list(range(5, -11, -5)) + list(range(-5, 11, 5))
+
+        oscillations = run_batches(lidar_parser_instance, angles, len(angles))
+
+        assert [len(readings) for _, _, _, readings in oscillations] == [5, 4]
+        assert lidar_parser_instance.direction == lidar_parser.Direction.UP
+        assert len(lidar_parser_instance.lidar_readings) == 4
+
+    def test_reset(self, lidar_parser_instance: lidar_parser.LidarParser) -> None:
+        """
+        After a reset the sweep in progress is discarded and the next reading starts a new sweep.
+        """
+        run_batches(lidar_parser_instance, [0.0, 5.0, 10.0], 3)
+
+        lidar_parser_instance.reset()
+        oscillations = run_batches(lidar_parser_instance, [20.0, 15.0, 10.0, 15.0], 4)
+
+        assert oscillations == [
+            (1, lidar_parser.Direction.DOWN, False, [(20.0, 0), (15.0, 1), (10.0, 2)])
+        ]
+
+
+class TestLidarParserSectors:
+    """
+    Tests for partial oscillations.
+    """
+
+    def test_sectors_then_sweep(self) -> None:
+        """
+        Each sector is output once covered, then the whole sweep when the direction changes.
+        """
+        parser = lidar_parser.LidarParser(20.0)
+
+        oscillations = run_each(parser, [float(angle) for angle in range(-50, 51, 10)] + [40.0])
+
+        assert [
+            (sweep_id, direction, is_partial, [angle for angle, _ in readings])
+            for sweep_id, direction, is_partial, readings in oscillations
+        ] == [
+            (0, lidar_oscillation.Direction.UP, True, [-50.0, -40.0, -30.0]),
+            (0, lidar_oscillation.Direction.UP, True, [-20.0, -10.0]),
+            (0, lidar_oscillation.Direction.UP, True, [0.0, 10.0]),
+            (0, lidar_oscillation.Direction.UP, True, [20.0, 30.0]),
+            (0, lidar_oscillation.Direction.UP, True, [40.0, 50.0]),
+            (
+                0,
+                lidar_oscillation.Direction.UP,
+                False,
+                [float(angle) for angle in range(-50, 51, 10)],
+            ),
+        ]
+        assert parser.sweep_id == 1
+        assert parser.direction == lidar_oscillation.Direction.DOWN
+
+    def test_no_sectors(self) -> None:
+        """
+        Without a sector width only complete sweeps are output.
+        """
+        parser = lidar_parser.LidarParser()
+
+        oscillations = run_each(parser, [0.0, 30.0, 60.0, 90.0, 60.0, 30.0, 60.0])
+
+        assert [(sweep_id, is_partial) for sweep_id, _, is_partial, _ in oscillations] == [
+            (0, False),
+            (1, False),
+        ]
+
+
+class TestLidarParserWorker:
+    """
+    Tests for lidar_oscillation_worker().
+    """
+
+    def test_two_lidars(self) -> None:
+        """
+        Interleaved batches of two lidars sweeping in opposite directions are parsed separately.
+        """
+        manager = mp.Manager()
+        detection_in_queue = queue_wrapper.QueueWrapper(manager)
+        oscillation_out_queue = queue_wrapper.QueueWrapper(manager)
+
+        sweeps = {
+            0: [-10.0, -5.0, 0.0, 5.0, 10.0, 5.0],
+            1: [10.0, 5.0, 0.0, -5.0, -10.0, -5.0],
+        }
+        for start in range(0, 6, 2):
+            for sensor_id, angles in sweeps.items():
+                result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+                    np.full(2, 5.0),
+                    np.array(angles[start : start + 2]),
+                    np.arange(start, start + 2),
+                    sensor_id,
+                    180.0 * sensor_id,
+                )
+                assert result
+                detection_in_queue.queue.put(batch)
+        detection_in_queue.queue.put(None)
+
+        lidar_parser_worker.lidar_oscillation_worker(
+            0.0, detection_in_queue, oscillation_out_queue, worker_controller.WorkerController()
+        )
+
+        oscillations = []
+        while not oscillation_out_queue.queue.empty():
+            oscillations.append(oscillation_out_queue.queue.get())
+        manager.shutdown()
+
+        assert [
+            (oscillation.sensor_id, oscillation.mount_yaw_offset, oscillation.angles.tolist())
+            for oscillation in oscillations
+        ] == [(0, 0.0, sweeps[0][:5]), (1, 180.0, sweeps[1][:5])]
@@ -0,0 +1,164 @@
+"""
+Test for packet framer.
+"""
+
+import pytest
+
+from modules.detection import crc16
+from modules.detection import packet_framer
+
+# pylint: disable=redefined-outer-name
+
+
+def build_packet(command: int, data: "list[int]") -> bytes:
+    """
+    Create raw bytes for a read response packet.
+    """
+    flags = (1 + len(data)) << 6
+    packet = [0xAA, flags & 0xFF, (flags >> 8) & 0xFF, command]
+    packet.extend(data)
+    crc = crc16.create_crc(packet)
+    packet.append(crc & 0xFF)
+    packet.append((crc >> 8) & 0xFF)
+
+    return bytes(packet)
+
+
+@pytest.fixture()
+def framer() -> packet_framer.PacketFramer:  # type: ignore
+    """
+    Construct a packet framer with a small buffer so that it has to reuse and grow it.
+    """
+    framer_instance = packet_framer.PacketFramer(16)
+    yield framer_instance
+
+
+@pytest.fixture()
+def distance_packet() -> bytes:  # type: ignore
+    """
+    Distance packet: 2.5 m at 10 degrees.
+    """
+    yield build_packet(44, [250, 0, 232, 3])
+
+
+@pytest.fixture()
+def update_rate_packet() -> bytes:  # type: ignore
+    """
+    Update rate response packet.
+    """
+    yield build_packet(66, [5])
+
+
+class TestPacketFramer:
+    """
+    Test for the PacketFramer.feed() method.
+    """
+
+    def test_single_packet(
+        self, framer: packet_framer.PacketFramer, distance_packet: bytes
+    ) -> None:
+        """
+        A whole packet is returned unchanged.
+        """
+        packets = framer.feed(distance_packet)
+
+        assert packets == [distance_packet]
+        assert framer.buffered_size() == 0
+
+    def test_multiple_packets_in_one_read(
+        self,
+        framer: packet_framer.PacketFramer,
+        distance_packet: bytes,
+        update_rate_packet: bytes,
+    ) -> None:
+        """
+        Every complete packet in the data is returned in order.
+        """
+        data = distance_packet * 3 + update_rate_packet + distance_packet
+
+        packets = framer.feed(data)
+
+        assert packets == [distance_packet] * 3 + [update_rate_packet, distance_packet]
+
+    def test_packet_split_across_reads(
+        self, framer: packet_framer.PacketFramer, distance_packet: bytes
+    ) -> None:
+        """
+        Partial packets are kept until the rest arrives.
+        """
+        packets = []
+        for i in range(0, len(distance_packet)):
+            packets.extend(framer.feed(distance_packet[i : i + 1]))
+            if i < len(distance_packet) - 1:
+                assert len(packets) == 0
+
+        assert packets == [distance_packet]
+
+    def test_garbage_is_skipped(
+        self, framer: packet_framer.PacketFramer, distance_packet: bytes
+    ) -> None:
+        """
+        Bytes before the start byte and oversized headers are discarded.
+        """
+        oversized_header = bytes([0xAA, 0xFF, 0xFF])
+
+        packets = framer.feed(b"\x01\x02" + oversized_header + distance_packet)
+
+        assert packets == [distance_packet]
+
+    def test_corrupted_packet_resynchronises(
+        self, framer: packet_framer.PacketFramer, distance_packet: bytes
+    ) -> None:
+        """
+        A packet with an invalid CRC is dropped and the following packet is still found.
+        """
+        corrupted = bytearray(distance_packet)
+        corrupted[5] ^= 0xFF
+
+        packets = framer.feed(bytes(corrupted) + distance_packet)
+
+        assert packets == [distance_packet]
+
+    def test_distance_packets_split_from_responses(
+        self,
+        framer: packet_framer.PacketFramer,
+        distance_packet: bytes,
+        update_rate_packet: bytes,
+    ) -> None:
+        """
+        Distance packets are returned as records and every other packet as bytes.
+        """
+        corrupted = bytearray(distance_packet)
+        corrupted[5] ^= 0xFF
+        data = distance_packet * 2 + update_rate_packet + bytes(corrupted) + distance_packet * 2
+
+        distance_packets, packets = framer.feed_distance_packets(data + distance_packet[:4])
+
+        assert distance_packets.tobytes() == distance_packet * 4
+        assert packets == [update_rate_packet]
+
+        distance_packets, packets = framer.feed_distance_packets(distance_packet[4:])
+
+        assert distance_packets.tobytes() == distance_packet
+        assert len(packets) == 0
+        assert framer.buffered_size() == 0
+
+    def test_link_counters(
+        self, framer: packet_framer.PacketFramer, distance_packet: bytes
+    ) -> None:
+        """
+        Skipped bytes, CRC failures and oversized headers are counted.
+        """
+        corrupted = bytearray(distance_packet)
+        corrupted[5] ^= 0xFF
+        oversized_header = bytes([0xAA, 0xFF, 0xFF])
+        data = b"\x01\x02" + oversized_header + bytes(corrupted) + distance_packet
+
+        framer.feed(data)
+
+        assert framer.byte_count == len(data)
+        assert framer.packet_count == 1
+        assert framer.crc_failure_count == 1
+        assert framer.oversized_count == 1
+        assert framer.resync_count() == 2
+        assert framer.discarded_byte_count == len(data) - len(distance_packet)
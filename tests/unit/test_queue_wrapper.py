@@ -0,0 +1,126 @@
+"""
+Test for queue wrapper policies.
+"""
+
+import multiprocessing as mp
+import multiprocessing.managers
+import queue
+
+import pytest
+
+from worker import queue_wrapper
+
+MAX_SIZE = 2
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(scope="module")
+def mp_manager() -> multiprocessing.managers.SyncManager:  # type: ignore
+    """
+    Manager shared by the tests.
+    """
+    manager = mp.Manager()
+    yield manager
+    manager.shutdown()
+
+
+def put_all(wrapper: queue_wrapper.QueueWrapper, count: int) -> None:
+    """
+    Process putting count items.
+    """
+    for item in range(0, count):
+        wrapper.put(item)
+
+
+def get_all(wrapper: queue_wrapper.QueueWrapper) -> "list[object]":
+    """
+    Every item in the queue, oldest first.
+    """
+    items = []
+    while True:
+        try:
+            items.append(wrapper.queue.get_nowait())
+        except queue.Empty:
+            return items
+
+
+class TestQueueWrapper:
+    """
+    Test for putting into a full queue.
+    """
+
+    def test_block(self, mp_manager: multiprocessing.managers.SyncManager) -> None:
+        """
+        Items are added while there is space.
+        """
+        wrapper = queue_wrapper.QueueWrapper(mp_manager, MAX_SIZE)
+
+        assert wrapper.put(1)
+        assert wrapper.put(2)
+
+        assert get_all(wrapper) == [1, 2]
+        assert wrapper.drop_count() == 0
+
+    def test_drop_oldest(self, mp_manager: multiprocessing.managers.SyncManager) -> None:
+        """
+        The oldest item makes space.
+        """
+        wrapper = queue_wrapper.QueueWrapper(
+            mp_manager, MAX_SIZE, queue_wrapper.QueuePolicy.DROP_OLDEST
+        )
+
+        for item in range(0, 5):
+            assert wrapper.put(item)
+
+        assert get_all(wrapper) == [3, 4]
+        assert wrapper.drop_count() == 3
+
+    def test_drop_newest(self, mp_manager: multiprocessing.managers.SyncManager) -> None:
+        """
+        Items put into a full queue are discarded.
+        """
+        wrapper = queue_wrapper.QueueWrapper(
+            mp_manager, MAX_SIZE, queue_wrapper.QueuePolicy.DROP_NEWEST
+        )
+
+        assert wrapper.put(0)
+        assert wrapper.put(1)
+        assert not wrapper.put(2)
+
+        assert get_all(wrapper) == [0, 1]
+        assert wrapper.drop_count() == 1
+
+    def test_conflate(self, mp_manager: multiprocessing.managers.SyncManager) -> None:
+        """
+        Only the latest item is kept.
+        """
+        wrapper = queue_wrapper.QueueWrapper(
+            mp_manager, MAX_SIZE, queue_wrapper.QueuePolicy.CONFLATE
+        )
+
+        for item in range(0, 3):
+            assert wrapper.put(item)
+
+        assert get_all(wrapper) == [2]
+        assert wrapper.drop_count() == 2
+
+    def test_drops_counted_across_processes(
+        self, mp_manager: multiprocessing.managers.SyncManager
+    ) -> None:
+        """
+        Drops by every producer process are counted.
+        """
+        wrapper = queue_wrapper.QueueWrapper(
+            mp_manager, MAX_SIZE, queue_wrapper.QueuePolicy.DROP_NEWEST
+        )
+        wrapper.put(0)
+        wrapper.put(1)
+
+        processes = [mp.Process(target=put_all, args=(wrapper, 200)) for _ in range(0, 4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert wrapper.drop_count() == 4 * 200
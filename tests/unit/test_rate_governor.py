@@ -0,0 +1,94 @@
+"""
+Test for rate governor.
+"""
+
+import pytest
+
+from modules.detection import rate_governor
+
+# pylint: disable=redefined-outer-name
+
+MIN_UPDATE_RATE = 5
+MAX_UPDATE_RATE = 12  # 5000 Hz
+ROTATE_SPEED = 5
+MAX_LAG = 0.5  # seconds
+HOLD_TIME = 2.0  # seconds
+QUEUE_MAX_SIZE = 100
+
+
+@pytest.fixture()
+def governor() -> rate_governor.RateGovernor:  # type: ignore
+    """
+    Governor stepping between update rates 5 and 12.
+    """
+    governor_instance = rate_governor.RateGovernor(
+        MIN_UPDATE_RATE, MAX_UPDATE_RATE, ROTATE_SPEED, MAX_LAG, HOLD_TIME
+    )
+    yield governor_instance
+
+
+class TestRateGovernor:
+    """
+    Test for the RateGovernor.run() method.
+    """
+
+    def test_no_change_without_backlog(self, governor: rate_governor.RateGovernor) -> None:
+        """
+        The configured rate is kept while the pipeline keeps up.
+        """
+        for i in range(0, 10):
+            result, _ = governor.run(MAX_UPDATE_RATE, 0, QUEUE_MAX_SIZE, 0.01, i * HOLD_TIME)
+            assert not result
+
+    def test_step_down_on_full_queue(self, governor: rate_governor.RateGovernor) -> None:
+        """
+        A backed up queue steps the rate down once per hold time.
+        """
+        result, update_rate = governor.run(MAX_UPDATE_RATE, 90, QUEUE_MAX_SIZE, 0.01, 0.0)
+        assert result
+        assert update_rate == MAX_UPDATE_RATE - 1
+
+        result, _ = governor.run(update_rate, 90, QUEUE_MAX_SIZE, 0.01, HOLD_TIME / 2)
+        assert not result
+
+        result, update_rate = governor.run(update_rate, 90, QUEUE_MAX_SIZE, 0.01, HOLD_TIME)
+        assert result
+        assert update_rate == MAX_UPDATE_RATE - 2
+
+    def test_step_down_on_lag(self, governor: rate_governor.RateGovernor) -> None:
+        """
+        Late readings step the rate down even with an unbounded queue, never below the minimum.
+        """
+        result, update_rate = governor.run(MAX_UPDATE_RATE, 1000, 0, MAX_LAG, 0.0)
+        assert result
+        assert update_rate == MAX_UPDATE_RATE - 1
+
+        result, _ = governor.run(MIN_UPDATE_RATE, 1000, 0, MAX_LAG, 10 * HOLD_TIME)
+        assert not result
+
+    def test_step_up_after_backlog_clears(self, governor: rate_governor.RateGovernor) -> None:
+        """
+        The rate returns towards the configured rate after hold time without a backlog.
+        """
+        result, update_rate = governor.run(MAX_UPDATE_RATE, 90, QUEUE_MAX_SIZE, 0.01, 0.0)
+        assert result
+
+        # Some backlog remains
+        result, _ = governor.run(update_rate, 50, QUEUE_MAX_SIZE, 0.01, 3 * HOLD_TIME)
+        assert not result
+
+        result, _ = governor.run(update_rate, 0, QUEUE_MAX_SIZE, 0.01, 4 * HOLD_TIME)
+        assert not result
+
+        result, update_rate = governor.run(update_rate, 0, QUEUE_MAX_SIZE, 0.01, 5 * HOLD_TIME)
+        assert result
+        assert update_rate == MAX_UPDATE_RATE
+
+    def test_rotate_speed_keeps_sample_spacing(self, governor: rate_governor.RateGovernor) -> None:
+        """
+        Rotation slows down with the sample frequency, within the speed limits.
+        """
+        assert governor.rotate_speed_for(MAX_UPDATE_RATE) == ROTATE_SPEED
+        assert governor.rotate_speed_for(11) == 10  # 2500 Hz
+        assert governor.rotate_speed_for(5) == 50  # 500 Hz
+        assert governor.rotate_speed_for(1) == 500  # 50 Hz
@@ -0,0 +1,72 @@
+"""
+Test for lidar reading ring buffer.
+"""
+
+import numpy as np
+import pytest
+
+from modules.detection import reading_buffer
+
+CAPACITY = 8  # readings
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def buffer() -> reading_buffer.ReadingBuffer:  # type: ignore
+    """
+    Construct a small reading buffer.
+    """
+    buffer_instance = reading_buffer.ReadingBuffer(CAPACITY)
+    yield buffer_instance
+
+
+class TestReadingBuffer:
+    """
+    Test for pushing and popping readings.
+    """
+
+    def test_push_and_pop(self, buffer: reading_buffer.ReadingBuffer) -> None:
+        """
+        Readings are returned oldest first.
+        """
+        assert buffer.push(1, 2.5, 10.0)
+        assert buffer.push(2, 3.5, 11.0)
+
+        records = buffer.pop(10)
+
+        assert len(records) == 2
+        assert records["timestamp"].tolist() == [1, 2]
+        assert records["distance"].tolist() == [2.5, 3.5]
+        assert records["angle"].tolist() == [10.0, 11.0]
+        assert len(buffer) == 0
+
+    def test_wrap_around(self, buffer: reading_buffer.ReadingBuffer) -> None:
+        """
+        Readings that wrap around the end of the buffer stay in order.
+        """
+        values = np.arange(0, 6, dtype=np.float64)
+        assert buffer.push_many(values.astype(np.int64), values, values) == 6
+        assert len(buffer.pop(5)) == 5
+
+        values = np.arange(6, 12, dtype=np.float64)
+        assert buffer.push_many(values.astype(np.int64), values, values) == 6
+
+        records = buffer.pop(CAPACITY)
+
+        assert records["distance"].tolist() == [5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0]
+        assert buffer.overrun_count == 0
+
+    def test_overrun(self, buffer: reading_buffer.ReadingBuffer) -> None:
+        """
+        Readings that do not fit are dropped and counted.
+        """
+        values = np.arange(0, CAPACITY + 3, dtype=np.float64)
+
+        assert buffer.push_many(values.astype(np.int64), values, values) == CAPACITY
+        assert not buffer.push(0, 0.0, 0.0)
+        assert buffer.overrun_count == 4
+
+        records = buffer.pop(CAPACITY + 3)
+
+        assert records["distance"].tolist() == values[:CAPACITY].tolist()
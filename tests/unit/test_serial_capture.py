@@ -0,0 +1,186 @@
+"""
+Test for serial capture and replay.
+"""
+
+import pathlib
+import time
+
+import pytest
+
+from modules.detection import crc16
+from modules.detection import lidar_driver
+from modules.detection import serial_capture
+
+# pylint: disable=redefined-outer-name
+
+CHUNK_PERIOD = 20_000_000  # ns
+
+
+def build_distance_packet(distance_in_cm: int, angle_in_centidegrees: int) -> bytes:
+    """
+    Create raw bytes for a distance packet.
+    """
+    yaw = angle_in_centidegrees & 0xFFFF
+    packet = [
+        0xAA,
+        0x40,
+        0x01,
+        44,
+        distance_in_cm & 0xFF,
+        distance_in_cm >> 8,
+        yaw & 0xFF,
+        yaw >> 8,
+    ]
+    crc = crc16.create_crc(packet)
+    packet.append(crc & 0xFF)
+    packet.append((crc >> 8) & 0xFF)
+
+    return bytes(packet)
+
+
+@pytest.fixture()
+def chunks() -> "list[bytes]":  # type: ignore
+    """
+    Reads of 3 distance packets each, with packets split across reads.
+    """
+    data = b"".join(build_distance_packet(100 + i, i * 100) for i in range(0, 30))
+    yield [data[i : i + 30] for i in range(0, len(data), 30)]
+
+
+@pytest.fixture()
+def capture_path(tmp_path: pathlib.Path, chunks: "list[bytes]") -> str:  # type: ignore
+    """
+    Capture file of the chunks, read CHUNK_PERIOD apart.
+    """
+    path = str(tmp_path / "lidar.cap")
+    writer = serial_capture.CaptureWriter(path)
+    for i, chunk in enumerate(chunks):
+        writer.write(1_000_000_000 + i * CHUNK_PERIOD, chunk)
+    writer.close()
+
+    yield path
+
+
+class TestSerialCapture:
+    """
+    Test for CaptureWriter and CaptureReplay.
+    """
+
+    def test_replay_returns_captured_bytes(self, capture_path: str, chunks: "list[bytes]") -> None:
+        """
+        Unlimited speed replay returns every captured chunk in order.
+        """
+        replay = serial_capture.CaptureReplay(capture_path, real_time=False)
+
+        data = []
+        while not replay.at_end():
+            first_byte = replay.read(1)
+            data.append(first_byte + replay.read(replay.in_waiting))
+
+        assert data == chunks
+        assert replay.read(1) == b""
+        replay.close()
+
+    def test_capture_sessions(self, capture_path: str, chunks: "list[bytes]") -> None:
+        """
+        Opening an existing capture appends a session, which can be replayed on its own.
+        """
+        writer = serial_capture.CaptureWriter(capture_path)
+        writer.write(5, b"\x01\x02")
+        writer.close()
+
+        for session, expected in [
+            (None, b"".join(chunks) + b"\x01\x02"),
+            (0, b"".join(chunks)),
+            (1, b"\x01\x02"),
+        ]:
+            replay = serial_capture.CaptureReplay(capture_path, real_time=False, session=session)
+            data = b""
+            while not replay.at_end():
+                data += replay.read(64)
+
+            assert data == expected
+            assert replay.session_index == (1 if session is None else session)
+            replay.close()
+
+    def test_real_time_replay_across_sessions(
+        self, capture_path: str, chunks: "list[bytes]"
+    ) -> None:
+        """
+        Real time replay does not wait for the clock of the next session.
+        """
+        writer = serial_capture.CaptureWriter(capture_path)
+        writer.write(100_000_000_000, b"\x01\x02")
+        writer.close()
+
+        replay = serial_capture.CaptureReplay(capture_path, real_time=True)
+
+        start_time = time.monotonic()
+        while not replay.at_end():
+            replay.read(64)
+        duration = time.monotonic() - start_time
+
+        assert duration < len(chunks) * CHUNK_PERIOD / 1e9 + 1.0
+        assert replay.timestamp == 100_000_000_000
+        replay.close()
+
+    def test_capture_flushed(self, tmp_path: pathlib.Path) -> None:
+        """
+        Captured data reaches the file without closing it.
+        """
+        path = tmp_path / "lidar.cap"
+        writer = serial_capture.CaptureWriter(str(path), 0.0)
+        writer.write(0, b"\x01\x02")
+
+        assert path.stat().st_size == (
+            serial_capture.SESSION_HEADER_SIZE + serial_capture.RECORD_HEADER_SIZE + 2
+        )
+        writer.close()
+
+    def test_real_time_replay(self, capture_path: str, chunks: "list[bytes]") -> None:
+        """
+        Real time replay takes as long as the capture.
+        """
+        replay = serial_capture.CaptureReplay(capture_path, real_time=True)
+
+        start_time = time.monotonic()
+        while not replay.at_end():
+            replay.read(64)
+        duration = time.monotonic() - start_time
+
+        assert duration >= (len(chunks) - 1) * CHUNK_PERIOD / 1e9
+        replay.close()
+
+    def test_not_a_capture(self, tmp_path: pathlib.Path) -> None:
+        """
+        Files without the capture header are rejected.
+        """
+        path = tmp_path / "other.bin"
+        path.write_bytes(bytes(64))
+
+        with pytest.raises(ValueError):
+            serial_capture.CaptureReplay(str(path))
+
+    def test_driver_reads_replay(self, capture_path: str) -> None:
+        """
+        The driver decodes every reading of a replayed capture, at the time it was captured.
+        """
+        replay = serial_capture.CaptureReplay(capture_path, real_time=False)
+        lidar = lidar_driver.LidarDriver("", 0, 0, port=replay)
+
+        distances = []
+        angles = []
+        timestamps = []
+        while not replay.at_end():
+            batch_distances, batch_angles, batch_timestamps = lidar.read_batch(
+                lidar.serial_port, 100, 0.1
+            )
+            distances.extend(batch_distances.tolist())
+            angles.extend(batch_angles.tolist())
+            timestamps.extend(batch_timestamps.tolist())
+
+        assert distances == [(100 + i) / 100 for i in range(0, 30)]
+        assert angles == list(range(0, 30))
+        # 3 readings per chunk, update rate unknown so not back-computed
+        assert timestamps == [1_000_000_000 + (i // 3) * CHUNK_PERIOD for i in range(0, 30)]
+        replay.close()
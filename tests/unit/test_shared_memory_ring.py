@@ -0,0 +1,195 @@
+"""
+Test for shared memory ring.
+"""
+
+import multiprocessing as mp
+import queue
+
+import numpy as np
+import pytest
+
+from worker import shared_memory_ring
+
+# pylint: disable=redefined-outer-name
+
+CAPACITY = 8
+MAX_CONSUMERS = 2
+
+
+@pytest.fixture()
+def ring() -> shared_memory_ring.SharedMemoryRing:  # type: ignore
+    """
+    Small ring with 2 consumers.
+    """
+    result, ring_instance = shared_memory_ring.SharedMemoryRing.create(CAPACITY, MAX_CONSUMERS)
+    assert result
+    assert ring_instance is not None
+
+    yield ring_instance
+
+    ring_instance.unlink()
+
+
+def write_readings(ring: shared_memory_ring.SharedMemoryRing, start: int, count: int) -> None:
+    """
+    Readings numbered from start: timestamp i, distance i / 10, angle i.
+    """
+    numbers = np.arange(start, start + count)
+    ring.write(numbers, numbers / 10, numbers.astype(np.float64))
+
+
+def read_all(consumer: shared_memory_ring.SharedMemoryRingConsumer) -> "list[int]":
+    """
+    Timestamps of every unread reading.
+    """
+    timestamps = []
+    while True:
+        try:
+            batch = consumer.get_nowait()
+        except queue.Empty:
+            return timestamps
+
+        timestamps.extend(batch.timestamps.tolist())
+
+
+def produce(ring: shared_memory_ring.SharedMemoryRing) -> None:
+    """
+    Process writing to a ring it received as an argument.
+    """
+    write_readings(ring, 0, 5)
+    ring.close()
+
+
+class TestSharedMemoryRing:
+    """
+    Test for SharedMemoryRing and SharedMemoryRingConsumer.
+    """
+
+    def test_every_consumer_reads_every_reading(
+        self, ring: shared_memory_ring.SharedMemoryRing
+    ) -> None:
+        """
+        Each consumer has its own read index.
+        """
+        _, first = ring.consumer(0)
+        _, second = ring.consumer(1)
+
+        write_readings(ring, 0, 3)
+        assert read_all(first) == [0, 1, 2]
+        assert ring.backlog() == 3
+
+        write_readings(ring, 3, 5)
+        assert read_all(first) == [3, 4, 5, 6, 7]
+        assert read_all(second) == list(range(0, 8))
+        assert ring.backlog() == 0
+
+    def test_backlog_of_registered_consumers(
+        self, ring: shared_memory_ring.SharedMemoryRing
+    ) -> None:
+        """
+        Consumers that are not registered do not hold back the backlog.
+        """
+        _, consumer = ring.consumer(0)
+
+        write_readings(ring, 0, 3)
+        assert ring.backlog() == 3
+
+        read_all(consumer)
+        assert ring.backlog() == 0
+
+    def test_batch_is_a_view(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        Batches read the shared memory directly and are split where the ring wraps.
+        """
+        _, consumer = ring.consumer(0)
+        write_readings(ring, 0, 6)
+        read_all(consumer)
+        write_readings(ring, 6, 4)
+
+        batch = consumer.get_nowait()
+
+        assert batch.timestamps.tolist() == [6, 7]
+        assert np.shares_memory(batch.distances, ring.records)
+        assert batch.distances.tolist() == [0.6, 0.7]
+        assert consumer.get_nowait().timestamps.tolist() == [8, 9]
+
+    def test_overrun(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        A consumer that falls behind skips and counts the overwritten readings.
+        """
+        _, consumer = ring.consumer(0)
+        write_readings(ring, 0, 2)
+        consumer.get_nowait()
+        assert not consumer.is_overwritten()
+
+        write_readings(ring, 2, CAPACITY + 3)
+
+        assert consumer.is_overwritten()
+        assert read_all(consumer) == list(range(5, CAPACITY + 5))
+        assert consumer.overrun_count == 3
+
+    def test_overwritten_during_write(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        A batch is overwritten as soon as the producer starts writing over it.
+        """
+        _, consumer = ring.consumer(0)
+        write_readings(ring, 0, 2)
+        consumer.get_nowait()
+        overwritten = []
+
+        class ObservedRecords(np.ndarray):
+            """
+            Records that check the consumer before each assignment.
+            """
+
+            def __setitem__(self, key: str, value: np.ndarray) -> None:
+                overwritten.append(consumer.is_overwritten())
+                super().__setitem__(key, value)
+
+        ring.records = ring.records.view(ObservedRecords)
+        write_readings(ring, 2, CAPACITY)
+
+        assert overwritten[0]
+        assert consumer.is_overwritten()
+
+    def test_batches_have_one_sensor(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        Readings of different lidars are returned in separate batches.
+        """
+        _, consumer = ring.consumer(0)
+        ring.write(np.array([0, 1]), np.array([1.0, 1.0]), np.array([0.0, 1.0]), 0, 0.0)
+        ring.write(np.array([2]), np.array([2.0]), np.array([2.0]), 1, 180.0)
+
+        first = consumer.get_nowait()
+        second = consumer.get_nowait()
+
+        assert (first.sensor_id, len(first)) == (0, 2)
+        assert (second.sensor_id, second.mount_yaw_offset, len(second)) == (1, 180.0, 1)
+
+    def test_backlog_of_sensor(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        The backlog of a lidar only counts its unread readings.
+        """
+        _, consumer = ring.consumer(0)
+        _, _ = ring.consumer(1)
+        ring.write(np.array([0, 1]), np.array([1.0, 1.0]), np.array([0.0, 1.0]), 0, 0.0)
+        consumer.get_nowait()
+        ring.write(np.arange(2, 7), np.ones(5), np.arange(2.0, 7.0), 1, 180.0)
+        ring.write(np.arange(7, 10), np.ones(3), np.arange(7.0, 10.0), 0, 0.0)
+
+        # Slowest consumer has read nothing, and the first 2 readings are overwritten
+        assert ring.backlog() == CAPACITY
+        assert ring.backlog(0) == 3
+        assert ring.backlog(1) == 5
+
+    def test_other_process(self, ring: shared_memory_ring.SharedMemoryRing) -> None:
+        """
+        A ring passed to another process maps the same shared memory.
+        """
+        _, consumer = ring.consumer(0)
+
+        process = mp.get_context("spawn").Process(target=produce, args=(ring,))
+        process.start()
+        process.join()
+
+        assert consumer.get(timeout=1).timestamps.tolist() == list(range(0, 5))
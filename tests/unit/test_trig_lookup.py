@@ -0,0 +1,51 @@
+"""
+Test for trig lookup table.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules import trig_lookup
+
+
+class TestTrigLookup:
+    """
+    Test for sin_cos() and sin_cos_array().
+    """
+
+    @pytest.mark.parametrize("angle", [0.0, 90.0, -90.0, 12.34, -169.99, 170.0, 359.99, -540.0])
+    def test_centidegrees_are_exact(self, angle: float) -> None:
+        """
+        Angles in steps of 0.01 degrees, of any turn, match math.sin and math.cos.
+        """
+        sin_angle, cos_angle = trig_lookup.sin_cos(angle)
+
+        assert sin_angle == pytest.approx(math.sin(math.radians(angle)), abs=1e-12)
+        assert cos_angle == pytest.approx(math.cos(math.radians(angle)), abs=1e-12)
+
+    def test_other_angles_are_rounded(self) -> None:
+        """
+        Angles between steps are within the rounding error.
+        """
+        angles = np.linspace(-180, 180, 10007)
+
+        sin_angles, cos_angles = trig_lookup.sin_cos_array(angles)
+
+        assert np.max(np.abs(sin_angles - np.sin(np.radians(angles)))) < 1e-4
+        assert np.max(np.abs(cos_angles - np.cos(np.radians(angles)))) < 1e-4
+
+    def test_array_matches_scalar(self) -> None:
+        """
+        Both APIs use the same table.
+        """
+        angles = np.arange(-17000, 17001, 7) / 100
+
+        sin_angles, cos_angles = trig_lookup.sin_cos_array(angles)
+
+        assert len(trig_lookup.SIN_TABLE) == 36000
+        for angle, sin_angle, cos_angle in zip(
+            angles.tolist()[::97], sin_angles.tolist()[::97], cos_angles.tolist()[::97]
+        ):
+            assert trig_lookup.sin_cos(angle) == (sin_angle, cos_angle)
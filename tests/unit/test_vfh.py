@@ -0,0 +1,144 @@
+"""
+Test for vector field histogram.
+"""
+
+import math
+
+import pytest
+
+from modules import lidar_detection
+from modules import lidar_oscillation
+from modules.vfh import vfh
+
+SECTOR_WIDTH = 10.0  # degrees
+MAX_DISTANCE = 10.0  # metres
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def histogram() -> vfh.VectorFieldHistogram:  # type: ignore
+    """
+    Histogram of 36 sectors.
+    """
+    histogram_instance = vfh.VectorFieldHistogram(SECTOR_WIDTH, MAX_DISTANCE)
+    yield histogram_instance
+
+
+def oscillation_of(
+    readings: "list[tuple[float, float]]", mount_yaw_offset: float = 0.0, timestamp: int = 0
+) -> lidar_oscillation.LidarOscillation:
+    """
+    Oscillation of (distance, angle) readings.
+    """
+    detections = []
+    for distance, angle in readings:
+        result, detection = lidar_detection.LidarDetection.create(
+            distance, angle, timestamp, 0, mount_yaw_offset
+        )
+        assert result
+        detections.append(detection)
+
+    result, oscillation = lidar_oscillation.LidarOscillation.create(detections)
+    assert result
+    assert oscillation is not None
+    return oscillation
+
+
+class TestVectorFieldHistogram:
+    """
+    Test for the VectorFieldHistogram.run() method.
+    """
+
+    def test_densities(self, histogram: vfh.VectorFieldHistogram) -> None:
+        """
+        Sector density is the mean closeness of its readings.
+        """
+        result, density = histogram.run(
+            oscillation_of([(2.0, 1.0), (6.0, 5.0), (20.0, 15.0), (5.0, -5.0)])
+        )
+
+        assert result
+        assert density is not None
+        assert len(density) == 36
+        assert density.density_at(3.0) == (True, pytest.approx(0.6))
+        assert density.density_at(15.0) == (True, 0.0)
+        assert density.density_at(-1.0) == (True, pytest.approx(0.5))
+        assert density.density_at(90.0) == (True, 0.0)
+        assert density.sector_index(180.0) == (False, None)
+
+        _, sector = density.sector(18)
+        assert (sector.angle_start, sector.angle_end) == (0.0, 10.0)
+
+    def test_sectors_are_replaced(self, histogram: vfh.VectorFieldHistogram) -> None:
+        """
+        A sweep replaces the sectors it covers, even without readings in them.
+        """
+        histogram.run(oscillation_of([(1.0, 5.0), (1.0, 25.0), (1.0, 45.0)]))
+        _, density = histogram.run(oscillation_of([(9.0, 0.0), (9.0, 30.0)]))
+
+        assert density.density_at(5.0) == (True, pytest.approx(0.1))
+        assert density.density_at(15.0) == (True, 0.0)
+        assert density.density_at(25.0) == (True, 0.0)
+        assert density.density_at(45.0) == (True, pytest.approx(0.9))
+
+    def test_mount_yaw_offset(self, histogram: vfh.VectorFieldHistogram) -> None:
+        """
+        Readings of a backwards lidar wrap around -180 degrees.
+        """
+        _, density = histogram.run(oscillation_of([(5.0, -5.0), (5.0, 5.0)], 180.0))
+
+        assert density.density_at(175.0) == (True, pytest.approx(0.5))
+        assert density.density_at(-180.0) == (True, pytest.approx(0.5))
+        assert density.density_at(0.0) == (True, 0.0)
+
+    def test_sector_width_not_dividing_360(self) -> None:
+        """
+        Angles are wrapped before finding their sector when the width does not divide 360.
+        """
+        histogram = vfh.VectorFieldHistogram(7.0, MAX_DISTANCE)
+
+        # 250 and 260 degrees are -110 and -100 degrees
+        _, density = histogram.run(oscillation_of([(5.0, 70.0), (5.0, 80.0)], 180.0))
+
+        assert len(density) == 52
+        assert density.density_at(-110.0) == (True, pytest.approx(0.5))
+        assert density.density_at(-100.0) == (True, pytest.approx(0.5))
+        assert density.sector_index(-100.0) == (True, 11)
+        assert density.densities.sum() == pytest.approx(1.0)
+
+        # Sweeping across 180 degrees, over the narrower last sector
+        _, density = histogram.run(oscillation_of([(5.0, -10.0), (5.0, 10.0)], 180.0))
+
+        assert density.density_at(170.0) == (True, pytest.approx(0.5))
+        assert density.density_at(-170.0) == (True, pytest.approx(0.5))
+        assert density.densities.sum() == pytest.approx(2.0)
+
+    def test_decay_and_smoothing(self) -> None:
+        """
+        Sectors decay with time and blend new oscillations with their history.
+        """
+        histogram = vfh.VectorFieldHistogram(SECTOR_WIDTH, MAX_DISTANCE, 1.0, 0.5)
+
+        histogram.run(oscillation_of([(2.0, 5.0), (2.0, 25.0)], timestamp=0))
+        _, density = histogram.run(oscillation_of([(8.0, 5.0)], timestamp=int(1e9)))
+
+        assert density.timestamp == int(1e9)
+        # Halfway from the decayed density to the new one
+        first_density = 0.5 * 0.8
+        assert density.density_at(5.0) == (
+            True,
+            pytest.approx(
+                first_density * math.exp(-1) + 0.5 * (0.2 - first_density * math.exp(-1))
+            ),
+        )
+        assert density.density_at(25.0) == (True, pytest.approx(first_density * math.exp(-1)))
+
+    def test_output_is_a_copy(self, histogram: vfh.VectorFieldHistogram) -> None:
+        """
+        Later oscillations do not change histograms already output.
+        """
+        _, first = histogram.run(oscillation_of([(2.0, 5.0)]))
+        histogram.run(oscillation_of([(9.0, 5.0)]))
+
+        assert first.density_at(5.0) == (True, pytest.approx(0.8))
@@ -0,0 +1,156 @@
+"""
+Test for VFH+ decision.
+"""
+
+import numpy as np
+import pytest
+
+from modules import decision_command
+from modules import polar_obstacle_density
+from modules.decision import vfh_decision
+
+SECTOR_WIDTH = 10.0  # degrees
+HIGH_THRESHOLD = 0.5
+LOW_THRESHOLD = 0.2
+MIN_VALLEY_WIDTH = 30.0  # degrees
+SPEED = 2.0  # m/s
+HEADING_TOLERANCE = 5.0  # degrees
+COMPUTE_BUDGET = 1.0  # seconds
+
+CommandType = decision_command.DecisionCommand.CommandType
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def decider() -> vfh_decision.VfhDecision:  # type: ignore
+    """
+    Decision needing 3 free sectors.
+    """
+    decider_instance = vfh_decision.VfhDecision(
+        HIGH_THRESHOLD,
+        LOW_THRESHOLD,
+        MIN_VALLEY_WIDTH,
+        SPEED,
+        HEADING_TOLERANCE,
+        COMPUTE_BUDGET,
+    )
+    yield decider_instance
+
+
+def density_of(blocked: "dict[float, float]") -> polar_obstacle_density.PolarObstacleDensity:
+    """
+    36 sector density, clear except for the given angle: density.
+    """
+    density = np.zeros(36)
+    for angle, value in blocked.items():
+        density[int((angle + 180) // SECTOR_WIDTH)] = value
+
+    result, polar_density = polar_obstacle_density.PolarObstacleDensity.create(
+        density, -180.0, SECTOR_WIDTH
+    )
+    assert result
+    assert polar_density is not None
+    return polar_density
+
+
+class TestVfhDecision:
+    """
+    Test for the VfhDecision.run() method.
+    """
+
+    def test_clear_path_resumes_once(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        A clear path to the waypoint resumes the mission, without repeating the command.
+        """
+        result, command = decider.run(density_of({}), 90.0, 100.0)
+        assert result
+        assert command.command == CommandType.RESUME_MISSION
+
+        result, _ = decider.run(density_of({}), 90.0, 100.0)
+        assert not result
+
+    def test_steer_around_obstacle(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        An obstacle ahead steers to the closest valley wide enough, as an absolute heading.
+        """
+        obstacle = {-15.0: 1.0, -5.0: 1.0, 5.0: 1.0, 25.0: 1.0}
+
+        result, command = decider.run(density_of(obstacle), 90.0, 90.0)
+
+        assert result
+        assert command.command == CommandType.HEADING_CHANGE
+        assert command.heading == pytest.approx(90.0 - 35.0)
+        assert command.speed == SPEED
+
+        # Same heading again is not sent
+        result, _ = decider.run(density_of(obstacle), 90.0, 90.0)
+        assert not result
+
+    def test_heading_wraps(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        Headings are from -180 to 180.
+        """
+        result, command = decider.run(density_of({0.0: 1.0, 10.0: 1.0, -10.0: 1.0}), 170.0, 170.0)
+
+        assert result
+        assert command.command == CommandType.HEADING_CHANGE
+        assert -180.0 <= command.heading < 180.0
+        assert command.heading == pytest.approx(145.0)
+
+    def test_hysteresis(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        Blocked sectors only clear once below the low threshold.
+        """
+        result, command = decider.run(density_of({0.0: 1.0}), 0.0, 0.0)
+        assert result
+        assert command.command == CommandType.HEADING_CHANGE
+
+        # Still blocked, so the same heading
+        result, _ = decider.run(density_of({0.0: 0.3}), 0.0, 0.0)
+        assert not result
+
+        result, command = decider.run(density_of({0.0: 0.1}), 0.0, 0.0)
+        assert result
+        assert command.command == CommandType.RESUME_MISSION
+
+    def test_no_valley_stops(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        No valley wide enough stops the drone.
+        """
+        blocked = {float(angle): 1.0 for angle in range(-180, 180, 20)}
+
+        result, command = decider.run(density_of(blocked), 0.0, 0.0)
+
+        assert result
+        assert command.command == CommandType.STOP_MISSION_AND_HALT
+
+    def test_over_budget_stops(self) -> None:
+        """
+        A decision that takes longer than the budget stops the drone.
+        """
+        decider = vfh_decision.VfhDecision(
+            HIGH_THRESHOLD, LOW_THRESHOLD, MIN_VALLEY_WIDTH, SPEED, HEADING_TOLERANCE, 0.0
+        )
+
+        result, command = decider.run(density_of({}), 0.0, 0.0)
+
+        assert result
+        assert command.command == CommandType.STOP_MISSION_AND_HALT
+        assert decider.over_budget_count == 1
+
+    def test_too_many_sectors_stops(self, decider: vfh_decision.VfhDecision) -> None:
+        """
+        A density with more sectors than the search is bounded to stops the drone.
+        """
+        sector_count = vfh_decision.VfhDecision.MAX_SECTOR_COUNT + 1
+        result, density = polar_obstacle_density.PolarObstacleDensity.create(
+            np.zeros(sector_count), -180.0, 360.0 / sector_count
+        )
+        assert result
+        assert density is not None
+
+        result, command = decider.run(density, 0.0, 0.0)
+
+        assert result
+        assert command.command == CommandType.STOP_MISSION_AND_HALT
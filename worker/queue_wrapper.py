@@ -2,11 +2,24 @@
 Worker Queue.
 """
 
+import enum
+import multiprocessing
 import multiprocessing.managers
 import time
 import queue
 
 
+class QueuePolicy(enum.Enum):
+    """
+    What put() does when the queue is full.
+    """
+
+    BLOCK = "block"  # wait for space
+    DROP_OLDEST = "drop_oldest"  # discard the oldest item to make space
+    DROP_NEWEST = "drop_newest"  # discard the item being put
+    CONFLATE = "conflate"  # keep only the latest item
+
+
 class QueueWrapper:
     """
     Wrapper for an underlying queue proxy which also stores max size.
@@ -15,9 +28,75 @@ class QueueWrapper:
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, max_size: int = 0) -> None:
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager,
+        max_size: int = 0,
+        policy: QueuePolicy = QueuePolicy.BLOCK,
+    ) -> None:
         self.queue = mp_manager.Queue(max_size)
         self.max_size = max_size
+        self.policy = policy
+
+        # Shared so that every process putting into the queue counts, in shared memory rather
+        # than through the manager so that counting does not slow down an overloaded producer
+        self.__drop_count = multiprocessing.Value("q", 0)
+
+    def put(self, item: object) -> bool:
+        """
+        Puts the item according to the queue policy.
+        Returns whether the item was added.
+        """
+        if self.policy == QueuePolicy.BLOCK:
+            self.queue.put(item)
+            return True
+
+        if self.policy == QueuePolicy.CONFLATE:
+            self.__discard(self.queue.qsize())
+
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                pass
+
+            if self.policy == QueuePolicy.DROP_NEWEST:
+                self.__count_drops(1)
+                return False
+
+            self.__discard(1)
+
+    def __discard(self, count: int) -> None:
+        """
+        Removes and counts up to count of the oldest items.
+        """
+        discarded = 0
+        for _ in range(0, count):
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            discarded += 1
+
+        self.__count_drops(discarded)
+
+    def __count_drops(self, count: int) -> None:
+        """
+        Adds count to the number of items discarded.
+        """
+        if count == 0:
+            return
+
+        with self.__drop_count.get_lock():
+            self.__drop_count.value += count
+
+    def drop_count(self) -> int:
+        """
+        Number of items discarded by the policy.
+        """
+        return self.__drop_count.value
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
@@ -0,0 +1,316 @@
+"""
+Lidar reading ring buffer in shared memory.
+"""
+
+import multiprocessing.shared_memory
+import queue
+import time
+
+import numpy as np
+
+from modules import lidar_detection_batch
+
+
+# Header: write index, capacity, maximum number of consumers, claimed index (the write index
+# once the write in progress is done), then the read index of each consumer (-1 until the
+# consumer is registered)
+HEADER_DTYPE = np.int64
+HEADER_FIELD_COUNT = 4
+UNREGISTERED_READ_INDEX = -1
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", np.int64),  # ns, monotonic clock
+        ("distance", np.float64),  # metres
+        ("angle", np.float64),  # degrees
+        ("sensor_id", np.int32),
+        ("mount_yaw_offset", np.float32),  # degrees
+    ]
+)
+
+
+class SharedMemoryRing:
+    """
+    Single producer, multiple consumer ring buffer of lidar readings.
+
+    Readings are never waited for: the producer overwrites the oldest readings and each consumer
+    detects the readings it missed from its own read index. Indices are totals, taken modulo
+    capacity.
+
+    Like a seqlock, the producer claims the slots it is about to write before writing them, and
+    publishes the write index once they are written. Consumers read up to the write index and
+    treat readings up to capacity before the claimed index as overwritten.
+    """
+
+    __create_key = object()
+
+    @staticmethod
+    def __header_size(max_consumers: int) -> int:
+        """
+        Header size in bytes, rounded up to keep records aligned.
+        """
+        size = (HEADER_FIELD_COUNT + max_consumers) * np.dtype(HEADER_DTYPE).itemsize
+        return -(-size // RECORD_DTYPE.itemsize) * RECORD_DTYPE.itemsize
+
+    @staticmethod
+    def __map(
+        shared_memory: multiprocessing.shared_memory.SharedMemory, max_consumers: int
+    ) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Header and record arrays over the shared memory.
+        """
+        header_size = SharedMemoryRing.__header_size(max_consumers)
+        header = np.ndarray(
+            (HEADER_FIELD_COUNT + max_consumers,), dtype=HEADER_DTYPE, buffer=shared_memory.buf
+        )
+        capacity = (shared_memory.size - header_size) // RECORD_DTYPE.itemsize
+        if header[1] > 0:
+            capacity = int(header[1])
+
+        records = np.ndarray(
+            (capacity,), dtype=RECORD_DTYPE, buffer=shared_memory.buf, offset=header_size
+        )
+
+        return header, records
+
+    @classmethod
+    def create(cls, capacity: int, max_consumers: int) -> "tuple[bool, SharedMemoryRing | None]":
+        """
+        capacity: number of readings.
+        max_consumers: number of consumers that can read the ring.
+        """
+        if capacity <= 0 or max_consumers <= 0:
+            return False, None
+
+        size = cls.__header_size(max_consumers) + capacity * RECORD_DTYPE.itemsize
+        try:
+            shared_memory = multiprocessing.shared_memory.SharedMemory(create=True, size=size)
+        except OSError as exception:
+            print(f"Could not create shared memory ring: {exception}")
+            return False, None
+
+        ring = SharedMemoryRing(cls.__create_key, shared_memory, max_consumers)
+        ring.header[:] = 0
+        ring.header[1] = capacity
+        ring.header[2] = max_consumers
+        ring.header[HEADER_FIELD_COUNT:] = UNREGISTERED_READ_INDEX
+
+        return True, ring
+
+    def __init__(
+        self,
+        create_key: object,
+        shared_memory: multiprocessing.shared_memory.SharedMemory,
+        max_consumers: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert create_key is SharedMemoryRing.__create_key, "Use create() method"
+
+        self.shared_memory = shared_memory
+        self.max_consumers = max_consumers
+        self.header, self.records = self.__map(shared_memory, max_consumers)
+        self.capacity = len(self.records)
+
+    def __getstate__(self) -> "tuple[multiprocessing.shared_memory.SharedMemory, int]":
+        """
+        Only the shared memory (by name) is sent to other processes.
+        """
+        return self.shared_memory, self.max_consumers
+
+    def __setstate__(self, state: "tuple[multiprocessing.shared_memory.SharedMemory, int]") -> None:
+        """
+        Map the shared memory again.
+        """
+        self.shared_memory, self.max_consumers = state
+        self.header, self.records = self.__map(self.shared_memory, self.max_consumers)
+        self.capacity = len(self.records)
+
+    def write(
+        self,
+        timestamps: np.ndarray,
+        distances: np.ndarray,
+        angles: np.ndarray,
+        sensor_id: int = 0,
+        mount_yaw_offset: float = 0.0,
+    ) -> None:
+        """
+        Producer: add readings from arrays of equal length.
+        """
+        write_index = int(self.header[0])
+        count = len(timestamps)
+        if count > self.capacity:
+            # Only the newest readings fit
+            timestamps = timestamps[-self.capacity :]
+            distances = distances[-self.capacity :]
+            angles = angles[-self.capacity :]
+            write_index += count - self.capacity
+            count = self.capacity
+
+        # Claim the slots before writing over them, so that consumers know they are overwritten
+        self.header[3] = write_index + count
+
+        start = write_index % self.capacity
+        first = min(count, self.capacity - start)
+
+        for records, offset, end in (
+            (self.records[start : start + first], 0, first),
+            (self.records[: count - first], first, count),
+        ):
+            records["timestamp"] = timestamps[offset:end]
+            records["distance"] = distances[offset:end]
+            records["angle"] = angles[offset:end]
+            records["sensor_id"] = sensor_id
+            records["mount_yaw_offset"] = mount_yaw_offset
+
+        # Publish only once the records are written
+        self.header[0] = write_index + count
+
+    def backlog(self, sensor_id: "int | None" = None) -> int:
+        """
+        Number of readings the slowest registered consumer has not read yet, up to capacity.
+        With a sensor id, only those of that lidar.
+        """
+        write_index = int(self.header[0])
+        read_indices = self.header[HEADER_FIELD_COUNT:]
+        read_indices = read_indices[read_indices != UNREGISTERED_READ_INDEX]
+        if len(read_indices) == 0:
+            return 0
+
+        count = min(int(write_index - read_indices.min()), self.capacity)
+        if sensor_id is None or count <= 0:
+            return count
+
+        start = (write_index - count) % self.capacity
+        end = start + count
+        sensor_ids = self.records["sensor_id"]
+        return int(
+            np.count_nonzero(sensor_ids[start : min(end, self.capacity)] == sensor_id)
+            + np.count_nonzero(sensor_ids[: max(end - self.capacity, 0)] == sensor_id)
+        )
+
+    def consumer(self, consumer_id: int) -> "tuple[bool, SharedMemoryRingConsumer | None]":
+        """
+        Reader for a consumer, starting from the newest reading.
+        Each consumer id must only be used by one process.
+        """
+        if consumer_id < 0 or consumer_id >= self.max_consumers:
+            return False, None
+
+        self.header[HEADER_FIELD_COUNT + consumer_id] = self.header[0]
+        return True, SharedMemoryRingConsumer(self, consumer_id)
+
+    def close(self) -> None:
+        """
+        Unmap the shared memory in this process.
+        """
+        self.header = None
+        self.records = None
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Free the shared memory, once every process is done with it.
+        """
+        self.shared_memory.unlink()
+
+
+class SharedMemoryRingConsumer:
+    """
+    Reads a SharedMemoryRing with its own read index, like a queue of LidarDetectionBatch.
+
+    Batches are views of the shared memory, not copies. They stay valid until the producer
+    wraps around onto them, which is_overwritten() detects.
+    """
+
+    __POLL_PERIOD = 0.001  # seconds
+
+    def __init__(self, ring: SharedMemoryRing, consumer_id: int) -> None:
+        """
+        Use SharedMemoryRing.consumer().
+        """
+        self.ring = ring
+        self.consumer_id = consumer_id
+        self.max_batch_size = ring.capacity
+
+        # Readings overwritten before they were read
+        self.overrun_count = 0
+        self.__last_read_start = None
+
+    def __read_index(self) -> int:
+        """
+        Total number of readings read by this consumer.
+        """
+        return int(self.ring.header[HEADER_FIELD_COUNT + self.consumer_id])
+
+    def get_nowait(self) -> lidar_detection_batch.LidarDetectionBatch:
+        """
+        Oldest unread readings of one lidar, contiguous in the ring.
+        Raises queue.Empty if there are none.
+        """
+        header = self.ring.header
+        capacity = self.ring.capacity
+
+        write_index = int(header[0])
+        read_index = self.__read_index()
+        # Readings the producer is writing over are lost too
+        claimed_index = int(header[3])
+        if claimed_index - read_index > capacity:
+            self.overrun_count += claimed_index - read_index - capacity
+            read_index = claimed_index - capacity
+
+        count = min(write_index - read_index, self.max_batch_size)
+        if count <= 0:
+            raise queue.Empty
+
+        start = read_index % capacity
+        records = self.ring.records[start : start + min(count, capacity - start)]
+
+        # A batch only holds readings of one lidar
+        sensor_ids = records["sensor_id"]
+        changes = np.flatnonzero(sensor_ids[1:] != sensor_ids[0])
+        if len(changes) > 0:
+            records = records[: changes[0] + 1]
+
+        result, batch = lidar_detection_batch.LidarDetectionBatch.create(
+            records["distance"],
+            records["angle"],
+            records["timestamp"],
+            int(records["sensor_id"][0]),
+            float(records["mount_yaw_offset"][0]),
+        )
+        assert result
+
+        self.__last_read_start = read_index
+        header[HEADER_FIELD_COUNT + self.consumer_id] = read_index + len(records)
+        return batch
+
+    def get(
+        self, block: bool = True, timeout: "float | None" = None
+    ) -> lidar_detection_batch.LidarDetectionBatch:
+        """
+        Same as get_nowait(), but waits (up to timeout, forever if None) for readings.
+        """
+        if not block:
+            return self.get_nowait()
+
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                if end_time is not None and time.monotonic() >= end_time:
+                    raise
+
+            time.sleep(self.__POLL_PERIOD)
+
+    def is_overwritten(self) -> bool:
+        """
+        Whether the producer has overwritten, or started writing over, any reading of the last
+        batch returned.
+        """
+        if self.__last_read_start is None:
+            return False
+
+        return int(self.ring.header[3]) - self.ring.capacity > self.__last_read_start